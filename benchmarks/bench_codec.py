@@ -0,0 +1,90 @@
+"""Encode/decode cost per command of the Connect wire codec.
+
+Compares ``module.codec`` (precompiled structs, pack_into a reusable buffer,
+unpack_from the receive buffer) with the format-string-per-call packing
+IFClient used before.
+
+    python -m benchmarks.bench_codec
+"""
+from struct import pack, unpack
+from timeit import Timer
+from tabulate import tabulate
+
+from module import codec
+from module.codec import SendBuffer
+
+samples = {
+    0: True,
+    1: 3,
+    2: 251.5,
+    3: 10_668.0,
+    4: "Boeing 777-300ER",
+    5: 123456789,
+}
+
+# IFClient.read_converter
+legacy_read = {
+    0: lambda x, _: unpack("<?", x)[0],
+    1: lambda x, _: unpack("<i", x)[0],
+    2: lambda x, _: unpack("<f", x)[0],
+    3: lambda x, _: unpack("<d", x)[0],
+    4: lambda x, lenght: unpack(f"<i{lenght-4}s", x)[-1].decode("utf-8"),
+    5: lambda x, _: unpack("q", x)[0],
+}
+
+# IFClient.write_converter
+legacy_write = {
+    0: lambda cmd, wrt, data: pack("<i??", cmd, wrt, data),
+    1: lambda cmd, wrt, data: pack("<i?i", cmd, wrt, data),
+    2: lambda cmd, wrt, data: pack("<i?f", cmd, wrt, data),
+    3: lambda cmd, wrt, data: pack("<i?d", cmd, wrt, data),
+    4: lambda cmd, wrt, data: pack(f"<i?i{len(data)}s", cmd, wrt, len(data), data.encode("utf-8")),
+    5: lambda cmd, wrt, data: pack("<i?q", cmd, wrt, data),
+}
+
+
+def payload(Type: int) -> bytes:
+    if Type == 4:
+        data = samples[Type].encode("utf-8")
+        return pack("<i", len(data)) + data
+    return codec.value_structs[Type].pack(samples[Type])
+
+
+def per_call_ns(stmt, number: int, per: int = 1) -> float:
+    return min(Timer(stmt).repeat(repeat=5, number=number)) / number / per * 1e9
+
+
+def run(number: int = 100_000, batch: int = 20) -> list[dict[str, float | int | str]]:
+    results = []
+    for Type, value in samples.items():
+        data = payload(Type)
+        view = memoryview(bytearray(data))
+        lenght = len(data)
+        decoder = codec.decoders[Type]
+        encoder = codec.encoders[Type]
+        results.append({
+            "command": f"type {Type}",
+            "legacy encode (ns)": per_call_ns(lambda: legacy_write[Type](42, True, value), number),
+            "codec encode (ns)": per_call_ns(lambda: encoder(42, value), number),
+            "legacy decode (ns)": per_call_ns(lambda: legacy_read[Type](data, lenght), number),
+            "codec decode (ns)": per_call_ns(lambda: decoder(view, lenght), number),
+        })
+
+    commands = range(batch)
+    buffer = SendBuffer()
+
+    def codec_batch():
+        buffer.clear()
+        buffer.add_reads(commands)
+        return buffer.view()
+
+    results.append({
+        "command": f"read request, batch of {batch}",
+        "legacy encode (ns)": per_call_ns(lambda: b"".join(pack("<i?", command, False) for command in commands), number // batch, batch),
+        "codec encode (ns)": per_call_ns(codec_batch, number // batch, batch),
+    })
+    return results
+
+
+if __name__ == "__main__":
+    print(tabulate(run(), headers="keys", floatfmt=".0f"))
@@ -0,0 +1,205 @@
+"""Benchmarks of the client, flight plan and control tick paths against fixed fixtures.
+
+The client talks to an in-process ``Simulator`` frozen in flight, so every run
+sees the same manifest, flight plan and aircraft state. The import benchmarks
+time a new interpreter instead (cold start). Results are written as
+JSON and can be compared with a previous run::
+
+    python -m benchmarks.bench_suite --output logs/benchmarks.json
+    python -m benchmarks.bench_suite --compare logs/benchmarks-1.2.json
+"""
+from argparse import ArgumentParser
+from datetime import datetime
+from statistics import median
+from subprocess import run, DEVNULL
+from typing import Callable
+from pathlib import Path
+from tempfile import gettempdir
+from timeit import Timer
+from time import perf_counter
+from json import dump, load
+import platform
+import sys
+
+from tabulate import tabulate
+
+from numpy import asarray, full, arange, sin
+
+from module import codec, IFFPL
+from module.atmosphere import AtmosphereTable, cas2tas
+from module.convertion import ias2tas_SI, KNOT
+from module.FlightPlan import cosine_law, cosine_law_SI, dist_to_fix, dist_to_fix_SI
+from module.telemetry import default_fields
+from module.recorder import FlightRecorder, default_channels, downsample
+from .fixtures import ControlLoop, no_waiting, small_plan, large_plan
+
+
+def measure(func: Callable[[], object], repeat: int = 5) -> dict[str, float | int]:
+    """Per-call time of ``func`` in µs, each of the ``repeat`` rounds runs for at least 0.2 s."""
+    timer = Timer(func)
+    number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {"number": number, "repeat": repeat, "best (µs)": min(times) * 1e6, "median (µs)": median(times) * 1e6}
+
+
+def benchmarks() -> dict[str, Callable[[], object]]:
+    loop = ControlLoop()
+    client, manifest = loop.client, loop.client.manifest
+    autopilot_node = manifest.search("systems", "autopilot")
+    fpl, aircraft = loop.fpl, loop.aircraft
+    far_fix = fpl[-2]
+    command, Type, _ = client.resolve("altitude_msl")
+    payload = codec.value_structs[Type].pack(10_000.0)
+    telemetry_paths = [path for path, _ in default_fields.values()]
+    decoder = codec.batch_decoder(tuple(client.resolve(*path)[1] for path in telemetry_paths))
+    responses = bytearray(decoder.size)
+    offset = 0
+    for i in decoder.order:
+        command_, Type_, _ = client.resolve(*telemetry_paths[i])
+        st = codec.value_structs[Type_]
+        codec.header.pack_into(responses, offset, command_, st.size)
+        st.pack_into(responses, offset + codec.header.size, 1)
+        offset += codec.header.size + st.size
+    # speed profile of the large plan: 280 knot CAS at every fix
+    route_alts = asarray([fix.alt_SI for fix in IFFPL.from_str(large_plan)], dtype=float)
+    route_cas = full(route_alts.shape, 280 * KNOT)
+    table = AtmosphereTable()
+    # 5 h at 10 Hz
+    recorded_times = arange(180_000) * 0.1
+    recorded_values = sin(recorded_times / 60)
+    recorder = FlightRecorder(Path(gettempdir()) / "bench.iffr", client, default_channels(loop.autothrottle))
+
+    return {
+        "Node.search full path": lambda: manifest.search("aircraft", "0", "altitude_msl"),
+        "Node.search suffix": lambda: manifest.search("altitude_msl"),
+        "Node.search relative": lambda: manifest.search("alt", "target", autopilot_node),
+        "Node.search miss": lambda: manifest.search("not", "in", "manifest"),
+        "codec encode read": lambda: codec.encode(command, Type),
+        "codec encode write": lambda: codec.encode(command, Type, True, 10_000.0),
+        "codec decode float": lambda: codec.decode(Type, payload, len(payload)),
+        "send_command read float": lambda: client.send_command("altitude_msl"),
+        # not kept by the read cache, unlike the aircraft name and livery
+        "send_command read string": lambda: client.send_command("infiniteflight", "app_version"),
+        "send_command write": lambda: client.send_command("simulator", "throttle", write=True, data=-200),
+        f"send_batch {len(telemetry_paths)} reads": lambda: client.send_batch(telemetry_paths),
+        f"read_array {len(telemetry_paths)} reads": lambda: client.read_array(telemetry_paths),
+        f"BatchDecoder {len(telemetry_paths)} values": lambda: decoder(responses),
+        f"Aircraft.snapshot {len(aircraft.snapshot_fields)} reads": lambda: aircraft.snapshot(),
+        f"IFFPL.from_str {small_plan.count('identifier')} fixes": lambda: IFFPL.from_str(small_plan),
+        f"IFFPL.from_str {large_plan.count('identifier')} fixes": lambda: IFFPL.from_str(large_plan),
+        "cosine_law": lambda: cosine_law(fpl[1], fpl[2]),
+        f"dist_to_fix {far_fix.index - aircraft.next_index} fixes ahead": lambda: dist_to_fix(far_fix, fpl, aircraft),
+        "cosine_law_SI": lambda: cosine_law_SI(fpl[1], fpl[2]),
+        f"dist_to_fix_SI {far_fix.index - aircraft.next_index} fixes ahead": lambda: dist_to_fix_SI(far_fix, fpl, aircraft.next_index, aircraft.dist_to_next_SI),
+        f"ias2tas_SI {len(route_alts)} fixes": lambda: [ias2tas_SI(cas, alt) for cas, alt in zip(route_cas.tolist(), route_alts.tolist())],
+        f"cas2tas {len(route_alts)} fixes": lambda: cas2tas(route_cas, route_alts),
+        f"AtmosphereTable.cas2tas {len(route_alts)} fixes": lambda: table.cas2tas(route_cas, route_alts),
+        f"FlightRecorder.sample {len(recorder.channels)} channels": recorder.sample,
+        f"downsample {len(recorded_values)} -> 2000 points": lambda: downsample(recorded_times, recorded_values, 2000),
+        "Autothrottle tick": loop.autothrottle,
+        "Vnav tick": loop.vnav,
+    }
+
+
+# statements run by a fresh interpreter, the time includes the interpreter startup ("python -c pass")
+import_statements: dict[str, str] = {
+    "python -c pass": "pass",
+    "import module": "import module",
+    "import module, build unit": "import module; module.unit.knot",
+    "import main.py dependencies": "from module.flight_phases import Vnav, Lnav, takeoff, Only_Authothrottle; "
+                                   "from module import IFClient, Aircraft, Autopilot, Autothrottle, IFFPL, logger",
+}
+
+
+def measure_import(statement: str, repeat: int = 5) -> dict[str, float | int]:
+    """Wall time in µs of a new process running ``statement`` from the repository root."""
+    command = [sys.executable, "-c", statement]
+    cwd = Path(__file__).resolve().parent.parent
+    # first run outside the timing: bytecode and unit registry caches
+    run(command, cwd=cwd, check=True, stdin=DEVNULL)
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        run(command, cwd=cwd, check=True, stdin=DEVNULL)
+        times.append(perf_counter() - start)
+    return {"number": 1, "repeat": repeat, "best (µs)": min(times) * 1e6, "median (µs)": median(times) * 1e6}
+
+
+def git_revision() -> str | None:
+    try:
+        result = run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, stdin=DEVNULL)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def run_suite(repeat: int = 5, only: str | None = None) -> dict:
+    results = {}
+    with no_waiting():
+        for name, func in benchmarks().items():
+            if only and only.lower() not in name.lower():
+                continue
+            # first call outside the timing: lazy caches, pint conversions, flight plan update
+            func()
+            results[name] = measure(func, repeat)
+    for name, statement in import_statements.items():
+        if only and only.lower() not in name.lower():
+            continue
+        results[name] = measure_import(statement, repeat)
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> tuple[list[dict], list[str]]:
+    """Rows of the comparison on the best times and the names slower than ``threshold`` times the baseline."""
+    rows, regressions = [], []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        ratio = result["best (µs)"] / base["best (µs)"] if base else None
+        rows.append({
+            "benchmark": name,
+            "baseline (µs)": base["best (µs)"] if base else None,
+            "best (µs)": result["best (µs)"],
+            "ratio": ratio,
+        })
+        if ratio is not None and ratio > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, default=Path("logs/benchmarks.json"))
+    parser.add_argument("--compare", type=Path, help="previous results to compare with")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="slowdown ratio reported as a regression (exit status 1)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="run the benchmarks whose name contains this")
+    args = parser.parse_args()
+
+    current = run_suite(args.repeat, args.only)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w") as f:
+        dump(current, f, indent=4)
+
+    if args.compare is None:
+        rows = [{"benchmark": name, **result} for name, result in current["results"].items()]
+        print(tabulate(rows, headers="keys", floatfmt=".2f"))
+        return
+    with open(args.compare) as f:
+        baseline = load(f)
+    rows, regressions = compare(current, baseline, args.threshold)
+    print(f"{current['revision']} vs {baseline.get('revision')}")
+    print(tabulate(rows, headers="keys", floatfmt=".2f"))
+    if regressions:
+        print(f"\n{len(regressions)} regressions over x{args.threshold}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Fixed inputs shared by the benchmarks: routes, flight plans and a client on an in-process simulator."""
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from module import Aircraft, Autopilot, Autothrottle, IFFPL
+from module.flight_phases import Vnav
+from module.logger import logger, debug_logger
+from module.simulator import Simulator, default_route, route_type
+from tests.helpers import airborne, inputs, loopback_client, long_route
+
+
+def flight_plan_json(route: route_type) -> str:
+    return Simulator(route=route, time_scale=None).full_info()
+
+
+small_plan = flight_plan_json(default_route())
+large_plan = flight_plan_json(long_route())
+
+
+class ControlLoop:
+    """Aircraft, autopilot, autothrottle and VNAV wired to an airborne in-process simulator."""
+    def __init__(self, route: route_type | None = None) -> None:
+        route = long_route() if route is None else route
+        self.simulator = airborne(route)
+        self.client = loopback_client(self.simulator)
+        self.aircraft = Aircraft(self.client)
+        self.autopilot = Autopilot(self.client)
+        self.fpl = IFFPL.from_str(self.client.send_command("full_info"))
+        self.autothrottle = Autothrottle(self.aircraft, self.autopilot, self.fpl, inputs=inputs)
+        self.vnav = Vnav(self.aircraft, self.autopilot, self.autothrottle, self.fpl)
+
+
+@contextmanager
+def no_waiting():
+    """Control ticks without their ``sleep`` calls and logging."""
+    loggers = (logger, debug_logger)
+    for log in loggers:
+        log.disabled = True
+    try:
+        with patch("module.flight_phases.sleep"):
+            yield
+    finally:
+        for log in loggers:
+            log.disabled = False
@@ -1,7 +1,9 @@
 from module.flight_phases import Vnav, Lnav, takeoff, Only_Authothrottle
 from module import IFClient, Aircraft, Autopilot, IFFPL, logger, retrive_ip_port
-from module import Autothrottle
+from module import Autothrottle, FlightRecorder, Scheduler, default_channels
 from tabulate import tabulate
+from contextlib import nullcontext
+from datetime import datetime
 
 ip, port = retrive_ip_port()
 
@@ -15,7 +17,8 @@ def main_loop() -> None:
         case _:
             logger.error("Invalid input, only AT will be used")
             only_AT = True
-
+    # a read of every channel 10 times per second, on request only
+    record = input("Record the flight? (y/n): ")[:1] == "y"
 
     client: IFClient = IFClient(ip, port)
     aircraft: Aircraft = Aircraft(client)
@@ -23,7 +26,8 @@ def main_loop() -> None:
         fpl: IFFPL = IFFPL.from_str(client.send_command("full_info"), write=True)
     autopilot: Autopilot = Autopilot(client)
     autothrottle = Autothrottle(aircraft, autopilot, fpl)
-    vnav: Vnav = Vnav(aircraft, autopilot, autothrottle, fpl)
+    # the autothrottle runs at its own rate, see below
+    vnav: Vnav = Vnav(aircraft, autopilot, autothrottle, fpl, tick_autothrottle=False)
     logger.info("Aircraft, Autopilot, Vnav initialized")
     only_AT = False
 
@@ -31,10 +35,27 @@ def main_loop() -> None:
         data = list(zip(*list((vars(aircraft.airplane).items()))))
         logger.info("\n"+tabulate(data, headers="firstrow"))
 
-    if not only_AT:
-        while vnav(): continue
+    if record:
+        path = f"logs/flight-{datetime.now():%Y%m%d-%H%M%S}.iffr"
+        recorder = FlightRecorder(path, client, default_channels(autothrottle))
+        logger.info(f"Recording the flight to {path}")
     else:
-        Only_Authothrottle(aircraft, autopilot)
+        recorder = nullcontext()
+    with recorder:
+        if not only_AT:
+            scheduler = Scheduler()
+
+            def vnav_tick() -> None:
+                if not vnav():
+                    scheduler.stop()
+
+            # the throttle steps are per second, a tick makes a fifth of one
+            autothrottle.period = scheduler.add("autothrottle", autothrottle, rate=5).period
+            scheduler.add("vnav", vnav_tick, rate=1)
+            scheduler.run()
+        else:
+            scheduler = Only_Authothrottle(aircraft, autopilot, autothrottle)
+    logger.info("\n"+scheduler.table())
 
     logger.info("Autopilot finished")
     if aircraft.airplane is not None:
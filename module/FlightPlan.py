@@ -1,20 +1,28 @@
+from __future__ import annotations
 from numpy import arccos, arctan2, cos, arcsin, sin, cross, array, pi
-from .convertion import decimal_to_dms
+from .convertion import decimal_to_dms, FT, EARTH_RADIUS
 from .logger import logger
-from . import unit, Quantity
+from . import unit
 from dataclasses import dataclass, field
 from itertools import pairwise
+from functools import cache
 from json import loads, load, dump
 from numpy.linalg import norm
 from io import TextIOWrapper
 from re import findall
 from enum import Enum, auto
-import requests
+import math
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
+    from pint import Quantity
     from .aircraft import Aircraft
 
+__all__ = ["Fix", "FlightPhase", "IFFPL", "angle_between_3_fix", "cosine_law", "cosine_law_SI",
+           "dist_fix_fix", "dist_fix_fix_SI", "dist_to_fix", "dist_to_fix_SI", "dummy_fix", "get_bearing",
+           "get_point"]
+
+
 class FlightPhase(Enum):
     TAKE_OFF = auto()
     CLIMB = auto()
@@ -34,15 +42,23 @@ class Fix:
     lat: Quantity
     lon: Quantity
     _index: int
-    dist_to_next: Quantity = field(init=False, default=0)
     _flight_phase: int = field(init=False, default=FlightPhase.NULL)
     _spd: Quantity = field(init=False, default=-1)
+    # float copies for the flight plan math: m, rad, rad and m to the next fix
+    alt_SI: float = field(init=False, default=0)
+    lat_SI: float = field(init=False, default=0)
+    lon_SI: float = field(init=False, default=0)
+    dist_SI: float = field(init=False, default=0)
 
     def __post_init__(self):
-        self.lat = (self.lat * unit.deg).to(unit.rad)
-        self.lon = (self.lon * unit.deg).to(unit.rad)
-        self.alt = (self.alt * unit.ft).to(unit.m)
-        self.dist_to_next *= unit.m
+        from pint import Quantity
+        # raw values are ft and degrees
+        self.alt_SI = self.alt.m_as(unit.m) if isinstance(self.alt, Quantity) else self.alt * FT
+        self.lat_SI = self.lat.m_as(unit.rad) if isinstance(self.lat, Quantity) else math.radians(self.lat)
+        self.lon_SI = self.lon.m_as(unit.rad) if isinstance(self.lon, Quantity) else math.radians(self.lon)
+        self.alt = self.alt_SI * unit.m
+        self.lat = self.lat_SI * unit.rad
+        self.lon = self.lon_SI * unit.rad
 
     def __str__(self):
         return  f"name={self.name} alt={(self.alt.to(unit.ft))}\n"+\
@@ -79,8 +95,26 @@ class Fix:
     def spd(self) -> Quantity:
         return self._spd
 
-dummy_fix = Fix("None", -1, -1, -1, float('inf'))
-dummy_fix._flight_phase = FlightPhase.NULL
+    @property
+    def dist_to_next(self) -> Quantity:
+        return self.dist_SI * unit.m
+
+    @dist_to_next.setter
+    def dist_to_next(self, value: Quantity) -> None:
+        self.dist_SI = value.m_as(unit.m)
+
+@cache
+def _dummy_fix() -> Fix:
+    fix = Fix("None", -1, -1, -1, float('inf'))
+    fix._flight_phase = FlightPhase.NULL
+    return fix
+
+
+def __getattr__(name: str):
+    # built on first use, a Fix needs the unit registry
+    if name == "dummy_fix":
+        return _dummy_fix()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class IFFPL(list[Fix]):
     good_fpl: bool = True
@@ -99,9 +133,10 @@ class IFFPL(list[Fix]):
                         else:
                             yield from (item.get("name"), item.get("identifier"))
                 
-                cls.good_fpl =  {"toc", "tod"}.issubset(map(str.lower, filter(None, extract_names_identifiers(detailFPL))))
+                good_fpl = {"toc", "tod"}.issubset(map(str.lower, filter(None, extract_names_identifiers(detailFPL))))
             else:
                 detailFPL = flight_plan_data
+                good_fpl = cls.good_fpl
         except (TypeError, KeyError):
             detailFPL = False
         if not detailFPL:
@@ -112,7 +147,7 @@ class IFFPL(list[Fix]):
             with open("logs/fpl.json", "w") as f:
                 dump(str_decoded, f, indent=4)
 
-        return cls(detailFPL)
+        return cls(detailFPL, good_fpl)
     
     # @classmethod
     # def from_list(cls, flight_plan_data: list, write: bool = False) -> "IFFPL":
@@ -135,19 +170,22 @@ class IFFPL(list[Fix]):
                         yield from extract_names_identifiers(item.get("children"))
                     else:
                         yield from (str(item.get("name")), str(item.get("identifier")))
-            cls.good_fpl =  {"toc", "tod"}.issubset(map(str.lower, extract_names_identifiers(fpl_tmp)))
+            good_fpl = {"toc", "tod"}.issubset(map(str.lower, extract_names_identifiers(fpl_tmp)))
         except (TypeError, KeyError) as e:
             logger.warning("No flight plan defined", exc_info=True)
             return None
         if write: ...
-        return cls(fpl_tmp)
+        return cls(fpl_tmp, good_fpl)
 
     def __new__(cls, *args, **kwargs) -> "IFFPL":
         if not hasattr(cls, "_allow_creation") or not cls._allow_creation:
             raise TypeError("IFFPL can't be initialized directly")
         return super().__new__(cls)
 
-    def __init__(self, data: list[Fix | dict[str,]]) -> "IFFPL":
+    def __init__(self, data: list[Fix | dict[str,]], good_fpl: bool | None = None) -> "IFFPL":
+        # per plan: several plans may be parsed at the same time by the flights of a ClientPool
+        if good_fpl is not None:
+            self.good_fpl = good_fpl
         if all(isinstance(i, dict) for i in data):
             self.json_init(data)
         else:
@@ -182,6 +220,7 @@ class IFFPL(list[Fix]):
         if self.good_fpl:
             from .Simbrief import Simbrief_FPL, request_str_usernames
             from .Simbrief.navlog import Simbrief_Fix
+            import requests
             # retrieve simbrief data
             response = requests.get(request_str_usernames)
             match response.status_code:
@@ -195,7 +234,7 @@ class IFFPL(list[Fix]):
             if not ({simbrief_fpl.origin.name, simbrief_fpl.destination.name}.issubset(map(lambda x: x.name, self))):
                 logger.error("Simbrief data not compatible with the flight plan")
                 for fix_1, fix_2 in pairwise(self):
-                    fix_1.dist_to_next = cosine_law(fix_1, fix_2)
+                    fix_1.dist_SI = cosine_law_SI(fix_1, fix_2)
                 return
             # else
             for fix in self[1:-1]:
@@ -207,7 +246,7 @@ class IFFPL(list[Fix]):
                 # setting fix altitude
                 # fix.alt = smbrf_wp.alt
                 # setting fix speed
-                if round(fix.alt.m_as(unit.ft)) > 28000:
+                if round(fix.alt_SI / FT) > 28000:
                     fix._spd = smbrf_wp.mach
                 else:
                     fix._spd = smbrf_wp.ias
@@ -215,13 +254,13 @@ class IFFPL(list[Fix]):
                 fix.dist_to_next = smbrf_wp.distance
 
         else:
-            copy = [fix for fix in self if fix.alt > 0]
+            copy = [fix for fix in self if fix.alt_SI > 0]
             # TODO: check if it works properly
-            copy = sorted(copy, key=lambda x: (x.alt, x.index), reverse=True)
+            copy = sorted(copy, key=lambda x: (x.alt_SI, x.index), reverse=True)
             tmp: set[Fix] = set()
             tmp.add(copy[0])
             for fix1, fix2 in pairwise(copy):
-                if fix2.alt - fix1.alt <= 2000*unit.ft:
+                if fix2.alt_SI - fix1.alt_SI <= 2000*FT:
                 # if isclose(fix1.alt - fix2.alt, 2000*unit.ft, abs_tol=1e-9, rel_tol=1e-9):
                     tmp.add(fix1)
                     tmp.add(fix2)
@@ -231,12 +270,12 @@ class IFFPL(list[Fix]):
             
             if len(tmp_list) == 1:
                 cruise_start = tmp_list[0].index + 1
-                cruise_finish = max(self[cruise_start:], key=lambda x: x.alt).index
+                cruise_finish = max(self[cruise_start:], key=lambda x: x.alt_SI).index
 
             else:
                 tmp_list.sort(key=lambda x: x.index)
                 cruise_start = tmp_list[0].index
-                cruise_finish = max(self[tmp_list[-1].index+1:], key=lambda x: x.alt).index
+                cruise_finish = max(self[tmp_list[-1].index+1:], key=lambda x: x.alt_SI).index
 
             for fix in self:
                 if fix.index < cruise_start:
@@ -247,10 +286,10 @@ class IFFPL(list[Fix]):
                     fix._flight_phase = FlightPhase.DESCENT
 
             for fix_1, fix_2 in pairwise(self):
-                fix_1.dist_to_next = cosine_law(fix_1, fix_2)
+                fix_1.dist_SI = cosine_law_SI(fix_1, fix_2)
 
     def vnav_wps(self, start: int = 0) -> tuple[Fix]:
-        return tuple(filter(lambda x: x.alt > 0, self[start:]))
+        return tuple(filter(lambda x: x.alt_SI > 0, self[start:]))
 
     def update(self, aircraft: 'Aircraft'):
         tmp = self.from_str(aircraft.client.send_command("full_info"), write=True)
@@ -264,30 +303,30 @@ class IFFPL(list[Fix]):
         return self[index]
 
     def next_clb_wp(self, index: int) -> Fix:
-        return next(filter(lambda x: x.flight_phase in {FlightPhase.CRUISE, FlightPhase.CLIMB} and x.alt > 0, self[index:]), dummy_fix)
+        return next(filter(lambda x: x.flight_phase in {FlightPhase.CRUISE, FlightPhase.CLIMB} and x.alt_SI > 0, self[index:]), _dummy_fix())
 
 def angle_between_3_fix(fix1: Fix, fix2: Fix, fix3: Fix):
     p1 = array(
         [
-            cos(fix1.lat) * cos(fix1.lon),
-            cos(fix1.lat) * sin(fix1.lon),
-            sin(fix1.lat),
+            cos(fix1.lat_SI) * cos(fix1.lon_SI),
+            cos(fix1.lat_SI) * sin(fix1.lon_SI),
+            sin(fix1.lat_SI),
         ]
     )
 
     p2 = array(
         [
-            cos(fix2.lat) * cos(fix2.lon),
-            cos(fix2.lat) * sin(fix2.lon),
-            sin(fix2.lat),
+            cos(fix2.lat_SI) * cos(fix2.lon_SI),
+            cos(fix2.lat_SI) * sin(fix2.lon_SI),
+            sin(fix2.lat_SI),
         ]
     )
 
     p3 = array(
         [
-            cos(fix3.lat) * cos(fix3.lon),
-            cos(fix3.lat) * sin(fix3.lon),
-            sin(fix3.lat),
+            cos(fix3.lat_SI) * cos(fix3.lon_SI),
+            cos(fix3.lat_SI) * sin(fix3.lon_SI),
+            sin(fix3.lat_SI),
         ]
     )
 
@@ -301,9 +340,9 @@ def angle_between_3_fix(fix1: Fix, fix2: Fix, fix3: Fix):
     return min(pi - theta, theta)
 
 def get_bearing(fix1: Fix, fix2: Fix) -> float:
-    delta_lon = fix2.lon - fix1.lon
-    X = cos(fix2.lat) * sin(delta_lon)
-    Y = cos(fix1.lat) * sin(fix2.lat) - sin(fix1.lat) * cos(fix2.lat) * cos(delta_lon)
+    delta_lon = fix2.lon_SI - fix1.lon_SI
+    X = cos(fix2.lat_SI) * sin(delta_lon)
+    Y = cos(fix1.lat_SI) * sin(fix2.lat_SI) - sin(fix1.lat_SI) * cos(fix2.lat_SI) * cos(delta_lon)
     return arctan2(X, Y)
 
 def get_point(start_fix: Fix, dist: Quantity, bearing: Quantity) -> Fix:
@@ -313,34 +352,44 @@ def get_point(start_fix: Fix, dist: Quantity, bearing: Quantity) -> Fix:
     cos_d_D = cos(d_D)
     sin_d_D = sin(d_D)
     
-    lat_2 = arcsin(sin(start_fix.lat) * cos_d_D + cos(start_fix.lat) * sin_d_D * cos_bearing)
-    lon_2 = start_fix.lon + arctan2(sin_bearing * sin_d_D * cos(start_fix.lat), cos_d_D - sin(start_fix.lat) * sin(lat_2))
+    lat_2 = arcsin(sin(start_fix.lat_SI) * cos_d_D + cos(start_fix.lat_SI) * sin_d_D * cos_bearing)
+    lon_2 = start_fix.lon_SI + arctan2(sin_bearing * sin_d_D * cos(start_fix.lat_SI), cos_d_D - sin(start_fix.lat_SI) * sin(lat_2))
     return Fix("Point", -1*unit.ft, lat_2*unit.rad, lon_2*unit.rad, -1)
     
+def cosine_law_SI(fix1: Fix, fix2: Fix) -> float:
+    """great circle distance in m"""
+    phi_1 = fix1.lat_SI
+    phi_2 = fix2.lat_SI
+    delta_lambda = fix2.lon_SI - fix1.lon_SI
+    # rounding can push the cosine of two close fixes above 1
+    return math.acos(min(1.0, math.sin(phi_1) * math.sin(phi_2) + math.cos(phi_1) * math.cos(phi_2) * math.cos(delta_lambda))) * EARTH_RADIUS
+
 def cosine_law(fix1: Fix, fix2: Fix) -> Quantity:
-    phi_1 = fix1.lat
-    phi_2 = fix2.lat
-    delta_lambda = fix2.lon - fix1.lon
-    R = 6371e3
-    return (
-        arccos(sin(phi_1) * sin(phi_2) + cos(phi_1) * cos(phi_2) * cos(delta_lambda))
-        * R
-    ).m*unit.m
+    return cosine_law_SI(fix1, fix2)*unit.m
 
-def dist_fix_fix(fix1: Fix, fix2: Fix, fpl: IFFPL) -> Quantity:
+def dist_fix_fix_SI(fix1: Fix, fix2: Fix, fpl: IFFPL) -> float:
+    """distance in m along the flight plan"""
     if fix1.index > fix2.index:
         fix1, fix2 = fix2, fix1
-    
-    start = fix1.index
-    end = fix2.index
-    
-    l = map(lambda x: x.dist_to_next, fpl[start:end])
-    
-    return sum(l)
+    return math.fsum(fix.dist_SI for fix in fpl[fix1.index:fix2.index])
 
-def dist_to_fix(fix: Fix, fpl: IFFPL, aircraft: 'Aircraft') -> Quantity:
-    if fix.index == aircraft.next_index:
-        return aircraft.dist_to_next
+def dist_fix_fix(fix1: Fix, fix2: Fix, fpl: IFFPL) -> Quantity:
+    return dist_fix_fix_SI(fix1, fix2, fpl)*unit.m
+
+def dist_to_fix_SI(fix: Fix, fpl: IFFPL, next_index: int, dist_to_next: float) -> float:
+    """distance in m to ``fix`` along the flight plan
+
+    Args:
+        next_index (int): index of the next waypoint of the aircraft
+        dist_to_next (float): distance of the aircraft to the next waypoint in m
+    """
+    if fix.index == next_index:
+        return dist_to_next
+    if next_index < len(fpl) and fpl[next_index].index == next_index:
+        fix_1 = fpl[next_index]
     else:
-        fix_1 = next(filter(lambda x: x.index == aircraft.next_index, fpl))
-        return dist_fix_fix(fix_1, fix, fpl) + aircraft.dist_to_next
+        fix_1 = next(filter(lambda x: x.index == next_index, fpl))
+    return dist_fix_fix_SI(fix_1, fix, fpl) + dist_to_next
+
+def dist_to_fix(fix: Fix, fpl: IFFPL, aircraft: 'Aircraft') -> Quantity:
+    return dist_to_fix_SI(fix, fpl, aircraft.next_index, aircraft.dist_to_next_SI)*unit.m
@@ -1,8 +1,59 @@
-from .client import *
-from .convertion import *
-unit: PintUnitManager = PintUnitManager()
-from .aircraft import *
-from .database import *
-from .FlightPlan import *
-from .utils import *
+"""The public names of the submodules, listed in their ``__all__``.
+
+``logger`` and ``database`` are imported with the package, the other
+submodules (most with numpy, pint or requests on their import path) the first time one
+of their names is looked up: ``from module import IFClient`` only loads
+``module.client`` (and what it imports). Pint is imported and the unit
+registry built the first time a unit of ``unit`` is used (see
+``convertion.LazyUnits``).
+"""
+from importlib import import_module
+import sys
+
+# imported with the package, ``logger`` and ``database`` would be shadowed by
+# the submodules of the same name if they were looked up lazily
 from .logger import *
+from .database import *
+
+_eager_submodules = ("logger", "database")
+# in import order after the light scheduler: looking a name up imports the
+# submodules before its own, which it mostly imports anyway
+_lazy_submodules = ("scheduler", "client", "convertion", "FlightPlan", "utils", "aircraft", "telemetry", "recorder",
+                    "pool")
+# name -> lazy submodule, filled from the ``__all__`` of the submodules imported so far
+_lazy_names: dict[str, str] = {}
+_indexed: set[str] = set()
+
+
+def _submodule_all(submodule: str) -> list[str]:
+    return import_module(f".{submodule}", __name__).__all__
+
+
+def _find(name: str) -> str | None:
+    """Lazy submodule of ``name``, imported by now."""
+    if name not in _lazy_names:
+        # the submodules already imported first, they are free to check
+        pending = sorted((submodule for submodule in _lazy_submodules if submodule not in _indexed),
+                         key=lambda submodule: f"{__name__}.{submodule}" not in sys.modules)
+        for submodule in pending:
+            _lazy_names.update(dict.fromkeys(_submodule_all(submodule), submodule))
+            _indexed.add(submodule)
+            if name in _lazy_names:
+                break
+    return _lazy_names.get(name)
+
+
+def __getattr__(name: str):
+    if name == "__all__":
+        value = [name for submodule in (*_eager_submodules, *_lazy_submodules) for name in _submodule_all(submodule)]
+    elif not name.startswith("__") and (submodule := _find(name)) is not None:
+        value = getattr(import_module(f".{submodule}", __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # next lookups don't go through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__getattr__("__all__")})
@@ -1,14 +1,26 @@
+from __future__ import annotations
 from .database import Airplane, retrive_airplane
 from .logger import debug_logger, logger
-from .client import IFClient, Node
+from .client import IFClient, Node, return_type
 from .FlightPlan import Fix, FlightPhase, IFFPL
 from .utils import id_2_icao
-from . import unit, Quantity
-from numpy import arcsin, sign, clip
+from .convertion import FT, NM, KNOT, FPM, MPM
+from .atmosphere import cas2mach, mach2cas
+from . import unit
+from numpy import arcsin, sign
 from math import isclose
-from time import sleep
+from time import monotonic
+from dataclasses import dataclass
+from typing import Callable, TYPE_CHECKING
+if TYPE_CHECKING:
+    from pint import Quantity
+    from .telemetry import Telemetry
 
 from enum import Enum, auto
+
+__all__ = ["Aircraft", "AircraftState", "Autopilot", "Autothrottle", "Flaps", "Spd", "speed_SI"]
+
+
 class Spd(Enum):
     Vr = auto()
     clb_V1 = auto()
@@ -16,13 +28,25 @@ class Spd(Enum):
     clb_V3 = auto()
     crz_V = auto()
 
+def speed_SI(value: Quantity) -> tuple[float, bool]:
+    """(m/s, False) for an airspeed, (mach number, True) for a mach number"""
+    if value.is_compatible_with(unit.ms):
+        return value.m_as(unit.ms), False
+    return value.m_as(unit.mach), True
+
+
 class Flaps:
     def __init__(self, client: 'IFClient'):
         self.client: 'IFClient' = client
         self.manifest: 'Node' = client.manifest.search("configuration", "flaps")
-        self.flap_stop = self.client.send_command("stops", self.manifest)
-        for i in range(self.flap_stop):
-            name = self.client.send_command(str(i), "name", self.manifest)
+        config = client.aircraft_config.get("flaps")
+        if config is None:
+            stops = self.client.send_command("stops", self.manifest)
+            names = self.client.send_batch((str(i), "name", self.manifest) for i in range(stops))
+            config = client.aircraft_config["flaps"] = {"stops": stops, "names": names}
+            client.save_aircraft_config()
+        self.flap_stop = config["stops"]
+        for i, name in enumerate(config["names"]):
             setattr(self, name[:-1] if len(name) > 1 else name, i)
         self._current = self.client.send_command("flaps", "state")
     
@@ -41,7 +65,70 @@ class Flaps:
     def set(self, value: int) -> None:
         self.state = value
 
+@dataclass(frozen=True, slots=True)
+class AircraftState:
+    """Immutable frame of the aircraft state, every field comes from the same batch read.
+
+    Fields not requested in ``Aircraft.snapshot`` are left to None.
+    """
+    timestamp: float
+    msl: Quantity | None = None
+    agl: Quantity | None = None
+    tas: Quantity | None = None
+    ias: Quantity | None = None
+    gs: Quantity | None = None
+    mach: Quantity | None = None
+    hdg: Quantity | None = None
+    track: Quantity | None = None
+    vs: Quantity | None = None
+    pitch: Quantity | None = None
+    accel: Quantity | None = None
+    xwind: Quantity | None = None
+    next_index: int | None = None
+    dist_to_next: Quantity | None = None
+    is_on_ground: bool | None = None
+    is_on_runway: bool | None = None
+
+    @property
+    def age(self) -> float:
+        """seconds elapsed since the frame was received"""
+        return monotonic() - self.timestamp
+
+    @property
+    def α(self) -> Quantity:
+        return self.pitch - arcsin((self.vs / self.tas).m_as(unit.no_unit))*unit.rad
+
+    @property
+    def γ(self) -> Quantity:
+        return arcsin((self.xwind / self.tas).m_as(unit.no_unit))*unit.rad
+
+    @property
+    def corrected_hdg(self) -> Quantity:
+        """heading to fly to hold the current track with the current crosswind"""
+        return self.track + self.γ
+
+
 class Aircraft:
+    # AircraftState field -> (manifest path, conversion of the raw value)
+    snapshot_fields: dict[str, tuple[tuple[str, ...], Callable]] = {
+        "msl": (("altitude_msl",), lambda v: (v*unit.ft).to(unit.m)),
+        "agl": (("altitude_agl",), lambda v: (v*unit.ft).to(unit.m)),
+        "tas": (("true_airspeed",), lambda v: v*unit.ms),
+        "ias": (("indicated_airspeed",), lambda v: v*unit.ms),
+        "gs": (("groundspeed",), lambda v: v*unit.ms),
+        "mach": (("mach_speed",), lambda v: v*unit.mach),
+        "hdg": (("heading_magnetic",), lambda v: v*unit.rad),
+        "track": (("0", "course"), lambda v: v*unit.rad),
+        "vs": (("vertical_speed",), lambda v: v*unit.mpm),
+        "pitch": (("pitch",), lambda v: v*unit.rad),
+        "accel": (("acceleration", "z"), lambda v: v*unit.mps2),
+        "xwind": (("crosswind_component",), lambda v: v*unit.ms),
+        "next_index": (("flightplan", "next_waypoint_index"), int),
+        "dist_to_next": (("flightplan", "next_waypoint_dist"), lambda v: (v*unit.nm).to(unit.m)),
+        "is_on_ground": (("is_on_ground",), bool),
+        "is_on_runway": (("is_on_runway",), bool),
+    }
+
     def __init__(self, client: IFClient) -> None:
         self.client = client
         self.manifest = self.client.manifest.search("aircraft")
@@ -53,42 +140,103 @@ class Aircraft:
                 f"Airplane {aircraft_name} not found in database"
             )
         self.Flaps = Flaps(client)    
-
+        # when set, the properties backed by a telemetry field are served from its cache
+        self.telemetry: 'Telemetry | None' = None
+
+    def _read(self, name: str, *path: str) -> return_type:
+        """Latest fresh telemetry sample of ``name`` if any, otherwise a read from the device."""
+        if self.telemetry is not None and (value := self.telemetry.latest(name)) is not None:
+            return value
+        return self.client.send_command(*path)
     
-    ## Aircrafs status
+    def snapshot(self, fields: tuple[str, ...] | None = None) -> AircraftState:
+        """Reads the state of the aircraft with a single pipelined round-trip.
+
+        Args:
+            fields (tuple[str, ...] | None): AircraftState fields to fetch, all of
+                ``snapshot_fields`` by default.
+
+        Returns:
+            AircraftState: frozen frame stamped with the receive time
+        """
+        if fields is None:
+            fields = tuple(self.snapshot_fields)
+        # all numbers: decoded in one go, then handed to the converters as plain floats
+        values = self.client.read_array(self.snapshot_fields[name][0] for name in fields).tolist()
+        timestamp = monotonic()
+        return AircraftState(
+            timestamp,
+            **{name: self.snapshot_fields[name][1](value) for name, value in zip(fields, values)}
+        )
+
+    ## Aircrafs status, the *_SI floats (m, m/s, m/s², rad) are for the control laws
+    @property
+    def msl_SI(self) -> float:
+        return self._read("msl", "altitude_msl") * FT
+
+    @property
+    def agl_SI(self) -> float:
+        return self._read("agl", "altitude_agl") * FT
+
+    @property
+    def tas_SI(self) -> float:
+        return self._read("tas", "true_airspeed")
+
+    @property
+    def ias_SI(self) -> float:
+        return self._read("ias", "indicated_airspeed")
+
+    @property
+    def gs_SI(self) -> float:
+        return self._read("gs", "groundspeed")
+
+    @property
+    def mach_SI(self) -> float:
+        return self._read("mach", "mach_speed")
+
+    @property
+    def vs_SI(self) -> float:
+        return self._read("vs", "vertical_speed") * MPM
+
+    @property
+    def accel_SI(self) -> float:
+        return self._read("accel", "acceleration", "z")
+
+    @property
+    def dist_to_next_SI(self) -> float:
+        return self._read("dist_to_next", "flightplan", "next_waypoint_dist") * NM
+
     @property
     def msl(self) -> Quantity:
-        ft = self.client.send_command("altitude_msl") * unit.ft
-        return ft.to(unit.m)
+        return self.msl_SI * unit.m
 
     @property
     def agl(self) -> Quantity:
-        ft = self.client.send_command("altitude_agl") * unit.ft
-        return ft.to(unit.m)
+        return self.agl_SI * unit.m
 
     @property
     def tas(self) -> Quantity:
-        return self.client.send_command("true_airspeed")*unit.ms
+        return self._read("tas", "true_airspeed")*unit.ms
 
     @property
     def ias(self) -> Quantity:
-        return self.client.send_command("indicated_airspeed")*unit.ms
+        return self._read("ias", "indicated_airspeed")*unit.ms
 
     @property
     def gs(self) -> Quantity:
-        return self.client.send_command("groundspeed")*unit.ms
+        return self._read("gs", "groundspeed")*unit.ms
 
     @property
     def mach(self) -> Quantity:
-        return self.client.send_command("mach_speed")*unit.mach
+        return self._read("mach", "mach_speed")*unit.mach
 
     @property
     def hdg(self) -> Quantity:
-        return self.client.send_command("heading_magnetic")*unit.rad
+        return self._read("hdg", "heading_magnetic")*unit.rad
 
     @property
     def vs(self) -> Quantity:
-        return self.client.send_command("vertical_speed") * unit.mpm
+        return self._read("vs", "vertical_speed") * unit.mpm
 
     @property
     def n1(self) -> Quantity:
@@ -117,20 +265,19 @@ class Aircraft:
 
     @property
     def pitch(self) -> Quantity:
-        return self.client.send_command("pitch")*unit.rad
+        return self._read("pitch", "pitch")*unit.rad
 
     @property
     def next_index(self) -> int:
-        return self.client.send_command("flightplan", "next_waypoint_index")
+        return self._read("next_index", "flightplan", "next_waypoint_index")
 
     @property
     def dist_to_next(self) -> Quantity:
-        Nm = self.client.send_command("flightplan", "next_waypoint_dist") * unit.nm
-        return Nm.to(unit.m)
+        return self.dist_to_next_SI * unit.m
 
     @property
     def accel(self) -> Quantity:
-        return self.client.send_command("acceleration", "z")*unit.mps2
+        return self._read("accel", "acceleration", "z")*unit.mps2
 
     @property
     def spd_change(self) -> Quantity:
@@ -142,11 +289,11 @@ class Aircraft:
 
     @property
     def is_on_runway(self) -> bool:
-        return self.client.send_command("is_on_runway")
+        return self._read("is_on_runway", "is_on_runway")
 
     @property
     def is_on_ground(self) -> bool:
-        return self.client.send_command("is_on_ground")
+        return self._read("is_on_ground", "is_on_ground")
 
     @property
     def pos(self) -> Fix:
@@ -220,9 +367,49 @@ class Autopilot:
     def __init__(self, client: IFClient) -> None:
         self.client = client
         self.manifest = self.client.manifest.search("systems", "autopilot")
+
+    ## targets as SI floats: m, m/s, m/s or mach number (see SpdMode)
+    @property
+    def Alt_SI(self) -> float:
+        return self.client.send_command("alt", "target", self.manifest)
+
+    @Alt_SI.setter
+    def Alt_SI(self, value: float) -> None:
+        self.client.write_if_changed("alt", "target", self.manifest, data=value)
+
+    @property
+    def Vs_SI(self) -> float:
+        return self.client.send_command("vs", "target", self.manifest) * MPM
+
+    @Vs_SI.setter
+    def Vs_SI(self, value: float) -> None:
+        self.client.write_if_changed("vs", "target", self.manifest, data=value / MPM)
+
+    @property
+    def Spd_SI(self) -> float:
+        return self.client.send_command("spd", "target", self.manifest)
+
+    @Spd_SI.setter
+    def Spd_SI(self, value: float) -> None:
+        self.client.write_if_changed("spd", "target", self.manifest, data=value)
+
+    def spd_in_mode(self, value: float, mach: bool, spd_mode: int | None = None) -> float:
+        """``value`` (m/s or mach number if ``mach``) in the unit of the speed mode, converted at the current altitude.
+
+        Args:
+            spd_mode (int | None): ``SpdMode`` if already read, read from the device if None
+        """
+        if spd_mode is None:
+            spd_mode = self.SpdMode
+        if bool(spd_mode) == mach:
+            return value
+        # the indicated airspeed is taken as the calibrated one
+        msl = self.client.send_command("altitude_msl") * FT
+        return float(mach2cas(value, msl) if mach else cas2mach(value, msl))
+
     @property
     def Alt(self) -> Quantity:
-        return self.client.send_command("alt", "target", self.manifest)*unit.m
+        return self.Alt_SI*unit.m
 
     @property
     def Vs(self) -> Quantity:
@@ -281,67 +468,76 @@ class Autopilot:
     @lnavOn.setter
     def lnavOn(self, value: bool):
         
-        self.client.send_command("nav", "on", self.manifest, write=True, data=value)
+        self.client.write_if_changed("nav", "on", self.manifest, data=value)
     @Alt.setter
     def Alt(self, value: Quantity) -> None:
-        self.client.send_command("alt", "target", self.manifest, write=True, data=value.m_as(unit.m))
+        self.Alt_SI = value.m_as(unit.m)
 
     @Vs.setter
     def Vs(self, value: Quantity) -> None:
-        self.client.send_command("vs", "target", self.manifest, write=True, data=value.m_as(unit.mpm))
+        self.Vs_SI = value.m_as(unit.ms)
 
     @Spd.setter
     def Spd(self, value: Quantity) -> None:
-        if self.SpdMode:
-            value = value.m_as(unit.mach)
-        else:
-            value = value.m_as(unit.ms)
-        self.client.send_command("spd", "target", self.manifest, write=True, data=value)
+        # the target is a mach number in mach mode, an airspeed otherwise
+        self.Spd_SI = self.spd_in_mode(*speed_SI(value))
 
     @Hdg.setter
     def Hdg(self, value: Quantity) -> None:
-        self.client.send_command("hdg", "target", self.manifest, write=True, data=value.m_as(unit.rad))
+        self.client.write_if_changed("hdg", "target", self.manifest, data=value.m_as(unit.rad))
 
     @SpdOn.setter
     def SpdOn(self, value: bool) -> None:
-        if self.SpdOn != value:
-            self.client.send_command("spd", "on", self.manifest, write=True, data=value)
+        self.client.write_if_changed("spd", "on", self.manifest, data=value)
 
     @AltOn.setter
     def AltOn(self, value: bool) -> None:
-        self.client.send_command("alt", "on", self.manifest, write=True, data=value)
+        self.client.write_if_changed("alt", "on", self.manifest, data=value)
 
     @VsOn.setter
     def VsOn(self, value: bool) -> None:
-        self.client.send_command("vs", "on", self.manifest, write=True, data=value)
+        self.client.write_if_changed("vs", "on", self.manifest, data=value)
 
     @HdgOn.setter
     def HdgOn(self, value: bool) -> None:
-        self.client.send_command("hdg", "on", self.manifest, write=True, data=value)
+        self.client.write_if_changed("hdg", "on", self.manifest, data=value)
 
     @BankOn.setter
     def BankOn(self, value: bool) -> None:
-        self.client.send_command("bank", "on", self.manifest, write=True, data=value)
+        self.client.write_if_changed("bank", "on", self.manifest, data=value)
     
     @Bank.setter
     def Bank(self, value: Quantity) -> None:
-        self.client.send_command("bank", "target", self.manifest, write=True, data=value.m_as(unit.rad))
+        self.client.write_if_changed("bank", "target", self.manifest, data=value.m_as(unit.rad))
 
 
 class Autothrottle:
 
     # initializer
-    def __init__(self, aircraft: Aircraft, autopilot: Autopilot, fpl: IFFPL| None = None, inputs: dict=None) -> None:
+    def __init__(self, aircraft: Aircraft, autopilot: Autopilot, fpl: IFFPL| None = None, inputs: dict=None, flex: str | None = None) -> None:
+        """
+        Args:
+            inputs (dict | None): Spd -> target speed, asked on the console if None
+            flex (str | None): take off FLEX setting as typed at the prompt ("DTO-TEMP", "TEMP"
+                or a fraction of the thrust), asked on the console if None
+        """
         self.client = aircraft.client
         self.manifest = self.client.manifest.search("simulator")
         self.aircraft = aircraft
         self.autopilot = autopilot
         self.fpl = fpl
         self.reached_target = False
-        self.current_spd = None
-        self.current_acc = None
-        self.target_acc = 9 * unit.mps2  # ~1.1 knot/s
-        self._target_spd: Quantity = None
+        # take off thrust set, the take off is checked on every tick until the gear is up
+        self._takeoff_thrust = False
+        # SI floats: m/s or mach number, acceleration/z * -1e3
+        self.current_spd: float | None = None
+        self.current_acc: float | None = None
+        self.target_acc = 9.0  # ~1.1 knot/s
+        # s between two calls: the throttle steps of calc_delta_throttle are per second
+        self.period = 1.0
+        # m/s or mach number (target_mach)
+        self.target_SI: float | None = None
+        self.target_mach = False
         self.flight_phase = FlightPhase.TAKE_OFF if aircraft.is_on_ground else fpl.next_wp(aircraft.next_index).flight_phase
         # setting inputs
         if inputs is None:
@@ -374,6 +570,10 @@ class Autothrottle:
                         print("Invalid input. Please enter a valid number.")
         else:
             self.inputs = inputs
+        from pint import Quantity
+        self.inputs_SI: dict[Spd, tuple[float, bool]] = {
+            attr: speed_SI(value) for attr, value in self.inputs.items() if isinstance(value, Quantity)
+        }
 
         # setting Take Off parameters
         passed = False
@@ -381,8 +581,10 @@ class Autothrottle:
             self.TO_setting = 0.9
             if (Vr := self.inputs.get("Vr", "")):
                 self.autopilot.Spd = Vr*unit.knot
-            while not (Flex := input("Flex temp: ")):
-                print("Invalid input")
+            Flex = flex
+            while not Flex:
+                if not (Flex := input("Flex temp: ")):
+                    print("Invalid input")
             match Flex.split('-'):
                 case (dto, temp):
                     dto = int(dto)
@@ -403,7 +605,7 @@ class Autothrottle:
                 except (AttributeError, TypeError): ...
             logger.info(f"Take Off setting: {self.TO_setting:02f}")
 
-        self.above_10k = self.aircraft.msl > 10_000*unit.ft
+        self.above_10k = self.aircraft.msl_SI > 10_000*FT
 
         match self.flight_phase:
             case FlightPhase.TAKE_OFF:
@@ -427,49 +629,52 @@ class Autothrottle:
             case FlightPhase.DESCENT:
                 pass
 
-    def __setattr__(self, name, value: Quantity):
-        if not isinstance(value, Quantity):
-            super().__setattr__(name, value)
-            return
-        if value.is_compatible_with(unit.knot):
-            value = value.to(unit.ms)
-        elif value.is_compatible_with(unit.mps2):
-            value = value.to(unit.mps2)
-        elif value.units == unit.mach:
-            value = value.to(unit.mach)
-        super().__setattr__(name, value)
+    @property
+    def throttle_SI(self) -> float:
+        """throttle position from 0 (idle) to 1 (full)"""
+        return (1000 - self.client.send_command("throttle", self.manifest)) / 2000
 
+    @throttle_SI.setter
+    def throttle_SI(self, value: float) -> None:
+        # the resolution of the device (1/2000), the steps of a fast loop are small
+        value = min(max(value, 0), 1)
+        self.client.write_if_changed("throttle", self.manifest, data=round(-2000 * value + 1000))
 
     @property
     def Throttle(self) -> Quantity:
-        value = self.aircraft.client.send_command("throttle", self.manifest)
-        return round((1000 - value) / 2000, 2)*unit.no_unit
+        return self.throttle_SI*unit.no_unit
     
     @Throttle.setter
     def Throttle(self, value: Quantity) -> None:
+        from pint import Quantity
         if isinstance(value, Quantity) and value.is_compatible_with(unit.no_unit):
             value = value.m
         elif isinstance(value, float):
             value = round(value, 2)
         else:
             raise ValueError("Invalid value")
-        value = clip(value, 0, 1)
-        value = int(-2000 * value + 1000)
-        self.client.send_command("throttle", self.manifest, write=True, data=value)
+        self.throttle_SI = value
 
 
     @property
-    def target_spd(self) -> Quantity:
-        return self._target_spd
+    def target_spd(self) -> Quantity | None:
+        if self.target_SI is None:
+            return None
+        return self.target_SI * (unit.mach if self.target_mach else unit.ms)
     
     @target_spd.setter
     def target_spd(self, value: Quantity) -> None:
-        if self.target_spd != value:
-            self._target_spd = value
-            self.autopilot.Spd = value
-            self.reached_target = False
-            self.autopilot.SpdOn = False
-            logger.info(f"Target speed changed to {value.to(unit.knot) if value.units.is_compatible_with(unit.knot) else f"M{value.m: .2f}"}")
+        self.set_target_SI(*speed_SI(value))
+
+    def set_target_SI(self, value: float, mach: bool) -> None:
+        """Sets the target speed in m/s or as a mach number (``mach``)."""
+        if value == self.target_SI and mach == self.target_mach:
+            return
+        self.target_SI, self.target_mach = value, mach
+        self.autopilot.Spd_SI = self.autopilot.spd_in_mode(value, mach)
+        self.reached_target = False
+        self.autopilot.SpdOn = False
+        logger.info(f"Target speed changed to {f'M{value:.2f}' if mach else f'{value / KNOT:.0f} knot'}")
 
     def __call__(self) -> None:
         try:
@@ -485,77 +690,83 @@ class Autothrottle:
         except Exception:...
     
     def _change_spd_climb(self) -> None:
-        spd_tol = 0.01 if self.autopilot.SpdMode else (3*unit.knot).to(unit.ms).m
-        if self.autopilot.SpdMode:
-            self.current_spd = self.aircraft.mach
-            if not isclose(self.current_spd.m, self.target_spd.m, abs_tol=spd_tol) and not self.reached_target:
-                delta_throttle = self.calc_delta_throttle()
-                debug_logger.debug(f"Delta throttle: {delta_throttle}")
+        spd_mode = self.autopilot.SpdMode
+        spd_tol = 0.01 if spd_mode else 3*KNOT
+        target = self.autopilot.spd_in_mode(self.target_SI, self.target_mach, spd_mode)
+        if spd_mode:
+            self.current_spd = self.aircraft.mach_SI
+            if not isclose(self.current_spd, target, abs_tol=spd_tol) and not self.reached_target:
+                delta_throttle = self.calc_delta_throttle(target)
+                debug_logger.debug("Delta throttle: %s", delta_throttle)
                 
                 if delta_throttle != 0 and not self.autopilot.SpdOn:
-                    self.Throttle += delta_throttle
+                    self.throttle_SI += delta_throttle
             else:
                 if self.reached_target:
                     self.reached_target = True
                 if not self.autopilot.SpdOn:
                     self.autopilot.SpdOn = True
         else:
-            self.current_spd = self.aircraft.ias
+            self.current_spd = self.aircraft.ias_SI
             
-            if not isclose(self.current_spd.m_as(unit.ms), self.target_spd.m_as(unit.ms), abs_tol=spd_tol) and not self.reached_target:
-                delta_throttle = self.calc_delta_throttle()
-                debug_logger.debug(f"Delta throttle: {delta_throttle}")
+            if not isclose(self.current_spd, target, abs_tol=spd_tol) and not self.reached_target:
+                delta_throttle = self.calc_delta_throttle(target)
+                debug_logger.debug("Delta throttle: %s", delta_throttle)
                 if delta_throttle != 0 and not self.autopilot.SpdOn:
-                    self.Throttle += delta_throttle
+                    self.throttle_SI += delta_throttle
             else:
                 self.reached_target = True
                 if not self.autopilot.SpdOn:
                     self.autopilot.SpdOn = True
 
     def _change_spd_descend(self) -> None:
-        self.current_spd = self.aircraft.mach if self.autopilot.SpdMode else self.aircraft.ias
-        spd_tol = 0.01 if self.autopilot.SpdMode else (3*unit.knot).m_as(unit.ms)
+        spd_mode = self.autopilot.SpdMode
+        self.current_spd = self.aircraft.mach_SI if spd_mode else self.aircraft.ias_SI
+        spd_tol = 0.01 if spd_mode else 3*KNOT
+        target = self.autopilot.spd_in_mode(self.target_SI, self.target_mach, spd_mode)
 
-        if self.Throttle <= 0 and self.current_acc >= 0:
-            self.autopilot.Vs += 100  # Increase vertical speed to counter acceleration
+        if self.throttle_SI <= 0 and self.current_acc >= 0:
+            self.autopilot.Vs_SI += 100*FPM  # Increase vertical speed to counter acceleration
 
-        if not isclose(self.current_spd.m, self.target_spd.m, abs_tol=spd_tol) and not self.reached_target:
-            delta_throttle = self.calc_delta_throttle()
-            debug_logger.debug(f"Delta throttle: {delta_throttle}")
+        if not isclose(self.current_spd, target, abs_tol=spd_tol) and not self.reached_target:
+            delta_throttle = self.calc_delta_throttle(target)
+            debug_logger.debug("Delta throttle: %s", delta_throttle)
             if delta_throttle != 0 and not self.autopilot.SpdOn:
-                self.Throttle += delta_throttle
+                self.throttle_SI += delta_throttle
         else:
             self.reached_target = True
             self.autopilot.SpdOn = True
 
     def _change_spd_cruise(self) -> None:
         # FIXME: add support for CI
-        if isinstance(v_crz := self.inputs.get(Spd.crz_V), str):
+        if isinstance(self.inputs.get(Spd.crz_V), str):
             self.target_spd = self.fpl[self.aircraft.next_index].spd
         else:
-            self.target_spd = v_crz
+            self.set_target_SI(*self.inputs_SI[Spd.crz_V])
         ##
-        if self.autopilot.SpdMode:
+        spd_mode = self.autopilot.SpdMode
+        target = self.autopilot.spd_in_mode(self.target_SI, self.target_mach, spd_mode)
+        if spd_mode:
             spd_tol = 0.01
-            self.current_spd = self.aircraft.mach
-            if not isclose(self.current_spd.m, self.target_spd.m, abs_tol=spd_tol) and not self.reached_target:
-                delta_throttle = self.calc_delta_throttle()
-                debug_logger.debug(f"Delta throttle: {delta_throttle}")
+            self.current_spd = self.aircraft.mach_SI
+            if not isclose(self.current_spd, target, abs_tol=spd_tol) and not self.reached_target:
+                delta_throttle = self.calc_delta_throttle(target)
+                debug_logger.debug("Delta throttle: %s", delta_throttle)
 
                 if delta_throttle != 0 and not self.autopilot.SpdOn:
-                    self.Throttle += delta_throttle
+                    self.throttle_SI += delta_throttle
             else:
                 self.reached_target = True
                 if not self.autopilot.SpdOn:
                     self.autopilot.SpdOn = True
         else:
-            spd_tol = (3*unit.knot).m_as(unit.ms)
-            self.current_spd = self.aircraft.ias
-            if not isclose(self.current_spd.m_as(unit.ms), self.target_spd.m_as(unit.ms), abs_tol=spd_tol) and not self.reached_target:
-                delta_throttle = self.calc_delta_throttle()
-                debug_logger.debug(f"Delta throttle: {delta_throttle}")
+            spd_tol = 3*KNOT
+            self.current_spd = self.aircraft.ias_SI
+            if not isclose(self.current_spd, target, abs_tol=spd_tol) and not self.reached_target:
+                delta_throttle = self.calc_delta_throttle(target)
+                debug_logger.debug("Delta throttle: %s", delta_throttle)
                 if delta_throttle != 0 and not self.autopilot.SpdOn:
-                    self.Throttle += delta_throttle
+                    self.throttle_SI += delta_throttle
             else:
                 self.reached_target = True
                 if not self.autopilot.SpdOn:
@@ -563,12 +774,12 @@ class Autothrottle:
 
     def _take_off(self) -> None:
         if self.aircraft.n1 < 0.5*unit.no_unit or (not self.aircraft.is_on_runway and self.aircraft.is_on_ground):
-            sleep(1)
             return
-        self.Throttle = self.TO_setting
-        logger.info(f"Starting takeoff\nTO n1:{self.aircraft.n1_target:.2f}")
-        if self.aircraft.is_on_ground or (self.aircraft.agl < 50*unit.ft and self.aircraft.vs < 0*unit.fpm): 
-            sleep(1)
+        if not self._takeoff_thrust:
+            self._takeoff_thrust = True
+            self.Throttle = self.TO_setting
+            logger.info(f"Starting takeoff\nTO n1:{self.aircraft.n1_target:.2f}")
+        if self.aircraft.is_on_ground or (self.aircraft.agl_SI < 50*FT and self.aircraft.vs_SI < 0): 
             return
         debug_logger.debug("Takeoff")
         if not self.aircraft.landing_gear_status:
@@ -583,16 +794,17 @@ class Autothrottle:
 
 
 
-    def calc_delta_throttle(self) -> Quantity:
-        self.current_acc = self.aircraft.accel * -1e3
-        if isclose(self.current_acc.m, self.target_acc.m, abs_tol=5e-1, rel_tol=5e-2):
+    def calc_delta_throttle(self, target: float) -> float:
+        """Throttle step towards ``target``, in the unit of ``current_spd`` (see ``Autopilot.spd_in_mode``)."""
+        self.current_acc = self.aircraft.accel_SI * -1e3
+        if isclose(self.current_acc, self.target_acc, abs_tol=5e-1, rel_tol=5e-2):
             return 0
 
-        delta_spd = self.target_spd - self.current_spd
-        delta_acc = sign(delta_spd)*(self.target_acc - self.current_acc).m
-        debug_logger.debug(f"Delta acc: {delta_acc}")
+        delta_spd = target - self.current_spd
+        delta_acc = sign(delta_spd)*(self.target_acc - self.current_acc)
+        debug_logger.debug("Delta acc: %s", delta_acc)
 
-        delta = sign(delta_acc) * (0.05 if abs(delta_acc) > abs(self.target_acc.m*.5) else 0.01)
-        debug_logger.debug(f"Delta: {delta_acc}")
-        debug_logger.debug(f"delta_throttle: {delta}")
+        delta = sign(delta_acc) * (0.05 if abs(delta_acc) > abs(self.target_acc*.5) else 0.01) * self.period
+        debug_logger.debug("Delta: %s", delta_acc)
+        debug_logger.debug("delta_throttle: %s", delta)
         return delta
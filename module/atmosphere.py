@@ -0,0 +1,184 @@
+"""International Standard Atmosphere and airspeed conversions.
+
+Every function takes scalars or numpy arrays (broadcast together like a ufunc)
+in SI units: altitudes are geopotential (pressure) altitudes in m, speeds in
+m/s. The layers go from -610 m (-2000 ft, the troposphere extended below sea
+level) up to 84852 m, the airspeed conversions are the subsonic compressible
+ones used by air data computers.
+
+    tas = cas2tas(array([250, 310, 310]) * KNOT, array([3000, 8000, 10000]))
+
+``AtmosphereTable`` trades some precision for speed with tables sampled every
+``step`` m and linear interpolation.
+"""
+from numpy import ndarray, asarray, searchsorted, clip, where, exp, log, sqrt, arange, interp, float64
+from math import floor
+
+type array_like = float | ndarray
+
+G0 = 9.80665
+R = 287.05287       # J/(kg K), dry air
+GAMMA = 1.4
+T0 = 288.15         # K
+P0 = 101_325.0      # Pa
+RHO0 = P0 / (R * T0)
+A0 = (GAMMA * R * T0) ** .5
+
+# base geopotential altitude (m) and temperature lapse rate (K/m) of every layer
+LAYERS = asarray([0, 11_000, 20_000, 32_000, 47_000, 51_000, 71_000], dtype=float64)
+LAPSE = asarray([-0.0065, 0, 0.001, 0.0028, 0, -0.0028, -0.002], dtype=float64)
+TOP = 84_852.0
+# the troposphere goes on below sea level (low airfields, high QNH)
+BOTTOM = -610.0
+
+
+def _bases() -> tuple[ndarray, ndarray]:
+    """temperature and pressure at the base of every layer"""
+    temperatures, pressures = [T0], [P0]
+    for i in range(len(LAYERS) - 1):
+        T, p, L, h = temperatures[-1], pressures[-1], LAPSE[i], LAYERS[i + 1] - LAYERS[i]
+        T_top = T + L * h
+        pressures.append(p * exp(-G0 * h / (R * T)) if L == 0 else p * (T_top / T) ** (-G0 / (R * L)))
+        temperatures.append(T_top)
+    return asarray(temperatures), asarray(pressures)
+
+
+T_BASE, P_BASE = _bases()
+# lapse rates with 1 in the isothermal layers, so that the unused branch of ``where`` doesn't divide by 0
+_LAPSE_SAFE = where(LAPSE == 0, 1, LAPSE)
+
+
+def isa(alt: array_like) -> tuple[array_like, array_like, array_like]:
+    """Temperature (K), pressure (Pa) and density (kg/m³) at ``alt``, clipped to -610 - 84852 m."""
+    h = clip(alt, BOTTOM, TOP)
+    i = clip(searchsorted(LAYERS, h, side="right") - 1, 0, None)
+    T_b, L, dh = T_BASE[i], LAPSE[i], h - LAYERS[i]
+    T = T_b + L * dh
+    p = P_BASE[i] * where(L == 0, exp(-G0 * dh / (R * T_b)), (T / T_b) ** (-G0 / (R * _LAPSE_SAFE[i])))
+    return T, p, p / (R * T)
+
+
+def temperature(alt: array_like) -> array_like:
+    return isa(alt)[0]
+
+
+def pressure(alt: array_like) -> array_like:
+    return isa(alt)[1]
+
+
+def density(alt: array_like) -> array_like:
+    return isa(alt)[2]
+
+
+def speed_of_sound(alt: array_like) -> array_like:
+    return sqrt(GAMMA * R * temperature(alt))
+
+
+## conversions at a given static pressure, shared with AtmosphereTable
+def _cas2mach(cas: array_like, p: array_like) -> array_like:
+    # impact pressure of the calibrated airspeed, then the mach number that gives it at ``p``
+    qc = P0 * ((1 + 0.2 * (asarray(cas) / A0) ** 2) ** 3.5 - 1)
+    return sqrt(5 * ((qc / p + 1) ** (2 / 7) - 1))
+
+
+def _mach2cas(mach: array_like, p: array_like) -> array_like:
+    qc = p * ((1 + 0.2 * asarray(mach) ** 2) ** 3.5 - 1)
+    return A0 * sqrt(5 * ((qc / P0 + 1) ** (2 / 7) - 1))
+
+
+def tas2mach(tas: array_like, alt: array_like) -> array_like:
+    return tas / speed_of_sound(alt)
+
+
+def mach2tas(mach: array_like, alt: array_like) -> array_like:
+    return mach * speed_of_sound(alt)
+
+
+def cas2mach(cas: array_like, alt: array_like) -> array_like:
+    return _cas2mach(cas, pressure(alt))
+
+
+def mach2cas(mach: array_like, alt: array_like) -> array_like:
+    return _mach2cas(mach, pressure(alt))
+
+
+def cas2tas(cas: array_like, alt: array_like) -> array_like:
+    T, p, _ = isa(alt)
+    return _cas2mach(cas, p) * sqrt(GAMMA * R * T)
+
+
+def tas2cas(tas: array_like, alt: array_like) -> array_like:
+    T, p, _ = isa(alt)
+    return _mach2cas(tas / sqrt(GAMMA * R * T), p)
+
+
+def eas2tas(eas: array_like, alt: array_like) -> array_like:
+    return eas / sqrt(density(alt) / RHO0)
+
+
+def tas2eas(tas: array_like, alt: array_like) -> array_like:
+    return tas * sqrt(density(alt) / RHO0)
+
+
+def crossover_altitude(cas: array_like, mach: array_like) -> array_like:
+    """Altitude (m, troposphere or tropopause) where ``cas`` and ``mach`` are the same true airspeed."""
+    # pressure at which the impact pressure of ``cas`` gives ``mach``
+    qc = P0 * ((1 + 0.2 * (asarray(cas) / A0) ** 2) ** 3.5 - 1)
+    p = qc / ((1 + 0.2 * asarray(mach) ** 2) ** 3.5 - 1)
+    tropopause = p < P_BASE[1]
+    troposphere = T0 / -LAPSE[0] * (1 - (p / P0) ** (R * -LAPSE[0] / G0))
+    stratosphere = LAYERS[1] - R * T_BASE[1] / G0 * log(p / P_BASE[1])
+    return where(tropopause, stratosphere, troposphere)
+
+
+class AtmosphereTable:
+    """ISA sampled every ``step`` m from about -610 m to ``top``, read with linear interpolation.
+
+    Same conversions as the module functions, for speed profiles over many
+    altitudes: ``interp`` on the tables is cheaper than the layer formulas.
+
+    Args:
+        step (float): sampling step in m
+        top (float): highest altitude of the tables in m, the values above are the ones at ``top``
+    """
+    def __init__(self, step: float = 50.0, top: float = 20_000.0) -> None:
+        # sea level is a sample
+        self.altitudes = arange(-floor(-BOTTOM / step) * step, top + step, step, dtype=float64)
+        self.temperatures, self.pressures, self.densities = isa(self.altitudes)
+        self.sound_speeds = sqrt(GAMMA * R * self.temperatures)
+
+    def temperature(self, alt: array_like) -> array_like:
+        return interp(alt, self.altitudes, self.temperatures)
+
+    def pressure(self, alt: array_like) -> array_like:
+        return interp(alt, self.altitudes, self.pressures)
+
+    def density(self, alt: array_like) -> array_like:
+        return interp(alt, self.altitudes, self.densities)
+
+    def speed_of_sound(self, alt: array_like) -> array_like:
+        return interp(alt, self.altitudes, self.sound_speeds)
+
+    def tas2mach(self, tas: array_like, alt: array_like) -> array_like:
+        return tas / self.speed_of_sound(alt)
+
+    def mach2tas(self, mach: array_like, alt: array_like) -> array_like:
+        return mach * self.speed_of_sound(alt)
+
+    def cas2mach(self, cas: array_like, alt: array_like) -> array_like:
+        return _cas2mach(cas, self.pressure(alt))
+
+    def mach2cas(self, mach: array_like, alt: array_like) -> array_like:
+        return _mach2cas(mach, self.pressure(alt))
+
+    def cas2tas(self, cas: array_like, alt: array_like) -> array_like:
+        return _cas2mach(cas, self.pressure(alt)) * self.speed_of_sound(alt)
+
+    def tas2cas(self, tas: array_like, alt: array_like) -> array_like:
+        return _mach2cas(tas / self.speed_of_sound(alt), self.pressure(alt))
+
+    def eas2tas(self, eas: array_like, alt: array_like) -> array_like:
+        return eas / sqrt(self.density(alt) / RHO0)
+
+    def tas2eas(self, tas: array_like, alt: array_like) -> array_like:
+        return tas * sqrt(self.density(alt) / RHO0)
@@ -0,0 +1,204 @@
+from time import monotonic
+from typing import Callable
+from pathlib import Path
+from threading import RLock
+from math import inf
+import pickle
+
+from .codec import return_type
+from .logger import debug_logger
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .client import Node
+
+type command_key = tuple[int, int]
+
+
+class CommandCache:
+    """Write-through cache of the last value commanded to each (command, type).
+
+    An entry is considered stale after ``max_age`` seconds: the sim (or the
+    pilot) may have changed the value since, so it's read/written again.
+    ``clock`` gives the time in seconds (e.g. a recorded session clock).
+    """
+    def __init__(self, max_age: float = 5.0, clock: Callable[[], float] = monotonic) -> None:
+        self.max_age = max_age
+        self.clock = clock
+        self._entries: dict[command_key, tuple[return_type, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: command_key, max_age: float | None = None) -> return_type:
+        """Last commanded value, None if there isn't one or it is stale."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, timestamp = entry
+        if self.clock() - timestamp > (self.max_age if max_age is None else max_age):
+            return None
+        return value
+
+    def set(self, key: command_key, value: return_type) -> None:
+        self._entries[key] = (value, self.clock())
+
+    def changed(self, key: command_key, value: return_type, max_age: float | None = None) -> bool:
+        """True if writing ``value`` would change anything we know of."""
+        last = self.get(key, max_age)
+        return last is None or last != value
+
+    def invalidate(self, key: command_key | None = None) -> None:
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def items(self) -> list[tuple[command_key, return_type]]:
+        """Every commanded value, stale or not, oldest first."""
+        return [(key, value) for key, (value, _) in sorted(self._entries.items(), key=lambda i: i[1][1])]
+
+
+class ReadCache:
+    """Read-through cache of device values with a time to live per command.
+
+    The TTL of a command is the ``policy`` value of its manifest path:
+    ``inf`` is never read again, ``0`` is never cached.
+
+    Args:
+        policy (dict | None): manifest path -> TTL in seconds, ``default_policy`` if None
+        default_ttl (float): TTL of the commands matching no key
+        clock (Callable[[], float]): time in seconds, ``monotonic`` or a recorded session clock
+    """
+    default_policy: dict[tuple[str, ...], float] = {
+        # static for the loaded aircraft
+        ("aircraft", "0", "name"): inf,
+        ("aircraft", "0", "livery"): inf,
+        ("aircraft", "0", "configuration", "flaps", "stops"): inf,
+        # slow changing
+        ("aircraft", "0", "systems", "autopilot", "spd", "mode"): 1.0,
+        ("aircraft", "0", "systems", "flaps", "state"): 1.0,
+        ("aircraft", "0", "is_on_runway"): 2.0,
+        ("aircraft", "0", "systems", "landing_gear", "lever_state"): 2.0,
+        ("aircraft", "0", "systems", "landing_lights_controller", "state"): 2.0,
+        ("aircraft", "0", "systems", "seatbelt"): 2.0,
+        ("aircraft", "0", "oat"): 10.0,
+    }
+
+    def __init__(self, policy: dict[tuple[str, ...], float] | None = None, default_ttl: float = 0.0,
+                 clock: Callable[[], float] = monotonic) -> None:
+        self.policy = self.default_policy if policy is None else policy
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self._ttl: dict[int, float] = {}
+        self._entries: dict[int, tuple[return_type, float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / (self.hits + self.misses) if self.hits + self.misses else 0
+
+    def ttl(self, command: int, node: 'Node | None') -> float:
+        """TTL of ``command``, 0 for raw commands (no manifest node)."""
+        # not memoized without a node: the same command may be resolved later
+        if node is None:
+            return 0
+        ttl = self._ttl.get(command)
+        if ttl is None:
+            ttl = self._ttl[command] = self.policy.get(node.path, self.default_ttl)
+        return ttl
+
+    def get(self, command: int) -> return_type:
+        """Cached value, None if there isn't one or it expired."""
+        entry = self._entries.get(command)
+        if entry is not None and self.clock() < entry[1]:
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        return None
+
+    def set(self, command: int, value: return_type, ttl: float) -> None:
+        self._entries[command] = (value, self.clock() + ttl)
+
+    def invalidate(self, command: int | None = None) -> None:
+        if command is None:
+            self._entries.clear()
+            self._ttl.clear()
+        else:
+            self._entries.pop(command, None)
+
+    def invalidate_volatile(self) -> None:
+        """Drops every value that isn't static."""
+        for command in [command for command, (_, expires) in self._entries.items() if expires != inf]:
+            self._entries.pop(command, None)
+
+
+class ManifestCache:
+    """On-disk cache of the parsed manifest and of the per-aircraft configuration.
+
+    Entries are keyed by aircraft name and carry the fingerprint read from the
+    device when they were stored, the cache is only used while it still matches.
+
+    One instance can be shared by the clients of a ``ClientPool``.
+
+    Args:
+        path (Path): pickle file of the cache
+    """
+    # bumped when the pickled classes change (e.g. a new Node attribute), older files are ignored
+    version = 2
+
+    def __init__(self, path: Path = Path("./cache/manifest.pickle")) -> None:
+        self.path = path
+        self._lock = RLock()
+        self._data: dict = self._load()
+
+    def _load(self) -> dict:
+        empty = {"version": self.version, "last": None, "aircraft": {}}
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return empty
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            debug_logger.warning(f"Unreadable manifest cache {self.path}, ignoring it")
+            return empty
+        if not isinstance(data, dict) or data.get("version") != self.version:
+            debug_logger.info(f"Manifest cache {self.path} is from another version, ignoring it")
+            return empty
+        return data
+
+    def save(self) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump(self._data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(self.path)
+
+    @property
+    def last(self) -> dict | None:
+        """Entry of the last aircraft stored or loaded."""
+        return self.get(self._data["last"])
+
+    def get(self, name: str | None) -> dict | None:
+        return self._data["aircraft"].get(name)
+
+    def use(self, entry: dict) -> None:
+        with self._lock:
+            if self._data["last"] != entry["name"]:
+                self._data["last"] = entry["name"]
+                self.save()
+
+    def store(self, fingerprint: tuple[return_type, ...], manifest: 'Node', config: dict) -> dict:
+        """Stores the manifest of the aircraft identified by ``fingerprint``
+        (its first value being the aircraft name)."""
+        entry = {"name": fingerprint[0], "fingerprint": fingerprint, "manifest": manifest, "config": config}
+        with self._lock:
+            self._data["aircraft"][entry["name"]] = entry
+            self._data["last"] = entry["name"]
+            self.save()
+        return entry
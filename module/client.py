@@ -1,16 +1,28 @@
-from socket import socket, AF_INET, SOCK_STREAM, SOCK_DGRAM
+from socket import socket, AF_INET, SOCK_STREAM, IPPROTO_TCP, TCP_NODELAY, SOL_SOCKET, SO_KEEPALIVE
 from functools import wraps
 from socket import error as socket_error
-from struct import pack, unpack
-from typing import Callable
+from struct import error as struct_error
+from typing import Iterable, Callable
+from pathlib import Path
 from .logger import logger, debug_logger, command_logger
-
-from json import loads
-# import asyncio as aio
+from . import codec
+from .codec import return_type, SendBuffer
+from .cache import CommandCache, ManifestCache, ReadCache
+from .metrics import ClientStats
+from .discovery import DeviceCache, discover, listen, rank
+
+from collections import deque
+from threading import RLock
+from time import monotonic, sleep, perf_counter_ns
+from numpy import ndarray
+from weakref import WeakSet
+import atexit
+import asyncio as aio
 # import asyncudp
 
+__all__ = ["IFClient", "AsyncIFClient", "Node", "build_tree", "reconnect", "retrive_ip_port", "udp_listener",
+           "return_type"]
 
-type return_type = int | float | str | bool | None
 
 class Node:
     def __init__(self, name, parent=None):
@@ -18,11 +30,33 @@ class Node:
         self.children: dict[str, Node] = {}
         self.parent: None| Node = parent
         self.value = None
+        # only populated on the root by build_index()
+        self.index: dict[tuple[str, ...], Node] | None = None
+        self.ambiguous: set[tuple[str, ...]] = set()
+        self._resolved: dict[tuple[tuple[str, ...], tuple[str, ...]], Node | None] = {}
+        self._path: tuple[str, ...] | None = None
+        self._root: Node | None = None
+        self._str_repr: str | None = None
+
+    @property
+    def path(self) -> tuple[str, ...]:
+        """Path parts from the root (excluded) to this node."""
+        if self._path is None:
+            self._path = () if self.parent is None else self.parent.path + (self.name,)
+        return self._path
+
+    @property
+    def root(self) -> 'Node':
+        if self._root is None:
+            self._root = self if self.parent is None else self.parent.root
+        return self._root
+
     def insert(self, path_parts: list|tuple|str, data=None):
         """Inserts a path into the tree using a dictionary for fast lookups."""
         if isinstance(path_parts, str):
             path_parts = path_parts.split()
 
+        self.root.index = None
         node = self
         for part in path_parts:
             if part not in node.children:
@@ -34,8 +68,68 @@ class Node:
             except ValueError:
                 node.value = tuple(data)
 
+    def build_index(self) -> None:
+        """Indexes every node below self by its full path and by its unique path suffixes.
+
+        Full paths always win over suffixes, suffixes shared by more than one node
+        are left out of the index and reported, they are resolved by the DFS.
+        """
+        nodes: list[Node] = []
+        stack = list(self.children.values())
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(node.children.values())
+
+        index: dict[tuple[str, ...], Node] = {node.path: node for node in nodes}
+        suffixes: dict[tuple[str, ...], Node] = {}
+        ambiguous: set[tuple[str, ...]] = set()
+        for node in nodes:
+            path = node.path
+            for i in range(1, len(path)):
+                suffix = path[i:]
+                if suffix in index or suffix in ambiguous:
+                    continue
+                if suffix in suffixes and suffixes[suffix] is not node:
+                    ambiguous.add(suffix)
+                    del suffixes[suffix]
+                else:
+                    suffixes[suffix] = node
+        index.update(suffixes)
+
+        self.index = index
+        self.ambiguous = ambiguous
+        self._resolved.clear()
+        debug_logger.debug("Manifest index: %d nodes, %d paths, %d ambiguous suffixes", len(nodes), len(index), len(ambiguous))
+        if ambiguous:
+            debug_logger.debug("Ambiguous manifest suffixes: " + ", ".join(sorted("/".join(i) for i in ambiguous)))
+
     def search(self, *path_parts, current_depth=0):
-        """Searches for a node, allowing partial path matching."""
+        """Searches for a node, allowing partial path matching.
+
+        The root index is tried first (full path, then unique suffix inside this
+        subtree), the DFS only runs for paths the index can't resolve.
+        """
+        if not path_parts:
+            return self
+
+        root = self.root
+        if root.index is None:
+            return self._dfs(*path_parts, current_depth=current_depth)
+
+        index = root.index
+        if (found := index.get(self.path + path_parts)) is not None:
+            return found
+        found = index.get(path_parts)
+        if found is not None and found.path[:len(self.path)] == self.path and found is not self:
+            return found
+
+        key = (self.path, path_parts)
+        if key not in root._resolved:
+            root._resolved[key] = self._dfs(*path_parts, current_depth=current_depth)
+        return root._resolved[key]
+
+    def _dfs(self, *path_parts, current_depth=0):
         if not path_parts:
             return self
         
@@ -43,11 +137,11 @@ class Node:
 
         # Exact match in current node's children
         if first in self.children:
-            return self.children[first].search(*path_parts[1:], current_depth=current_depth + 1)
+            return self.children[first]._dfs(*path_parts[1:], current_depth=current_depth + 1)
 
         # If searching a subpath, do DFS search for partial matches
         for child in self.children.values():
-            found = child.search(*path_parts, current_depth=current_depth + 1)
+            found = child._dfs(*path_parts, current_depth=current_depth + 1)
             if found:
                 return found
 
@@ -55,12 +149,9 @@ class Node:
 
     def str_repr(self) -> str:
         """Returns the full path from root to the current node using '/' as a separator."""
-        path = []
-        node = self
-        while node:
-            path.append(node.name)
-            node = node.parent
-        return "/".join(reversed(path))
+        if self._str_repr is None:
+            self._str_repr = self.name if self.parent is None else f"{self.parent.str_repr()}/{self.name}"
+        return self._str_repr
 
     def __str__(self, level=0, prefix="") -> str:
         """Pretty prints the tree structure using dynamically generated Unicode characters."""
@@ -92,134 +183,625 @@ def build_tree(paths:str) -> Node:
     for path in paths.strip().split("\n"):
         *data, path = path.split(",")
         root.insert(path.split("/"), data)
+    root.build_index()
     return root
 
 
 def reconnect(func):
+    """Retries ``func`` on a fresh connection (see ``IFClient.reconnect``) when the socket fails."""
     @wraps(func)
     def wrapper(self: 'IFClient', *args, **kwargs):
         tries = 0
-        max_tries = 10
-        last_error = None
-        while tries <= max_tries:
+        while True:
             try:
                 return func(self, *args, **kwargs)
             except (socket_error, ConnectionError) as e:
-                debug_logger.error(f"{e}")
-                last_error = e
+                tries += 1
+                if tries > self.max_retries:
+                    debug_logger.error(f"Connection failed after {tries} consecutive tries, exiting...")
+                    raise
+                debug_logger.error(f"{e!r}, reconnecting...")
                 self.reconnect()
+    return wrapper
+
+
+def async_reconnect(func):
+    """``reconnect`` for the coroutines of AsyncIFClient (see ``AsyncIFClient.reconnect``)."""
+    @wraps(func)
+    async def wrapper(self: 'AsyncIFClient', *args, **kwargs):
+        tries = 0
+        while True:
+            generation = self.generation
+            try:
+                return await func(self, *args, **kwargs)
+            except (socket_error, ConnectionError) as e:
                 tries += 1
-        debug_logger.error(f"Connection failed after {tries} consecutive tries, exiting...")
-        raise last_error
+                if tries > self.max_retries:
+                    debug_logger.error(f"Connection failed after {tries} consecutive tries, exiting...")
+                    raise
+                debug_logger.error(f"{e!r}, reconnecting...")
+                await self.reconnect(generation)
     return wrapper
 
+# clients not closed yet, they dump their statistics at exit without being kept alive until then
+open_clients: 'WeakSet[IFClient]' = WeakSet()
+
+
+@atexit.register
+def _dump_open_clients() -> None:
+    for client in list(open_clients):
+        client.dump_stats()
+
+
 class IFClient:
-    __instance = None
+    """Connection to one device, every instance is independent (see ``ClientPool`` to drive several)."""
     command_sent = 0
     manifest = None
     total_call_time = 0
     tries = 0
-
-    read_converter: dict[int, Callable[[bytes, int], return_type]] = {
-        0: lambda x, _: unpack("<?", x)[0],
-        1: lambda x, _: unpack("<i", x)[0],
-        2: lambda x, _: unpack("<f", x)[0],
-        3: lambda x, _: unpack("<d", x)[0],
-        4: lambda x, lenght: unpack(f"<i{lenght-4}s", x)[-1].decode("utf-8"),
-        5: lambda x, _: unpack("q", x)[0],
-    }
-
-    write_converter: dict[int, Callable[[int, bool, return_type], bytes]] = {
-        0: lambda cmd, wrt, data: pack("<i??", cmd, wrt, data),
-        1: lambda cmd, wrt, data: pack("<i?i", cmd, wrt, data),
-        2: lambda cmd, wrt, data: pack("<i?f", cmd, wrt, data),
-        3: lambda cmd, wrt, data: pack("<i?d", cmd, wrt, data),
-        4: lambda cmd, wrt, data: pack(f"<i?i{len(data)}s", cmd, wrt, len(data), data),
-        5: lambda cmd, wrt, data: pack("<i?q", cmd, wrt, data),
-        -1: lambda cmd, wrt, data: pack("<i?", cmd, False),
-    }
-
-    def __new__(cls, ip: str, port: int):
-        if cls.__instance is None:
-            cls.__instance = super().__new__(cls)
-        return cls.__instance
-
-    def __init__(self, ip: str, port: int) -> None:
+    # calls retried after a reconnection
+    max_retries = 3
+    # attempts to open a new connection and the bounds (s) of the exponential backoff between them
+    reconnect_tries = 10
+    reconnect_backoff = (0.05, 2.0)
+    connect_timeout = 2.0
+
+    # commands read to tell whether a cached manifest still matches the loaded aircraft, the app
+    # version because an update can reassign the command ids of an unchanged aircraft
+    fingerprint_paths: tuple[tuple[str, ...], ...] = (
+        ("aircraft", "0", "name"),
+        ("aircraft", "0", "livery"),
+        ("infiniteflight", "app_version"),
+    )
+
+    def __init__(self, ip: str, port: int, manifest_cache: ManifestCache | None = None,
+                 transport: Callable[[], socket] | None = None, record: str | Path | None = None,
+                 clock: Callable[[], float] | None = None) -> None:
+        """
+        Args:
+            ip (str): device address
+            port (int): device port
+            manifest_cache (ManifestCache | None): on-disk manifest cache, ``./cache/manifest.pickle`` by default
+            transport (Callable[[], socket] | None): opens a connection in place of a TCP socket
+                to ``ip:port`` (e.g. ``SessionReplay(path).connect``)
+            record (str | Path | None): session file every frame sent and received is captured to
+            clock (Callable[[], float] | None): clock of the caches, ``SessionReplay.clock`` to replay
+                a session, ``monotonic`` (``SessionWriter.clock`` with ``record``) if None
+        """
         self.port = port
         self.ip = ip
-        self.sock = socket(AF_INET, SOCK_STREAM)
-        self.sock.connect((self.ip, self.port))
+        self.transport = transport
+        self.recorder = None
+        if record is not None:
+            from .session import SessionWriter
+            self.recorder = SessionWriter(record)
+        # request/response pairs must not interleave between threads (telemetry poller)
+        self.lock = RLock()
+        self._recv_buffer = bytearray(4096)
+        self._recv_view = memoryview(self._recv_buffer)
+        self._send_buffer = SendBuffer()
+        if clock is None:
+            clock = monotonic if self.recorder is None else self.recorder.clock
+        # last autopilot/throttle values commanded through write_if_changed
+        self.commanded = CommandCache(clock=clock)
+        # values that change slowly or never, see ReadCache.default_policy
+        self.read_cache = ReadCache(clock=clock)
+        self.stats = ClientStats()
+        self.command_sent = 0
+        self.total_call_time = 0
+        self.manifest_cache = ManifestCache() if manifest_cache is None else manifest_cache
+        # per-aircraft data persisted along the manifest (e.g. flaps configuration)
+        self.aircraft_config: dict = {}
+        self.sock = self._connect()
+        open_clients.add(self)
+        self.manifest = self.load_manifest()
+
+    def _connect(self) -> socket:
+        if self.transport is not None:
+            sock = self.transport()
+        else:
+            sock = socket(AF_INET, SOCK_STREAM)
+            sock.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
+            sock.setsockopt(SOL_SOCKET, SO_KEEPALIVE, 1)
+            sock.settimeout(self.connect_timeout)
+            try:
+                sock.connect((self.ip, self.port))
+            except BaseException:
+                sock.close()
+                raise
+            sock.settimeout(None)
+        if self.recorder is not None:
+            from .session import RecordingSocket
+            sock = RecordingSocket(sock, self.recorder)
+        return sock
+
+    def load_manifest(self) -> Node:
+        """Returns the cached manifest if its fingerprint matches the device, otherwise downloads it."""
+        entry = self.manifest_cache.last
+        tried = set()
+        while entry is not None and entry["name"] not in tried:
+            tried.add(entry["name"])
+            try:
+                fingerprint = self.fingerprint(entry["manifest"], timeout=1.0)
+            except (ValueError, UnicodeDecodeError, struct_error, socket_error) as e:
+                # the cached command ids may not even exist anymore, start over on a clean stream
+                debug_logger.warning(f"Cached manifest not usable: {e!r}")
+                self.sock.close()
+                self.sock = self._connect()
+                break
+            if fingerprint == entry["fingerprint"]:
+                debug_logger.info(f"Manifest of {entry['name']} loaded from cache")
+                self.manifest_cache.use(entry)
+                self.aircraft_config = entry["config"]
+                self.aircraft_fingerprint = fingerprint
+                return entry["manifest"]
+            entry = self.manifest_cache.get(fingerprint[0] if fingerprint else None)
+
         man = self.send_command(-1, 4)
-        self.manifest = build_tree(man)
+        manifest = build_tree(man)
         with open("logs/manifest.txt", "w") as f:
             f.write(man)
+        self.aircraft_fingerprint = self.fingerprint(manifest)
+        if self.aircraft_fingerprint:
+            self.aircraft_config = self.manifest_cache.store(self.aircraft_fingerprint, manifest, {})["config"]
+        return manifest
+
+    def save_aircraft_config(self) -> None:
+        """Persists ``aircraft_config`` with the cached manifest."""
+        # the cache may be shared with other clients, "last" isn't necessarily this aircraft
+        entry = self.manifest_cache.get(self.aircraft_fingerprint[0] if self.aircraft_fingerprint else None)
+        if entry is not None and entry["config"] is self.aircraft_config:
+            self.manifest_cache.save()
+
+    def fingerprint(self, manifest: Node, timeout: float | None = None) -> tuple[return_type, ...]:
+        """Cheap identity of the loaded aircraft read with the command ids of ``manifest``."""
+        resolved = [self.resolve(*path, manifest) for path in self.fingerprint_paths if manifest.search(*path) is not None]
+        with self.lock:
+            self.sock.settimeout(timeout)
+            try:
+                # always from the device: it tells whether the cached values are still valid
+                return tuple(self._batch(resolved, cached=False))
+            finally:
+                self.sock.settimeout(None)
 
-    @reconnect
-    def send_command(self, *args, write: bool = False, data: return_type = None) -> return_type:
-        def recv_exact(lenght: int) -> bytes:
-            data = b""
-            while len(data) < lenght:
-                data += self.sock.recv(lenght - len(data))
-            return data
-
-        # IFClient.command_sent += 1
+    def resolve(self, *args) -> tuple[int, int, Node | None]:
+        """Resolves a manifest path (or a raw ``(command, type)`` pair) to ``(command, type, node)``."""
         match args:
             case (cmd, tp) if all(isinstance(i, int) for i in {cmd, tp}):
-                command, Type = cmd, tp
+                return cmd, tp, None
             case (*arg, node) if isinstance(node, Node):
                 finded = node.search(*arg)
                 if finded is None:
                     raise ValueError(f"Command not found: {arg}")
-                elif finded.value is not None:
-                    command, Type = finded.value                
             case _:
                 finded = self.manifest.search(*args)
                 if finded is None:
                     raise ValueError(f"Command not found: {args}")
-                elif finded.value is not None:
-                    command, Type = finded.value
-                # command, Type = self.findfirst(*args)
+        if finded.value is None:
+            raise ValueError(f"Not a command: {finded.str_repr()}")
+        command, Type = finded.value
+        return command, Type, finded
+
+    def recv_exact(self, lenght: int) -> memoryview:
+        """Receives exactly ``lenght`` bytes into the reusable receive buffer.
+
+        The buffer only grows (doubling) when a response doesn't fit, the returned
+        view is valid until the next receive.
+        """
+        if lenght > len(self._recv_buffer):
+            self._recv_buffer = bytearray(max(lenght, 2 * len(self._recv_buffer)))
+            self._recv_view = memoryview(self._recv_buffer)
+        view = self._recv_view[:lenght]
+        received = 0
+        while received < lenght:
+            n = self.sock.recv_into(view[received:], lenght - received)
+            if not n:
+                raise ConnectionError("Connection closed by the device")
+            received += n
+        return view
+
+    def read_response(self, Type: int) -> return_type:
+        _, lenght = codec.header.unpack(self.recv_exact(codec.header.size))
+        return codec.decoders[Type](self.recv_exact(lenght), lenght)
+
+    @reconnect
+    def send_command(self, *args, write: bool = False, data: return_type = None) -> return_type:
+        command, Type, finded = self.resolve(*args)
 
         if not write:
-            self.sock.send(pack("<i?", command, write))
+            if ttl := self.read_cache.ttl(command, finded):
+                if (value := self.read_cache.get(command)) is not None:
+                    self.stats.count("cached read", finded)
+                    return value
+            with self.lock:
+                start = perf_counter_ns()
+                self.sock.sendall(codec.request.pack(command, False))
+                value = self.read_response(Type)
+                self._record("read", finded or command, perf_counter_ns() - start)
+            if ttl:
+                self.read_cache.set(command, value, ttl)
+            return value
 
-            first_response = recv_exact(8)
-            _, lenght = unpack("<ii", first_response)
+        else:
+            command_logger.info("%s(%s, %s) -> %s", finded.str_repr() if finded else command, command, Type, data)
+            self.commanded.invalidate((command, Type))
+            if Type == -1:
+                # an action (e.g. LandingGear) can change any state
+                self.read_cache.invalidate_volatile()
+            else:
+                self.read_cache.invalidate(command)
+            with self.lock:
+                start = perf_counter_ns()
+                self.sock.sendall(codec.encoders[Type](command, data))
+                self._record("write", finded or command, perf_counter_ns() - start)
 
-            second_response = recv_exact(lenght)
-            return self.__class__.read_converter.get(Type)(second_response, lenght)
+    def _record(self, kind: str, key: object, ns: int, n: int = 1) -> None:
+        self.command_sent += n
+        self.total_call_time += ns
+        self.stats.record(kind, key, ns)
 
-        else:
-            command_logger.info(f"{finded.str_repr()}({command}, {Type}) -> {data}")
-            byte_coomand = self.__class__.write_converter.get(Type)(command, write, data)
-            return self.sock.sendall(byte_coomand)
+    @reconnect
+    def send_batch(self, requests: Iterable[tuple | str]) -> list[return_type]:
+        """Reads several values with a single round-trip.
+
+        Every request packet is written with one ``sendall``, then the responses
+        are read back in the same order, so a batch costs about one RTT.
+
+        Args:
+            requests: the args that would be given to ``send_command`` for each
+                read, a plain string is taken as a one-part path.
+
+        Returns:
+            list[return_type]: the decoded values, in request order
+        """
+        return self._batch([self.resolve(*((req,) if isinstance(req, str) else req)) for req in requests])
+
+    def _batch(self, resolved: list[tuple[int, int, Node | None]], cached: bool = True) -> list[return_type]:
+        values: list[return_type] = [None] * len(resolved)
+        missing = []
+        read_cache = self.read_cache
+        for i, (command, _, finded) in enumerate(resolved):
+            if cached and read_cache.ttl(command, finded) and (value := read_cache.get(command)) is not None:
+                values[i] = value
+                self.stats.count("cached read", finded)
+            else:
+                missing.append(i)
+        if not missing:
+            return values
+        with self.lock:
+            start = perf_counter_ns()
+            send_buffer = self._send_buffer
+            send_buffer.clear()
+            send_buffer.add_reads([resolved[i][0] for i in missing])
+            self.sock.sendall(send_buffer.view())
+            for i in missing:
+                values[i] = self.read_response(resolved[i][1])
+            self._record("batch", len(missing), perf_counter_ns() - start, len(missing))
+        for i in missing:
+            command, _, finded = resolved[i]
+            self.stats.count("batched read", finded or command)
+            if cached and (ttl := read_cache.ttl(command, finded)):
+                read_cache.set(command, values[i], ttl)
+        return values
 
-    def reconnect(self):
-        self.sock.connect((self.ip, self.port))
+    @reconnect
+    def read_array(self, requests: Iterable[tuple | str]) -> ndarray:
+        """Reads several fixed-size (bool, int, float, double) values with a single
+        round-trip, decoded into one float64 array without a Python object per value.
+
+        Unlike ``send_batch`` the values are always read from the device.
+
+        Args:
+            requests (Iterable[tuple | str]): same as ``send_batch``
+
+        Returns:
+            ndarray: the values in request order
+
+        Raises:
+            ValueError: a request is not in the manifest or is a string
+        """
+        resolved = [self.resolve(*((req,) if isinstance(req, str) else req)) for req in requests]
+        decoder = codec.batch_decoder(tuple(Type for _, Type, _ in resolved))
+        if not resolved:
+            return decoder(b"")
+        with self.lock:
+            start = perf_counter_ns()
+            send_buffer = self._send_buffer
+            send_buffer.clear()
+            send_buffer.add_reads([resolved[i][0] for i in decoder.order])
+            self.sock.sendall(send_buffer.view())
+            # the receive buffer is reused, the decoder copies the values out of it
+            values = decoder(self.recv_exact(decoder.size))
+            self._record("array", len(resolved), perf_counter_ns() - start, len(resolved))
+        for command, _, finded in resolved:
+            self.stats.count("batched read", finded or command)
+        return values
+
+    def dump_stats(self) -> None:
+        """Writes the command statistics to the debug log."""
+        read_cache = self.read_cache
+        debug_logger.info(
+            f"{self.ip}:{self.port}: {self.command_sent} commands sent in {self.total_call_time/1e9:.3f} s, "
+            f"read cache {read_cache.hits} hits / {read_cache.misses} misses ({read_cache.hit_rate:.0%})\n{self.stats.report()}"
+        )
+
+    def write_if_changed(self, *args, data: return_type, max_age: float | None = None) -> bool:
+        """Write-through to ``commanded``, the write is skipped when ``data`` is the
+        value last commanded to that command and it isn't stale yet.
+
+        Returns:
+            bool: True if the write was sent
+        """
+        command, Type, _ = self.resolve(*args)
+        if not self.commanded.changed((command, Type), data, max_age):
+            return False
+        self.send_command(*args, write=True, data=data)
+        self.commanded.set((command, Type), data)
+        return True
+
+    def reconnect(self) -> None:
+        """Replaces the connection with a new socket, retrying with exponential backoff.
+
+        Once connected the manifest is checked against the device fingerprint
+        (and reloaded if the aircraft changed), then the last commanded
+        autopilot/throttle values are written again.
+
+        Raises:
+            ConnectionError: the device can't be reached after ``reconnect_tries`` attempts
+        """
+        with self.lock:
+            start = monotonic()
+            delay, max_delay = self.reconnect_backoff
+            try:
+                self.sock.close()
+            except socket_error: ...
+            # the device (or the aircraft) may have changed in the meantime
+            self.read_cache.invalidate()
+            for attempt in range(1, self.reconnect_tries + 1):
+                try:
+                    self.sock = self._connect()
+                    if self.fingerprint(self.manifest, timeout=self.connect_timeout) != self.aircraft_fingerprint:
+                        logger.warning("The aircraft changed while disconnected, reloading the manifest")
+                        self.manifest = self.load_manifest()
+                    self._replay_commanded()
+                except (socket_error, ConnectionError, ValueError, struct_error) as e:
+                    debug_logger.warning(f"Reconnection attempt {attempt} failed: {e!r}")
+                    try:
+                        self.sock.close()
+                    except socket_error: ...
+                    sleep(delay)
+                    delay = min(delay * 2, max_delay)
+                    continue
+                logger.info(f"Reconnected in {(monotonic() - start)*1e3:.0f} ms")
+                self.stats.record("reconnect", f"{self.ip}:{self.port}", int((monotonic() - start)*1e9))
+                return
+            raise ConnectionError(f"Unable to reconnect to {self.ip}:{self.port} after {self.reconnect_tries} attempts")
+
+    def _replay_commanded(self) -> None:
+        commanded = self.commanded.items()
+        if not commanded:
+            return
+        self.sock.sendall(b"".join(codec.encoders[Type](command, value) for (command, Type), value in commanded))
+        for key, value in commanded:
+            self.commanded.set(key, value)
+        debug_logger.info(f"Replayed {len(commanded)} autopilot commands")
+
+    def close(self) -> None:
+        """Dumps the statistics and closes the connection."""
+        if self in open_clients:
+            open_clients.discard(self)
+            self.dump_stats()
+        self.sock.close()
 
     def __del__(self):
-        self.sock.close()
+        # the connection may have failed in __init__
+        if (sock := getattr(self, "sock", None)) is not None:
+            sock.close()
+
 
+class AsyncIFClient:
+    """asyncio counterpart of IFClient with the same manifest and command semantics.
+
+    Any number of coroutines can await reads over the single connection: every read
+    queues a future before its request is written, and one reader task resolves the
+    futures in FIFO order as the responses arrive. When the connection drops, the
+    failed calls are retried on a new one like with IFClient (see ``reconnect``).
+    """
+    resolve = IFClient.resolve
+    max_retries = IFClient.max_retries
+    reconnect_tries = IFClient.reconnect_tries
+    reconnect_backoff = IFClient.reconnect_backoff
+    connect_timeout = IFClient.connect_timeout
+
+    def __init__(self, ip: str, port: int) -> None:
+        self.ip = ip
+        self.port = port
+        self.manifest: Node | None = None
+        self.reader: aio.StreamReader | None = None
+        self.writer: aio.StreamWriter | None = None
+        self._pending: deque[tuple[aio.Future, int]] = deque()
+        self._reader_task: aio.Task | None = None
+        # last autopilot/throttle values commanded through write_if_changed
+        self.commanded = CommandCache()
+        # connections opened so far, a coroutine only reconnects the one it saw failing
+        self.generation = 0
+        self._reconnect_lock = aio.Lock()
+
+    @classmethod
+    async def connect(cls, ip: str, port: int) -> 'AsyncIFClient':
+        self = cls(ip, port)
+        await self.open()
+        return self
+
+    async def open(self) -> None:
+        self.reader, self.writer = await aio.open_connection(self.ip, self.port)
+        self.generation += 1
+        self._reader_task = aio.create_task(self._read_loop())
+        # not send_command: a failure here must not start a reconnection from within one
+        future, = self._request([(-1, 4, None)])
+        await self.writer.drain()
+        self.manifest = build_tree(await future)
+
+    async def close(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except (aio.CancelledError, ConnectionError): ...
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (socket_error, ConnectionError): ...
+
+    async def __aenter__(self) -> 'AsyncIFClient':
+        if self.writer is None:
+            await self.open()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def reconnect(self, generation: int | None = None) -> None:
+        """Same as ``IFClient.reconnect``: a new connection with exponential backoff between the
+        attempts, the manifest is loaded again and the last values commanded through
+        ``write_if_changed`` are written again.
+
+        Args:
+            generation (int | None): connection the caller saw failing, nothing is done if another
+                coroutine replaced it in the meantime
+
+        Raises:
+            ConnectionError: the device can't be reached after ``reconnect_tries`` attempts
+        """
+        async with self._reconnect_lock:
+            if generation is not None and generation != self.generation:
+                return
+            start = monotonic()
+            delay, max_delay = self.reconnect_backoff
+            await self.close()
+            for attempt in range(1, self.reconnect_tries + 1):
+                try:
+                    await aio.wait_for(self.open(), self.connect_timeout)
+                    await self._replay_commanded()
+                except (socket_error, ConnectionError, ValueError, aio.TimeoutError) as e:
+                    debug_logger.warning(f"Reconnection attempt {attempt} failed: {e!r}")
+                    await self.close()
+                    await aio.sleep(delay)
+                    delay = min(delay * 2, max_delay)
+                    continue
+                logger.info(f"Reconnected in {(monotonic() - start)*1e3:.0f} ms")
+                return
+            raise ConnectionError(f"Unable to reconnect to {self.ip}:{self.port} after {self.reconnect_tries} attempts")
+
+    async def _replay_commanded(self) -> None:
+        commanded = self.commanded.items()
+        if not commanded:
+            return
+        self.writer.write(b"".join(codec.encoders[Type](command, value) for (command, Type), value in commanded))
+        await self.writer.drain()
+        for key, value in commanded:
+            self.commanded.set(key, value)
+        debug_logger.info(f"Replayed {len(commanded)} autopilot commands")
+
+    async def _read_loop(self) -> None:
+        error: BaseException = ConnectionError("Connection closed")
+        try:
+            while True:
+                _, lenght = codec.header.unpack(await self.reader.readexactly(codec.header.size))
+                response = await self.reader.readexactly(lenght)
+                future, Type = self._pending.popleft()
+                if future.done():
+                    continue
+                try:
+                    future.set_result(codec.decoders[Type](response, lenght))
+                except Exception as e:
+                    future.set_exception(e)
+        except (aio.IncompleteReadError, socket_error, ConnectionError) as e:
+            debug_logger.error(f"{e}")
+            error = ConnectionError(str(e))
+        finally:
+            while self._pending:
+                future, _ = self._pending.popleft()
+                if not future.done():
+                    future.set_exception(error)
+
+    def _request(self, commands: list[tuple[int, int, Node | None]]) -> list[aio.Future]:
+        if self._reader_task is None or self._reader_task.done():
+            raise ConnectionError("Not connected")
+        loop = aio.get_running_loop()
+        futures = []
+        # no await between queueing and writing: the FIFO order matches the wire order
+        for _, Type, _ in commands:
+            futures.append(loop.create_future())
+            self._pending.append((futures[-1], Type))
+        # the transport may hold on to the data, so no reusable buffer here
+        self.writer.write(b"".join(codec.request.pack(command, False) for command, _, _ in commands))
+        return futures
+
+    @async_reconnect
+    async def send_command(self, *args, write: bool = False, data: return_type = None) -> return_type:
+        command, Type, finded = self.resolve(*args)
 
+        if not write:
+            future, = self._request([(command, Type, finded)])
+            await self.writer.drain()
+            return await future
 
-def retrive_ip_port():
+        else:
+            command_logger.info("%s(%s, %s) -> %s", finded.str_repr() if finded else command, command, Type, data)
+            self.writer.write(codec.encoders[Type](command, data))
+            await self.writer.drain()
+
+    @async_reconnect
+    async def send_batch(self, requests: Iterable[tuple | str]) -> list[return_type]:
+        """Same as ``IFClient.send_batch``, other coroutines can interleave their reads."""
+        resolved = [self.resolve(*((req,) if isinstance(req, str) else req)) for req in requests]
+        if not resolved:
+            return []
+        futures = self._request(resolved)
+        await self.writer.drain()
+        return list(await aio.gather(*futures))
+
+    async def write_if_changed(self, *args, data: return_type, max_age: float | None = None) -> bool:
+        """Same as ``IFClient.write_if_changed``."""
+        command, Type, _ = self.resolve(*args)
+        if not self.commanded.changed((command, Type), data, max_age):
+            return False
+        await self.send_command(*args, write=True, data=data)
+        self.commanded.set((command, Type), data)
+        return True
+
+
+def retrive_ip_port(timeout: float | None = None) -> tuple[str, int]:
+    """Address of the best device found by ``discover``, remembered as the last known good one.
+
+    Args:
+        timeout (float | None): seconds before giving up with a ConnectionError, keep looking if None
+    """
     logger.info("Retriving IP and port...")
-    result = udp_listener()# aio.run(udp_listener(), debug=True)
-    return result
+    cache = DeviceCache()
+    start = monotonic()
+    while True:
+        remaining = None if timeout is None else max(0, start + timeout - monotonic())
+        if devices := discover(timeout=3.0 if remaining is None else min(3.0, remaining), cache=cache):
+            break
+        if remaining is not None and monotonic() - start >= timeout:
+            raise ConnectionError(f"No device found in {timeout} s")
+        logger.info("No device found, still looking...")
+    device = devices[0]
+    if device.latency is None:
+        logger.warning(f"{device.ip}:{device.port} doesn't accept connections, trying it anyway")
+    else:
+        cache.remember(device)
+    logger.info(f"Found {device.name or 'device'} at {device.ip}:{device.port} ({device.source})")
+    return device.address
 
 
 def udp_listener(ip: str='0.0.0.0', port: int=15000) -> tuple[str, int]:
-    received = False
-    with socket(AF_INET, SOCK_DGRAM) as sock:
-        sock.bind((ip, port))
-        while not received:
-            data, _ = sock.recvfrom(1024)
-            received = True
-            if data:
-                data = loads(data.decode('utf-8'))
-                return next(filter(lambda x: x.startswith("192."), data['addresses']), None), data['port']
-            else:
-                received = False
+    """Waits for a broadcast and returns the best address it announces."""
+    devices = listen(timeout=None, port=port, host=ip)
+    return min(devices, key=rank).address
 
 # async def udp_listener(ip: str='0.0.0.0', port: int=15000) -> tuple[str, int]:
 #     received = False
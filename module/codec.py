@@ -0,0 +1,172 @@
+from struct import Struct
+from functools import lru_cache
+from itertools import groupby
+from typing import Callable, Sequence
+
+from numpy import ndarray, dtype as np_dtype, frombuffer, empty, argsort, float64
+
+type return_type = int | float | str | bool | None
+
+# response header: command, payload length
+header = Struct("<ii")
+# read request / command without data: command, write flag
+request = Struct("<i?")
+string_length = Struct("<i")
+
+# manifest type -> struct of the value
+value_structs: dict[int, Struct] = {
+    0: Struct("<?"),
+    1: Struct("<i"),
+    2: Struct("<f"),
+    3: Struct("<d"),
+    5: Struct("<q"),
+}
+
+# manifest type -> struct of a write request: command, write flag, value
+write_structs: dict[int, Struct] = {
+    Type: Struct("<i?" + st.format.lstrip("<")) for Type, st in value_structs.items()
+}
+
+
+@lru_cache(maxsize=256)
+def string_write_struct(lenght: int) -> Struct:
+    """command, write flag, string length, string"""
+    return Struct(f"<i?i{lenght}s")
+
+
+def _value_decoder(st: Struct):
+    unpack_from = st.unpack_from
+    return lambda buffer, lenght, offset=0: unpack_from(buffer, offset)[0]
+
+
+def _string_decoder(buffer: bytes | bytearray | memoryview, lenght: int, offset: int = 0) -> str:
+    return str(buffer[offset + 4:offset + lenght], "utf-8")
+
+
+# manifest type -> decoder(buffer, payload length, offset) of a response payload
+decoders: dict[int, Callable[..., return_type]] = {
+    Type: _value_decoder(st) for Type, st in value_structs.items()
+}
+decoders[4] = _string_decoder
+
+
+def decode(Type: int, buffer: bytes | bytearray | memoryview, lenght: int, offset: int = 0) -> return_type:
+    """Decodes a response payload of ``lenght`` bytes starting at ``offset`` of ``buffer``."""
+    return decoders[Type](buffer, lenght, offset)
+
+
+# manifest type -> numpy dtype of the fixed-size values
+value_dtypes: dict[int, str] = {
+    0: "?",
+    1: "<i4",
+    2: "<f4",
+    3: "<f8",
+    5: "<i8",
+}
+
+
+class BatchDecoder:
+    """Decodes the responses to a batch of fixed-size reads straight into a float64 array.
+
+    The reads are sent sorted by type (``order``), so the responses of each
+    type are a run of equally sized (command, length, value) records that one
+    ``frombuffer`` turns into a strided array, there's no Python object per value.
+
+    Args:
+        types (tuple[int, ...]): manifest type of every read, in request order
+    """
+    def __init__(self, types: tuple[int, ...]) -> None:
+        if missing := [Type for Type in types if Type not in value_dtypes]:
+            raise ValueError(f"Type {missing[0]} has no fixed size")
+        self.count = len(types)
+        # request i is sent in position inverse[i]
+        self.order: list[int] = sorted(range(self.count), key=types.__getitem__)
+        self.inverse: ndarray | None = None
+        if self.order != list(range(self.count)):
+            self.inverse = argsort(self.order)
+        # (record dtype, offset in bytes, count, payload length, first position)
+        self.runs: list[tuple[np_dtype, int, int, int, int]] = []
+        offset = position = 0
+        for Type, run in groupby(types[i] for i in self.order):
+            count = len(list(run))
+            record = np_dtype([("command", "<i4"), ("length", "<i4"), ("value", value_dtypes[Type])])
+            self.runs.append((record, offset, count, value_structs[Type].size, position))
+            offset += count * record.itemsize
+            position += count
+        # bytes of all the responses
+        self.size = offset
+
+    def __call__(self, buffer: bytes | bytearray | memoryview) -> ndarray:
+        values = empty(self.count, dtype=float64)
+        for record, offset, count, lenght, position in self.runs:
+            records = frombuffer(buffer, dtype=record, count=count, offset=offset)
+            if (records["length"] != lenght).any():
+                raise ValueError("Unexpected payload length in a batch response")
+            values[position:position + count] = records["value"]
+        return values if self.inverse is None else values[self.inverse]
+
+
+@lru_cache(maxsize=64)
+def batch_decoder(types: tuple[int, ...]) -> BatchDecoder:
+    return BatchDecoder(types)
+
+
+def to_bytes(data: return_type) -> return_type:
+    return data.encode("utf-8") if isinstance(data, str) else data
+
+
+def _value_encoder(st: Struct):
+    pack = st.pack
+    return lambda command, data: pack(command, True, data)
+
+
+def _string_encoder(command: int, data: str | bytes) -> bytes:
+    data = to_bytes(data)
+    return string_write_struct(len(data)).pack(command, True, len(data), data)
+
+
+_request_pack = request.pack
+
+# manifest type -> encoder(command, data) of a write request,
+# commands without value (type -1) are always sent with the write flag off
+encoders: dict[int, Callable[[int, return_type], bytes]] = {
+    Type: _value_encoder(st) for Type, st in write_structs.items()
+}
+encoders[4] = _string_encoder
+encoders[-1] = lambda command, data: _request_pack(command, False)
+
+
+def encode(command: int, Type: int, write: bool = False, data: return_type = None) -> bytes:
+    if not write:
+        return _request_pack(command, False)
+    return encoders[Type](command, data)
+
+
+class SendBuffer:
+    """Reusable buffer the read requests of a batch are packed into (``pack_into``) before a single ``sendall``."""
+    def __init__(self, size: int = 1024) -> None:
+        self.buffer = bytearray(size)
+        self.end = 0
+
+    def clear(self) -> None:
+        self.end = 0
+
+    def _grow(self, size: int) -> None:
+        buffer = bytearray(max(size, 2 * len(self.buffer)))
+        buffer[:self.end] = self.buffer[:self.end]
+        self.buffer = buffer
+
+    def add_reads(self, commands: Sequence[int]) -> None:
+        size = request.size
+        offset = self.end
+        end = offset + size * len(commands)
+        if end > len(self.buffer):
+            self._grow(end)
+        buffer, pack_into = self.buffer, request.pack_into
+        for command in commands:
+            pack_into(buffer, offset, command, False)
+            offset += size
+        self.end = end
+
+    def view(self) -> memoryview:
+        return memoryview(self.buffer)[:self.end]
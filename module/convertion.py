@@ -1,5 +1,24 @@
-from numpy import sqrt
-from pint import UnitRegistry, Quantity
+from typing import TYPE_CHECKING
+
+from . import atmosphere
+
+if TYPE_CHECKING:
+    from pint import UnitRegistry, Quantity
+
+__all__ = ["PintUnitManager", "Quantity", "UnitRegistry", "unit", "G", "EARTH_RADIUS", "FT", "NM", "KNOT",
+           "FPM", "MPM", "decimal_to_dms", "density", "ias2tas_Aero", "ias2tas_SI", "mach2tas_Aero",
+           "mach2tas_SI", "tas2mach_Aero", "tas2mach_SI"]
+
+
+# SI conversion factors of the float core: the control laws and the flight plan
+# math work in m, m/s, m/s², rad and s, pint is only used for input and display
+G = 9.80665
+EARTH_RADIUS = 6371e3
+FT = 0.3048
+NM = 1852.0
+KNOT = NM / 3600
+FPM = FT / 60
+MPM = 1 / 60
 
 class PintUnitManager:
     _instance = None
@@ -10,7 +29,10 @@ class PintUnitManager:
         return cls._instance
 
     def __init_unit__(self):
-        self.ureg: UnitRegistry = UnitRegistry()
+        from pint import UnitRegistry
+        # the parsed definitions are cached on disk (pint's user cache folder), the
+        # next starts skip parsing the default definition file
+        self.ureg: UnitRegistry = UnitRegistry(cache_folder=":auto:")
         self.ureg.define("meter_per_minute = meter / minute = m/min")
 
         # Define common units for easier access
@@ -34,53 +56,58 @@ class PintUnitManager:
         self.celsius = self.ureg.degC
         self.no_unit = self.ureg.dimensionless
 
+
+class LazyUnits:
+    """Stands for ``PintUnitManager()`` until an attribute is looked up, then builds it.
+
+    Importing ``unit`` doesn't import pint: the registry is only built when a
+    unit is first used, the attributes are then copied so that the next
+    lookups are plain instance attributes.
+    """
+    def __getattr__(self, name: str):
+        if not vars(self):
+            vars(self).update(vars(PintUnitManager()))
+        try:
+            return vars(self)[name]
+        except KeyError:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}") from None
+
+
+unit = LazyUnits()
+
+
+def __getattr__(name: str):
+    # pint is imported on first use, see LazyUnits
+    if name in ("Quantity", "UnitRegistry"):
+        import pint
+        return getattr(pint, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 def mach2tas_SI(mach: float, alt: float) -> float:
-    T0 = 288.15
-    gamma = 1.4
-    R = 287.05
-    L = 0.0065
-    T = T0 - L * alt
-    a = sqrt(gamma * R * T)
-    return mach * a
+    return float(atmosphere.mach2tas(mach, alt))
 
 def tas2mach_SI(tas: float, alt: float) -> float:
-    T0 = 288.15
-    gamma = 1.4
-    R = 287.05
-    L = 0.0065
-    T = T0 - L * alt
-    a = sqrt(gamma * R * T)
-    return tas / a
+    return float(atmosphere.tas2mach(tas, alt))
 
 def tas2mach_Aero(tas: float, alt: float) -> float:
-    alt *= 0.3048
-    tas /= 1.994
-    return tas2mach_SI(tas, alt)
+    """tas in knot, alt in ft"""
+    return tas2mach_SI(tas * KNOT, alt * FT)
 
 def mach2tas_Aero(mach: float, alt: float) -> float:
-    alt = alt * 0.3048
-    return mach2tas_SI(mach, alt) * 1.94384
+    return mach2tas_SI(mach, alt * FT) / KNOT
 
 
 def ias2tas_SI(ias: float, alt: float) -> float:
-    return ias / sqrt(density(alt) / 1.225)
+    """The indicated airspeed is taken as the calibrated airspeed (no instrument or position error)."""
+    return float(atmosphere.cas2tas(ias, alt))
 
 
 def ias2tas_Aero(ias: float, alt: float) -> float:
-    ias = ias * 0.514444
-    alt = alt * 0.3048
-    return ias2tas_SI(ias, alt) * 1.94384
+    return ias2tas_SI(ias * KNOT, alt * FT) / KNOT
 
 
 def density(z: float) -> float:
-    rho_0 = 1.225
-    T0 = 288.15
-    g = 9.80665
-    R = 287.05
-    L = 0.0065
-
-    T = T0 - L * z
-    return rho_0 * (T / T0) ** (g / (R * L) - 1)
+    return float(atmosphere.density(z))
 
 def decimal_to_dms(decimal: float) -> str:
     degrees = int(decimal)
@@ -1,7 +1,12 @@
-from module import unit, Quantity
+from __future__ import annotations
+from collections.abc import Mapping, Iterator
 from dataclasses import dataclass, field
-from tabulate import tabulate
+from functools import cache
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from pint import Quantity
 
+__all__ = ["Airplane", "database", "load_database", "print_table", "retrive_airplane"]
 
 
 @dataclass
@@ -15,7 +20,7 @@ class Airplane:
     descent_v2: Quantity
     descent_v3: Quantity
 
-    retrive_flaps_spd: float = (200*unit.knot)
+    retrive_flaps_spd: float = field(default_factory=lambda: 200*_unit().knot)
     cruise_speed: Quantity | None = field(default=None, init=False)
     k: float | None = None
 
@@ -23,242 +28,267 @@ class Airplane:
         self.icao = self.icao.upper()
 
 
-database = {
-    "B742": Airplane(
-        icao="B742",
-        climb_v1=250*unit.knot,
-        climb_v2=340*unit.knot,
-        climb_v3=0.84*unit.mach,
-        descent_v1=0.84*unit.mach,
-        descent_v2=340*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.15
-    ),
-    "B772": Airplane(
-        icao="B772",
-        climb_v1=250*unit.knot,
-        climb_v2=310*unit.knot,
-        climb_v3=0.84*unit.mach,
-        descent_v1=0.84*unit.mach,
-        descent_v2=310*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.12
-    ),
-    "B77L": Airplane(
-        icao="B77L",
-        climb_v1=250*unit.knot,
-        climb_v2=310*unit.knot,
-        climb_v3=0.84*unit.mach,
-        descent_v1=0.84*unit.mach,
-        descent_v2=310*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.10
-    ),
-    "B77W": Airplane(
-        icao="B77W",
-        climb_v1=250*unit.knot,
-        climb_v2=310*unit.knot,
-        climb_v3=0.84*unit.mach,
-        descent_v1=0.84*unit.mach,
-        descent_v2=310*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.10
-    ),
-    "B748": Airplane(
-        icao="B748",
-        climb_v1=250*unit.knot,
-        climb_v2=310*unit.knot,
-        climb_v3=0.84*unit.mach,
-        descent_v1=0.84*unit.mach,
-        descent_v2=310*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.13
-    ),
-    "B788": Airplane(
-        icao="B788",
-        climb_v1=250*unit.knot,
-        climb_v2=310*unit.knot,
-        climb_v3=0.84*unit.mach,
-        descent_v1=0.84*unit.mach,
-        descent_v2=310*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.12
-    ),
-    "B789": Airplane(
-        icao="B789",
-        climb_v1=250*unit.knot,
-        climb_v2=310*unit.knot,
-        climb_v3=0.84*unit.mach,
-        descent_v1=0.84*unit.mach,
-        descent_v2=310*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.11
-    ),
-    "B78X": Airplane(
-        icao="B78X",
-        climb_v1=250*unit.knot,
-        climb_v2=310*unit.knot,
-        climb_v3=0.84*unit.mach,
-        descent_v1=0.84*unit.mach,
-        descent_v2=310*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.11
-    ),
-    "A339": Airplane(
-        icao="A339",
-        climb_v1=250*unit.knot,
-        climb_v2=300*unit.knot,
-        climb_v3=0.80*unit.mach,
-        descent_v1=0.85*unit.mach,
-        descent_v2=310*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.24
-    ),
-    "A333": Airplane(
-        icao="A333",
-        climb_v1=250*unit.knot,
-        climb_v2=300*unit.knot,
-        climb_v3=0.80*unit.mach,
-        descent_v1=0.85*unit.mach,
-        descent_v2=310*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.23
-    ),
-    "A359": Airplane(
-        icao="A359",
-        climb_v1=250*unit.knot,
-        climb_v2=320*unit.knot,
-        climb_v3=0.85*unit.mach,
-        descent_v1=0.85*unit.mach,
-        descent_v2=300*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.25
-    ),
-    "A388": Airplane(
-        icao="A388",
-        climb_v1=250*unit.knot,
-        climb_v2=320*unit.knot,
-        climb_v3=0.84*unit.mach,
-        descent_v1=0.85*unit.mach,
-        descent_v2=300*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.22
-    ),
-    "A320": Airplane(
-        icao="A320",
-        climb_v1=250*unit.knot,
-        climb_v2=300*unit.knot,
-        climb_v3=0.78*unit.mach,
-        descent_v1=0.78*unit.mach,
-        descent_v2=300*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.20
-    ),
-    "A321": Airplane(
-        icao="A321",
-        climb_v1=250*unit.knot,
-        climb_v2=300*unit.knot,
-        climb_v3=0.78*unit.mach,
-        descent_v1=0.78*unit.mach,
-        descent_v2=300*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.20
-    ),
-    "A318": Airplane(
-        icao="A318",
-        climb_v1=250*unit.knot,
-        climb_v2=300*unit.knot,
-        climb_v3=0.78*unit.mach,
-        descent_v1=0.78*unit.mach,
-        descent_v2=300*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.18
-    ),
-    "A319": Airplane(
-        icao="A319",
-        climb_v1=250*unit.knot,
-        climb_v2=300*unit.knot,
-        climb_v3=0.78*unit.mach,
-        descent_v1=0.78*unit.mach,
-        descent_v2=300*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.19
-    ),
-    "B738": Airplane(
-        icao="B738",
-        climb_v1=250*unit.knot,
-        climb_v2=300*unit.knot,
-        climb_v3=0.78*unit.mach,
-        descent_v1=0.78*unit.mach,
-        descent_v2=300*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.18
-    ),
-    "B739": Airplane(
-        icao="B739",
-        climb_v1=250*unit.knot,
-        climb_v2=300*unit.knot,
-        climb_v3=0.78*unit.mach,
-        descent_v1=0.78*unit.mach,
-        descent_v2=300*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.18
-    ),
-    "B38M": Airplane(
-        icao="B38M",
-        climb_v1=250*unit.knot,
-        climb_v2=280*unit.knot,
-        climb_v3=0.78*unit.mach,
-        descent_v1=0.78*unit.mach,
-        descent_v2=280*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.16
-    ),
-    "BCS3": Airplane(
-        icao="BCS3",
-        climb_v1=250*unit.knot,
-        climb_v2=280*unit.knot,
-        climb_v3=0.75*unit.mach,
-        descent_v1=0.75*unit.mach,
-        descent_v2=280*unit.knot,
-        descent_v3=250*unit.knot,
-        k=None
-    ),
-    "E175": Airplane(
-        icao="E175",
-        climb_v1=240*unit.knot,
-        climb_v2=290*unit.knot,
-        climb_v3=0.70*unit.mach,
-        descent_v1=0.77*unit.mach,
-        descent_v2=290*unit.knot,
-        descent_v3=250*unit.knot,
-        k=None
-    ),
-    "MD11": Airplane(
-        icao="MD11",
-        climb_v1=250*unit.knot,
-        climb_v2=330*unit.knot,
-        climb_v3=0.82*unit.mach,
-        descent_v1=0.82*unit.mach,
-        descent_v2=330*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.4
-    ),
-    "DC10F": Airplane(
-        icao="DC10F",
-        climb_v1=250*unit.knot,
-        climb_v2=310*unit.knot,
-        climb_v3=0.82*unit.mach,
-        descent_v1=0.82*unit.mach,
-        descent_v2=310*unit.knot,
-        descent_v3=250*unit.knot,
-        k=0.4
-    ),
-}
+def _unit():
+    # the package imports this module, ``unit`` (numpy on its import path) only when the quantities are built
+    from .convertion import unit
+    return unit
+
+
+@cache
+def load_database() -> dict[str, Airplane]:
+    """icao -> Airplane, built on the first lookup instead of at import"""
+    unit = _unit()
+    return {
+        "B742": Airplane(
+            icao="B742",
+            climb_v1=250*unit.knot,
+            climb_v2=340*unit.knot,
+            climb_v3=0.84*unit.mach,
+            descent_v1=0.84*unit.mach,
+            descent_v2=340*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.15
+        ),
+        "B772": Airplane(
+            icao="B772",
+            climb_v1=250*unit.knot,
+            climb_v2=310*unit.knot,
+            climb_v3=0.84*unit.mach,
+            descent_v1=0.84*unit.mach,
+            descent_v2=310*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.12
+        ),
+        "B77L": Airplane(
+            icao="B77L",
+            climb_v1=250*unit.knot,
+            climb_v2=310*unit.knot,
+            climb_v3=0.84*unit.mach,
+            descent_v1=0.84*unit.mach,
+            descent_v2=310*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.10
+        ),
+        "B77W": Airplane(
+            icao="B77W",
+            climb_v1=250*unit.knot,
+            climb_v2=310*unit.knot,
+            climb_v3=0.84*unit.mach,
+            descent_v1=0.84*unit.mach,
+            descent_v2=310*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.10
+        ),
+        "B748": Airplane(
+            icao="B748",
+            climb_v1=250*unit.knot,
+            climb_v2=310*unit.knot,
+            climb_v3=0.84*unit.mach,
+            descent_v1=0.84*unit.mach,
+            descent_v2=310*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.13
+        ),
+        "B788": Airplane(
+            icao="B788",
+            climb_v1=250*unit.knot,
+            climb_v2=310*unit.knot,
+            climb_v3=0.84*unit.mach,
+            descent_v1=0.84*unit.mach,
+            descent_v2=310*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.12
+        ),
+        "B789": Airplane(
+            icao="B789",
+            climb_v1=250*unit.knot,
+            climb_v2=310*unit.knot,
+            climb_v3=0.84*unit.mach,
+            descent_v1=0.84*unit.mach,
+            descent_v2=310*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.11
+        ),
+        "B78X": Airplane(
+            icao="B78X",
+            climb_v1=250*unit.knot,
+            climb_v2=310*unit.knot,
+            climb_v3=0.84*unit.mach,
+            descent_v1=0.84*unit.mach,
+            descent_v2=310*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.11
+        ),
+        "A339": Airplane(
+            icao="A339",
+            climb_v1=250*unit.knot,
+            climb_v2=300*unit.knot,
+            climb_v3=0.80*unit.mach,
+            descent_v1=0.85*unit.mach,
+            descent_v2=310*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.24
+        ),
+        "A333": Airplane(
+            icao="A333",
+            climb_v1=250*unit.knot,
+            climb_v2=300*unit.knot,
+            climb_v3=0.80*unit.mach,
+            descent_v1=0.85*unit.mach,
+            descent_v2=310*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.23
+        ),
+        "A359": Airplane(
+            icao="A359",
+            climb_v1=250*unit.knot,
+            climb_v2=320*unit.knot,
+            climb_v3=0.85*unit.mach,
+            descent_v1=0.85*unit.mach,
+            descent_v2=300*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.25
+        ),
+        "A388": Airplane(
+            icao="A388",
+            climb_v1=250*unit.knot,
+            climb_v2=320*unit.knot,
+            climb_v3=0.84*unit.mach,
+            descent_v1=0.85*unit.mach,
+            descent_v2=300*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.22
+        ),
+        "A320": Airplane(
+            icao="A320",
+            climb_v1=250*unit.knot,
+            climb_v2=300*unit.knot,
+            climb_v3=0.78*unit.mach,
+            descent_v1=0.78*unit.mach,
+            descent_v2=300*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.20
+        ),
+        "A321": Airplane(
+            icao="A321",
+            climb_v1=250*unit.knot,
+            climb_v2=300*unit.knot,
+            climb_v3=0.78*unit.mach,
+            descent_v1=0.78*unit.mach,
+            descent_v2=300*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.20
+        ),
+        "A318": Airplane(
+            icao="A318",
+            climb_v1=250*unit.knot,
+            climb_v2=300*unit.knot,
+            climb_v3=0.78*unit.mach,
+            descent_v1=0.78*unit.mach,
+            descent_v2=300*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.18
+        ),
+        "A319": Airplane(
+            icao="A319",
+            climb_v1=250*unit.knot,
+            climb_v2=300*unit.knot,
+            climb_v3=0.78*unit.mach,
+            descent_v1=0.78*unit.mach,
+            descent_v2=300*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.19
+        ),
+        "B738": Airplane(
+            icao="B738",
+            climb_v1=250*unit.knot,
+            climb_v2=300*unit.knot,
+            climb_v3=0.78*unit.mach,
+            descent_v1=0.78*unit.mach,
+            descent_v2=300*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.18
+        ),
+        "B739": Airplane(
+            icao="B739",
+            climb_v1=250*unit.knot,
+            climb_v2=300*unit.knot,
+            climb_v3=0.78*unit.mach,
+            descent_v1=0.78*unit.mach,
+            descent_v2=300*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.18
+        ),
+        "B38M": Airplane(
+            icao="B38M",
+            climb_v1=250*unit.knot,
+            climb_v2=280*unit.knot,
+            climb_v3=0.78*unit.mach,
+            descent_v1=0.78*unit.mach,
+            descent_v2=280*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.16
+        ),
+        "BCS3": Airplane(
+            icao="BCS3",
+            climb_v1=250*unit.knot,
+            climb_v2=280*unit.knot,
+            climb_v3=0.75*unit.mach,
+            descent_v1=0.75*unit.mach,
+            descent_v2=280*unit.knot,
+            descent_v3=250*unit.knot,
+            k=None
+        ),
+        "E175": Airplane(
+            icao="E175",
+            climb_v1=240*unit.knot,
+            climb_v2=290*unit.knot,
+            climb_v3=0.70*unit.mach,
+            descent_v1=0.77*unit.mach,
+            descent_v2=290*unit.knot,
+            descent_v3=250*unit.knot,
+            k=None
+        ),
+        "MD11": Airplane(
+            icao="MD11",
+            climb_v1=250*unit.knot,
+            climb_v2=330*unit.knot,
+            climb_v3=0.82*unit.mach,
+            descent_v1=0.82*unit.mach,
+            descent_v2=330*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.4
+        ),
+        "DC10F": Airplane(
+            icao="DC10F",
+            climb_v1=250*unit.knot,
+            climb_v2=310*unit.knot,
+            climb_v3=0.82*unit.mach,
+            descent_v1=0.82*unit.mach,
+            descent_v2=310*unit.knot,
+            descent_v3=250*unit.knot,
+            k=0.4
+        ),
+    }
+
+
+class LazyDatabase(Mapping):
+    """``load_database()`` as a read-only mapping, loaded on first access."""
+    def __getitem__(self, icao: str) -> Airplane:
+        return load_database()[icao]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(load_database())
+
+    def __len__(self) -> int:
+        return len(load_database())
+
+
+database = LazyDatabase()
 
 
 def retrive_airplane(icao: str) -> Airplane:
-    return database.get(icao, Airplane(None, None, None, None, None, None, None))
+    return load_database().get(icao, Airplane(None, None, None, None, None, None, None))
 
 def print_table(database):
     """
@@ -269,6 +299,7 @@ def print_table(database):
         model_class: The SQLAlchemy ORM class representing the table.
     """
 
+    from tabulate import tabulate
     data = [vars(airplane) for airplane in database.values()]
     print(tabulate(data, headers='keys'))
 
@@ -288,4 +319,4 @@ def print_table(database):
     #     print("|".join(map(lambda x: f"{x:^{spacing[row.index(x)]}}", row)))
 
 if __name__ == "__main__":
-    print_table(database)
+    print_table(load_database())
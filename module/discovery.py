@@ -0,0 +1,184 @@
+from socket import socket, AF_INET, SOCK_DGRAM, SOL_SOCKET, SO_REUSEADDR, timeout as socket_timeout, create_connection
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from ipaddress import ip_address
+from threading import Thread, Event
+from time import monotonic, time
+from json import loads, dump, load, JSONDecodeError
+from pathlib import Path
+
+from .logger import debug_logger
+
+BROADCAST_PORT = 15000
+
+
+@dataclass(slots=True)
+class Device:
+    ip: str
+    port: int
+    name: str | None = None
+    # "cache" or "broadcast"
+    source: str = "broadcast"
+    # TCP connect time (s), None if not probed or unreachable
+    latency: float | None = None
+    # the address is the one the broadcast came from
+    sender: bool = False
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self.ip, self.port
+
+
+class DeviceCache:
+    """Devices that accepted a connection, the most recent first.
+
+    Args:
+        path (Path): JSON file of the cache
+        size (int): devices kept
+    """
+    def __init__(self, path: Path = Path("./cache/devices.json"), size: int = 8) -> None:
+        self.path = path
+        self.size = size
+        self.devices: list[dict] = self._load()
+
+    def _load(self) -> list[dict]:
+        try:
+            with open(self.path) as f:
+                devices = load(f).get("devices", [])
+        except FileNotFoundError:
+            return []
+        except (OSError, JSONDecodeError, AttributeError):
+            debug_logger.warning(f"Unreadable device cache {self.path}, ignoring it")
+            return []
+        return [device for device in devices if isinstance(device, dict) and {"ip", "port"} <= device.keys()]
+
+    def remember(self, device: Device) -> None:
+        entry = {"ip": device.ip, "port": device.port, "name": device.name, "last_good": time()}
+        self.devices = [entry] + [d for d in self.devices if (d["ip"], d["port"]) != device.address][:self.size - 1]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            dump({"devices": self.devices}, f, indent=4)
+        tmp.replace(self.path)
+
+    def __iter__(self):
+        return (Device(d["ip"], d["port"], d.get("name"), "cache") for d in self.devices)
+
+
+def probe(device: Device, timeout: float = 0.3) -> Device:
+    """Sets ``device.latency`` to the time taken to open a TCP connection, None if it fails."""
+    start = monotonic()
+    try:
+        with create_connection(device.address, timeout=timeout):
+            device.latency = monotonic() - start
+    except OSError:
+        device.latency = None
+    return device
+
+
+def parse_broadcast(data: bytes, sender: str) -> list[Device]:
+    """Devices announced by one broadcast, keys are case insensitive (``addresses``, ``port``, ``deviceName``)."""
+    try:
+        message = {key.lower(): value for key, value in loads(data.decode("utf-8")).items()}
+        port = int(message["port"])
+        addresses = [str(address) for address in message.get("addresses") or []]
+    except (UnicodeDecodeError, JSONDecodeError, AttributeError, KeyError, TypeError, ValueError):
+        debug_logger.debug("Ignoring broadcast from %s: %r", sender, data[:80])
+        return []
+    name = message.get("devicename")
+    if sender not in addresses:
+        addresses.append(sender)
+    return [Device(address, port, name, "broadcast", sender=address == sender) for address in addresses]
+
+
+def rank(device: Device) -> tuple:
+    """reachable first (fastest first), then the sender address, private IPv4, other IPv4, IPv6"""
+    try:
+        address = ip_address(device.ip.split("%")[0])
+        family = 0 if address.version == 4 and address.is_private else 1 if address.version == 4 else 2
+        if address.is_loopback or address.is_link_local:
+            family = 3
+    except ValueError:
+        family = 4
+    return (
+        device.latency is None,
+        device.latency or 0,
+        not device.sender,
+        family,
+    )
+
+
+def listen(timeout: float | None = 3.0, window: float = 0.5, port: int = BROADCAST_PORT,
+           stop: Event | None = None, host: str = "0.0.0.0") -> list[Device]:
+    """Collects the devices broadcasting on ``port``.
+
+    Listens until ``window`` seconds after the first broadcast, ``timeout``
+    seconds at most (None to wait for a broadcast) or until ``stop`` is set.
+    """
+    devices: dict[tuple[str, int], Device] = {}
+    start = monotonic()
+    deadline = None if timeout is None else start + timeout
+    with socket(AF_INET, SOCK_DGRAM) as sock:
+        sock.setsockopt(SOL_SOCKET, SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        while stop is None or not stop.is_set():
+            now = monotonic()
+            if deadline is not None and now >= deadline:
+                break
+            # short waits so that ``stop`` is seen quickly
+            sock.settimeout(0.1 if deadline is None else min(0.1, deadline - now))
+            try:
+                data, (sender, _) = sock.recvfrom(4096)
+            except socket_timeout:
+                continue
+            for device in parse_broadcast(data, sender):
+                devices.setdefault(device.address, device)
+            if devices and (deadline is None or deadline > monotonic() + window):
+                deadline = monotonic() + window
+    return list(devices.values())
+
+
+def discover(timeout: float = 3.0, window: float = 0.5, cache: DeviceCache | None = None,
+             probe_timeout: float = 0.3, wait_broadcast: bool = False) -> list[Device]:
+    """Devices ranked by reachability, the last known good ones are tried first.
+
+    The cached devices are probed while listening for broadcasts: if one of
+    them accepts a connection the broadcasts are not waited for (unless
+    ``wait_broadcast``). The broadcast addresses are probed as well, so that
+    the unreachable ones (e.g. mobile data interfaces) rank last.
+
+    Args:
+        timeout (float): maximum time spent listening for broadcasts
+        window (float): time broadcasts are still collected after the first one
+        cache (DeviceCache | None): last known good devices, ``./cache/devices.json`` by default
+        probe_timeout (float): TCP connect timeout of a probe
+        wait_broadcast (bool): listen for the whole window even when a cached device answers
+    """
+    cache = DeviceCache() if cache is None else cache
+    stop = Event()
+    heard: list[Device] = []
+
+    def listener_target() -> None:
+        try:
+            heard.extend(listen(timeout, window, stop=stop))
+        except OSError as e:
+            debug_logger.warning(f"Unable to listen for broadcasts: {e!r}")
+
+    listener = Thread(target=listener_target, name="Discovery", daemon=True)
+    listener.start()
+
+    cached = list(cache)
+    with ThreadPoolExecutor(max_workers=8, thread_name_prefix="Probe") as executor:
+        reachable = [device for device in executor.map(lambda d: probe(d, probe_timeout), cached) if device.latency is not None]
+        if reachable and not wait_broadcast:
+            # the listener closes its socket on its own, nothing it hears is waited for
+            stop.set()
+        else:
+            listener.join()
+        known = {device.address for device in reachable}
+        broadcast = [device for device in heard if device.address not in known]
+        list(executor.map(lambda d: probe(d, probe_timeout), broadcast))
+
+    devices = sorted(reachable + broadcast, key=rank)
+    debug_logger.debug("Discovered: " + ", ".join(f"{d.ip}:{d.port} ({d.source}, {d.latency})" for d in devices))
+    return devices
@@ -1,13 +1,19 @@
-from .FlightPlan import IFFPL, Fix, dist_to_fix, FlightPhase, cosine_law
-from .aircraft import Aircraft, Autopilot, Autothrottle, Spd
+from __future__ import annotations
+from .FlightPlan import IFFPL, Fix, dist_to_fix_SI, FlightPhase, cosine_law
+from .aircraft import Aircraft, Autopilot, Autothrottle, Spd, speed_SI
+from .convertion import FT, FPM
 from .logger import logger, debug_logger
 from .utils import format_time
+from .scheduler import Scheduler, wait_until
 
-from . import unit, Quantity
+from . import unit
 from numpy import arctan2, sin, sign, radians, cos, arcsin
 from datetime import datetime, timedelta
-from time import sleep
+from time import monotonic, sleep
 from math import isclose
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from pint import Quantity
 
 
 
@@ -44,12 +50,10 @@ def takeoff(aircraft: Aircraft, autopilot: Autopilot, autothrottle: Autothrottle
     if (v := inputs.get(Spd.Vr)) is not None:
         autopilot.Spd = v
     # //
-    while aircraft.n1 < 0.5*unit.no_unit or (not aircraft.is_on_runway and aircraft.is_on_ground):
-        sleep(1)
+    wait_until(lambda: aircraft.n1 >= 0.5*unit.no_unit and (aircraft.is_on_runway or not aircraft.is_on_ground))
     autothrottle.Throttle = TO_setting
     logger.info(f"Starting takeoff\nTO n1:{aircraft.n1_target:.2f}")
-    while aircraft.is_on_ground or (aircraft.agl < 50*unit.ft and aircraft.vs < 0*unit.fpm): 
-        sleep(1)
+    wait_until(lambda: not aircraft.is_on_ground and (aircraft.agl >= 50*unit.ft or aircraft.vs >= 0*unit.fpm))
     debug_logger.debug("Takeoff")
     if not aircraft.landing_gear_status:
         debug_logger.debug("Landing gear is up")
@@ -58,10 +62,15 @@ def takeoff(aircraft: Aircraft, autopilot: Autopilot, autothrottle: Autothrottle
     aircraft.Landing_gear_toggle
 
 class Vnav:
-    descent_angle = 3*unit.deg
-    time_target = 2 * 60 * unit.s
-
-    def __init__(self, aircraft: Aircraft, autopilot: Autopilot, autothrottle: Autothrottle, fpl: IFFPL):
+    # rad, s
+    descent_angle = radians(3)
+    time_target = 2 * 60
+    # s between two ETE messages in cruise
+    ete_log_period = 60
+
+    def __init__(self, aircraft: Aircraft, autopilot: Autopilot, autothrottle: Autothrottle, fpl: IFFPL,
+                 tick_autothrottle: bool = True):
+        """``tick_autothrottle`` is False when the autothrottle runs at its own rate (see ``Scheduler``)."""
         logger.info("Initializing VNAV...")
         
         if fpl is None:
@@ -71,11 +80,18 @@ class Vnav:
         self.aircraft = aircraft
         self.autopilot = autopilot
         self.fpl = fpl
-        self.above_10k = aircraft.msl >= 10_000*unit.ft
+        self.above_10k = aircraft.msl_SI >= 10_000*FT
         next_index = aircraft.next_index
         self.climb_waypoint = fpl.next_clb_wp(next_index)
         self.next_waypoint = fpl.next_wp(next_index)
         self.autothrottle = autothrottle
+        self.tick_autothrottle = tick_autothrottle
+        self._next_ete_log = 0.0
+        # climb speeds converted once, see Autothrottle.set_target_SI
+        airplane = aircraft.airplane
+        self.climb_speeds = tuple(
+            None if v is None else speed_SI(v) for v in (airplane.climb_v1, airplane.climb_v2, airplane.climb_v3)
+        )
 
         logger.info("VNAV initialized!")
 
@@ -83,6 +99,14 @@ class Vnav:
         """Set the target speed and update both autopilot and autothrottle."""
         self.autothrottle.target_spd = target_speed
 
+    def _set_climb_speed(self, stage: int) -> None:
+        if (target := self.climb_speeds[stage]) is not None:
+            self.autothrottle.set_target_SI(*target)
+
+    def _dist_to(self, fix: Fix) -> float:
+        """distance in m along the flight plan"""
+        return dist_to_fix_SI(fix, self.fpl, self.aircraft.next_index, self.aircraft.dist_to_next_SI)
+
     def __call__(self) -> bool:
         if (indx := self.aircraft.next_index) > self.climb_waypoint.index:
             self.climb_waypoint = self.fpl.next_clb_wp(indx)
@@ -90,7 +114,7 @@ class Vnav:
             self.next_waypoint = self.fpl.next_wp(indx)
             return True
         
-        if not self.aircraft.is_on_ground and self.aircraft.agl > 50*unit.ft:
+        if not self.aircraft.is_on_ground and self.aircraft.agl_SI > 50*FT:
             if self.climb_waypoint is None:
                 self.autothrottle.flight_phase = self.next_waypoint.flight_phase
             else:
@@ -113,67 +137,69 @@ class Vnav:
                 raise ValueError("Invalid flight phase")
         return True
 
+    def _autothrottle(self) -> None:
+        if self.tick_autothrottle:
+            self.autothrottle()
+
     def handle_takeoff(self):
-        self.autothrottle()
+        self._autothrottle()
 
     def handle_climb(self):
-        msl = self.aircraft.msl
+        msl = self.aircraft.msl_SI
         if self.autopilot.SpdMode:
-            self.set_target_speed(self.aircraft.airplane.climb_v3)
-        elif not self.above_10k and msl >= 10_000*unit.ft:
+            self._set_climb_speed(2)
+        elif not self.above_10k and msl >= 10_000*FT:
             if self.aircraft.landing_lights_status:
                 self.aircraft.Landing_Lights_toggle
             if self.aircraft.seat_belt_status:
                 self.aircraft.seat_belt_toggle
-            self.set_target_speed(self.aircraft.airplane.climb_v2)
+            self._set_climb_speed(1)
             self.above_10k = True
-        elif msl <= 10_000*unit.ft and not self.autothrottle.reached_target:
-            self.set_target_speed(self.aircraft.airplane.climb_v1)
+        elif msl <= 10_000*FT and not self.autothrottle.reached_target:
+            self._set_climb_speed(0)
 
-        self.autothrottle()
-        delta_alt = self.climb_waypoint.alt - msl
-        dist = dist_to_fix(self.climb_waypoint, self.fpl, self.aircraft)
-        vs_sin = delta_alt.to(unit.m) / (dist.to(unit.m)**2 + delta_alt.to(unit.m)**2)**.5
-
-        if msl != self.autopilot.Alt:
-            self.autopilot.Vs = self.aircraft.gs * vs_sin
+        self._autothrottle()
+        delta_alt = self.climb_waypoint.alt_SI - msl
+        dist = self._dist_to(self.climb_waypoint)
+        vs_sin = delta_alt / (dist**2 + delta_alt**2)**.5
 
-        sleep(1)
+        if msl != self.autopilot.Alt_SI:
+            self.autopilot.Vs_SI = self.aircraft.gs_SI * vs_sin
 
     def handle_cruise(self):
-        self.autothrottle()
+        """Starts the climb to the next altitude ``climb_time`` before its fix, checked every tick."""
+        self._autothrottle()
         
-        delta_alt: Quantity = self.climb_waypoint.alt - self.autopilot.Alt
-        target_vs: Quantity = sign(delta_alt) * max((200*unit.fpm), min((1000*unit.fpm), abs(delta_alt / Vnav.time_target)))
+        alt_target = self.autopilot.Alt_SI
+        delta_alt = self.climb_waypoint.alt_SI - alt_target
+        target_vs = sign(delta_alt) * max(200*FPM, min(1000*FPM, abs(delta_alt / Vnav.time_target)))
 
         if delta_alt == 0:
-            climb_time = 0*unit.s
+            climb_time = 0
         else:
-            climb_time: Quantity = delta_alt / target_vs
-        ete_fix: Quantity = dist_to_fix(self.climb_waypoint, self.fpl, self.aircraft).to(unit.m) / self.aircraft.gs - climb_time
-        if ete_fix <= 0*unit.s and self.autopilot.Alt != self.climb_waypoint.alt :
-            self.autopilot.Alt = self.climb_waypoint.alt
-            self.autopilot.Vs = target_vs
+            climb_time = delta_alt / target_vs
+        gs = self.aircraft.gs_SI
+        ete = self._dist_to(self.climb_waypoint) / gs
+        ete_fix = ete - climb_time
+        if ete_fix <= 0 and alt_target != self.climb_waypoint.alt_SI:
+            self.autopilot.Alt_SI = self.climb_waypoint.alt_SI
+            self.autopilot.Vs_SI = target_vs
             self.fpl.update(self.aircraft)
-        elif ete_fix > 6 * 60*unit.s:
-            ete_fix = dist_to_fix(self.climb_waypoint, self.fpl, self.aircraft).to(unit.m) / self.aircraft.gs
-            logger.info(f"ETE to {self.climb_waypoint.name}: {format_time(ete_fix.m_as(unit.s))}, ETA: {datetime.now() + timedelta(seconds=ete_fix.m_as(unit.s)): %H:%M:%S}")
-            logger.info(f"sleeping for {format_time((ete_fix*0.5).m_as(unit.s))}")
-            sleep((ete_fix*0.5).m)
-        else:
-            logger.info(f"ETE to {self.climb_waypoint.name}: {format_time(ete_fix.m_as(unit.s))}")
-            sleep(10)
+        elif (now := monotonic()) >= self._next_ete_log:
+            self._next_ete_log = now + self.ete_log_period
+            logger.info(f"ETE to {self.climb_waypoint.name}: {format_time(ete)}, ETA: {datetime.now() + timedelta(seconds=ete): %H:%M:%S}, "
+                        f"climb in {format_time(max(0, ete_fix))}")
 
     def handle_descent(self, waypoint: Fix, sin_angle: float):
         # TODO: implement descent
-        delta_alt = waypoint.alt - self.autopilot.Alt
-        dist = dist_to_fix(waypoint, self.fpl, self.aircraft)
+        delta_alt = waypoint.alt_SI - self.autopilot.Alt_SI
+        dist = self._dist_to(waypoint)
         vs_sin = delta_alt / (dist**2 + delta_alt**2)**.5
-        target_vs = self.aircraft.gs * vs_sin
+        target_vs = self.aircraft.gs_SI * vs_sin
         
-        if not isclose(self.autopilot.Alt, waypoint.alt, abs_tol=1e-4):
-            self.autopilot.Alt = waypoint.alt
-        self.autopilot.Vs = min(sin_angle, target_vs)
+        if not isclose(self.autopilot.Alt_SI, waypoint.alt_SI, abs_tol=1e-4):
+            self.autopilot.Alt_SI = waypoint.alt_SI
+        self.autopilot.Vs_SI = min(sin_angle, target_vs)
 
 class Lnav:
     def __init__(self, aircraft: Aircraft, autopilot: Autopilot, fpl: IFFPL):
@@ -258,19 +284,25 @@ def create_Fix(Start_Fix: Fix, bearing: Quantity, distance: Quantity) -> IFFPL:
     lon2 = lon1 + arctan2(sin(bearing.to(unit.rad))*sin(distance.to(unit.m)/R)*cos(lat1.to(unit.rad)), cos(distance.to(unit.m)/R)-sin(lat1.to(unit.rad))*sin(lat2))
     return Fix("None", lat2, lon2, -1, -1)
 1
-def Only_Authothrottle(aircraft: Aircraft, autopilot: Autopilot, autothrottle: Autothrottle):
+def Only_Authothrottle(aircraft: Aircraft, autopilot: Autopilot, autothrottle: Autothrottle, rate: float = 5) -> Scheduler:
+    """Climb speeds up to the autopilot altitude, the autothrottle runs ``rate`` times per second."""
     logger.info("Starting autothrottle")
-    while aircraft.is_on_ground:
-        sleep(1)
-    fix = Fix("None", -1, -1, -1, -1)
-    fix._flight_phase = FlightPhase.CLIMB
-    while aircraft.msl < autopilot.Alt:
-        if aircraft.msl >= (10_000*unit.ft).to(unit.m) and aircraft.landing_lights_status:
-            if aircraft.landing_lights_status:
-                aircraft.Landing_Lights_toggle
+    wait_until(lambda: not aircraft.is_on_ground)
+    autothrottle.flight_phase = FlightPhase.CLIMB
+
+    def tick() -> bool:
+        msl = aircraft.msl_SI
+        if msl >= autopilot.Alt_SI:
+            return False
+        if msl >= 10_000*FT and aircraft.landing_lights_status:
+            aircraft.Landing_Lights_toggle
             if aircraft.seat_belt_status:
                 aircraft.seat_belt_toggle
+        autothrottle()
+        return True
 
-        autothrottle(fix)
-        sleep(1)
+    scheduler = Scheduler()
+    autothrottle.period = scheduler.add("autothrottle", tick, rate).period
+    scheduler.run()
+    return scheduler
     
\ No newline at end of file
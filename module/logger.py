@@ -1,6 +1,13 @@
 from colorama import Fore, Back, Style, init
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from queue import SimpleQueue
 import logging
+import atexit
+
+__all__ = ["ColorFormatter", "Filter", "LogWriter", "LazyQueueHandler", "Logger", "log_writer",
+           "command_logger", "debug_logger", "logger"]
+
 
 init(autoreset=True)
 
@@ -31,7 +38,41 @@ class Filter(logging.Filter):
             return record.levelno != logging.DEBUG
         else:
             return True
-    
+
+
+class LogWriter(QueueListener):
+    """Background thread that formats and writes the records of every ``Logger``.
+
+    The loggers only put their records in the queue, a slow terminal or disk
+    never stalls the thread that logs (e.g. the one sending a throttle command).
+    """
+    def __init__(self) -> None:
+        super().__init__(SimpleQueue())
+        # logger name -> handlers its records are written to
+        self.outputs: dict[str, list[logging.Handler]] = {}
+
+    def handle(self, record: logging.LogRecord) -> None:
+        for handler in self.outputs.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class LazyQueueHandler(QueueHandler):
+    """Queues the record as is, the message is built by the writer thread.
+
+    The %-style arguments of a call are formatted later, they must not be
+    changed by the caller afterwards.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+log_writer = LogWriter()
+log_writer.start()
+# the queued records are written before exiting
+atexit.register(log_writer.stop)
+
+
 class Logger(logging.Logger):
     def toggle_debug(self):
         self._filter.toggle_debug()
@@ -47,7 +88,6 @@ class Logger(logging.Logger):
         self.stream_handler.setFormatter(stream_formatter)
         self._filter = Filter(name, debug=True)
         self.stream_handler.addFilter(self._filter)
-        self.addHandler(self.stream_handler)
 
         log_dir = Path("./logs")
         if not log_dir.is_dir():
@@ -58,7 +98,11 @@ class Logger(logging.Logger):
             datefmt="%Y-%m-%d %H:%M:%S",
         )
         file.setFormatter(file_formatter)
-        self.addHandler(file)
+
+        # the handlers are run by the writer thread, the logger only queues the records
+        self.outputs: list[logging.Handler] = log_writer.outputs.setdefault(name, [])
+        self.outputs += [self.stream_handler, file]
+        self.addHandler(LazyQueueHandler(log_writer.queue))
 
     def file_reset(self):
         open(f"logs/{self.name}.log", "w").close()
@@ -74,4 +118,4 @@ logger.file_reset()
 
 command_logger = Logger("Command", logging.INFO)
 command_logger.file_reset()
-command_logger.removeHandler(command_logger.stream_handler)
\ No newline at end of file
+command_logger.outputs.remove(command_logger.stream_handler)
\ No newline at end of file
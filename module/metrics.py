@@ -0,0 +1,112 @@
+from time import monotonic
+
+
+class LatencyHistogram:
+    """HDR-style histogram of latencies in ns.
+
+    Buckets are log-linear: every power of two is split in ``2**sub_bits`` linear
+    sub-buckets, so values are kept with a relative error below ``2**-sub_bits``
+    and recording is a couple of integer operations.
+    """
+    def __init__(self, sub_bits: int = 4) -> None:
+        self.sub_bits = sub_bits
+        self.counts = [0] * ((64 - sub_bits) << sub_bits)
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self.sub_bits - 1
+        if shift <= 0:
+            return value
+        return (shift << self.sub_bits) + (value >> shift)
+
+    def _value(self, index: int) -> int:
+        """highest value of the bucket at ``index``"""
+        sub = 1 << self.sub_bits
+        if index < 2 * sub:
+            return index
+        shift = (index >> self.sub_bits) - 1
+        return ((index - (shift << self.sub_bits) + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        self.counts[self._index(value)] += 1
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+    def percentile(self, p: float) -> int:
+        """Value below which ``p`` percent of the records fall (upper bound of its bucket)."""
+        if not self.count:
+            return 0
+        target = max(1, round(self.count * p / 100))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(self._value(index), self.max)
+        return self.max
+
+
+def _name(key: object) -> str:
+    # manifest nodes are used as keys as they are, their path is only built here
+    return key.str_repr() if hasattr(key, "str_repr") else str(key)
+
+
+class ClientStats:
+    """Counters and latency histograms of the commands sent by a client, keyed by (kind, command path)."""
+    def __init__(self) -> None:
+        self.histograms: dict[tuple[str, object], LatencyHistogram] = {}
+        self.counters: dict[tuple[str, object], int] = {}
+        self.started = monotonic()
+
+    def record(self, kind: str, key: object, ns: int) -> None:
+        histogram = self.histograms.get((kind, key))
+        if histogram is None:
+            histogram = self.histograms[(kind, key)] = LatencyHistogram()
+        histogram.record(ns)
+
+    def count(self, kind: str, key: object, n: int = 1) -> None:
+        self.counters[(kind, key)] = self.counters.get((kind, key), 0) + n
+
+    def reset(self) -> None:
+        self.histograms.clear()
+        self.counters.clear()
+        self.started = monotonic()
+
+    def summary(self) -> list[dict[str, object]]:
+        """One row per (kind, command path), the most time consuming first. Latencies in µs."""
+        elapsed = max(monotonic() - self.started, 1e-9)
+        rows = []
+        for (kind, key), histogram in self.histograms.items():
+            rows.append({
+                "kind": kind,
+                "command": _name(key),
+                "count": histogram.count,
+                "rate (1/s)": histogram.count / elapsed,
+                "total (ms)": histogram.total / 1e6,
+                "mean": histogram.mean / 1e3,
+                "p50": histogram.percentile(50) / 1e3,
+                "p90": histogram.percentile(90) / 1e3,
+                "p99": histogram.percentile(99) / 1e3,
+                "max": histogram.max / 1e3,
+            })
+        for (kind, key), n in self.counters.items():
+            rows.append({"kind": kind, "command": _name(key), "count": n, "rate (1/s)": n / elapsed})
+        rows.sort(key=lambda row: row.get("total (ms)", 0), reverse=True)
+        return rows
+
+    def report(self) -> str:
+        rows = self.summary()
+        if not rows:
+            return "No command sent"
+        from tabulate import tabulate
+        return tabulate(rows, headers="keys", floatfmt=".1f")
@@ -0,0 +1,188 @@
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from dataclasses import dataclass
+from threading import Event, Lock
+from typing import Callable
+
+from .client import IFClient
+from .cache import ManifestCache
+from .aircraft import Aircraft, Autopilot, Autothrottle
+from .FlightPlan import IFFPL
+from .flight_phases import Vnav
+from .scheduler import Scheduler
+from .logger import logger, debug_logger
+
+__all__ = ["ClientPool", "Flight"]
+
+
+@dataclass
+class Flight:
+    """Client and control stack of one aircraft."""
+    name: str
+    client: IFClient
+    aircraft: Aircraft
+    autopilot: Autopilot
+    autothrottle: Autothrottle
+    fpl: IFFPL | None = None
+    vnav: Vnav | None = None
+    finished: bool = False
+
+    @classmethod
+    def connect(cls, name: str, ip: str, port: int, inputs: dict, flex: str | None = None,
+                only_at: bool = False, **client_kwargs) -> 'Flight':
+        """Connects to a device and builds the same stack as ``main.py``.
+
+        Args:
+            name (str): label of the flight in the pool
+            inputs (dict): Spd -> target speed, see ``Autothrottle``
+            flex (str | None): take off FLEX setting, see ``Autothrottle``
+            only_at (bool): autothrottle only, without flight plan and VNAV
+            **client_kwargs: passed to ``IFClient`` (manifest_cache, transport, record)
+
+        Raises:
+            ValueError: ``inputs`` is None, ``Autothrottle`` would ask for them on the console
+        """
+        if inputs is None:
+            raise ValueError(f"{name}: the speed inputs are required")
+        client = IFClient(ip, port, **client_kwargs)
+        aircraft = Aircraft(client)
+        autopilot = Autopilot(client)
+        fpl = None if only_at else IFFPL.from_str(client.send_command("full_info"))
+        autothrottle = Autothrottle(aircraft, autopilot, fpl, inputs, flex)
+        vnav = Vnav(aircraft, autopilot, autothrottle, fpl) if fpl is not None else None
+        logger.info(f"{name}: {client.ip}:{client.port} ready")
+        return cls(name, client, aircraft, autopilot, autothrottle, fpl, vnav)
+
+    def tick(self) -> bool:
+        """One step of the control loop, False once there is nothing left to do."""
+        if self.vnav is not None:
+            return self.vnav()
+        self.autothrottle()
+        return self.aircraft.is_on_ground or self.aircraft.msl_SI < self.autopilot.Alt_SI
+
+
+class ClientPool:
+    """Independent flights, one per device, ticked on a shared thread pool.
+
+    Every flight has its own client, manifest and control stack. A ``Scheduler``
+    task per flight hands its ticks to the pool at a fixed rate, a flight is
+    ticked by one worker at a time and a tick still running when the next is
+    due is not queued again. As the ticks wait on network round-trips,
+    ``max_workers`` should not be lower than the number of flights.
+
+        with ClientPool() as pool:
+            pool.open("rig 1", "192.168.1.10", 10112, inputs=inputs, flex="0.9")
+            pool.open("rig 2", "192.168.1.11", 10112, inputs=inputs, flex="0.9")
+            pool.run()
+
+    Args:
+        max_workers (int | None): threads of the pool, ``ThreadPoolExecutor`` default if None
+        manifest_cache (ManifestCache | None): cache shared by the clients opened by the pool
+    """
+    def __init__(self, max_workers: int | None = None, manifest_cache: ManifestCache | None = None) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Flight")
+        self.manifest_cache = ManifestCache() if manifest_cache is None else manifest_cache
+        self.flights: dict[str, Flight] = {}
+        self.errors: dict[str, BaseException] = {}
+        self._opening: list[tuple[str, str, int, Future]] = []
+        self._lock = Lock()
+        self._stop = Event()
+        self.scheduler: Scheduler | None = None
+
+    def __enter__(self) -> 'ClientPool':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.flights)
+
+    def add(self, flight: Flight) -> Flight:
+        with self._lock:
+            if flight.name in self.flights:
+                raise ValueError(f"Flight {flight.name} already in the pool")
+            self.flights[flight.name] = flight
+        return flight
+
+    def open(self, name: str, ip: str, port: int, inputs: dict, **kwargs) -> Future:
+        """Connects a new flight in the background (see ``Flight.connect``), ``run`` waits for it.
+
+        Raises:
+            ValueError: ``inputs`` is None, nobody can answer the console from a worker
+        """
+        if inputs is None:
+            raise ValueError(f"{name}: the speed inputs are required")
+        kwargs["inputs"] = inputs
+        kwargs.setdefault("manifest_cache", self.manifest_cache)
+        future = self.executor.submit(Flight.connect, name, ip, port, **kwargs)
+        self._opening.append((name, ip, port, future))
+        return future
+
+    def _adopt_opened(self) -> None:
+        wait([future for *_, future in self._opening])
+        for name, ip, port, future in self._opening:
+            if (e := future.exception()) is not None:
+                debug_logger.error(f"{name}: unable to connect to {ip}:{port}", exc_info=e)
+                self.errors[name] = e
+            else:
+                self.add(future.result())
+        self._opening.clear()
+
+    def _collect(self, flight: Flight, future: Future) -> None:
+        try:
+            if not future.result():
+                flight.finished = True
+                logger.info(f"{flight.name}: finished")
+        except Exception as e:
+            flight.finished = True
+            self.errors[flight.name] = e
+            debug_logger.error(f"{flight.name}: tick failed, flight stopped", exc_info=e)
+
+    def _dispatch(self, flight: Flight, ticking: dict[str, Future]) -> Callable[[], bool]:
+        """Scheduler callback of ``flight``: collects its last tick and hands the next one to the pool."""
+        def dispatch() -> bool:
+            if (future := ticking.get(flight.name)) is not None:
+                if not future.done():
+                    return True
+                del ticking[flight.name]
+                self._collect(flight, future)
+            if flight.finished or self._stop.is_set():
+                return False
+            ticking[flight.name] = self.executor.submit(flight.tick)
+            return True
+        return dispatch
+
+    def run(self, period: float = 1.0) -> dict[str, BaseException]:
+        """Ticks every flight every ``period`` seconds until all of them are finished or ``stop`` is called.
+
+        Returns:
+            dict[str, BaseException]: errors of the flights that failed to connect or to tick
+        """
+        self._adopt_opened()
+        ticking: dict[str, Future] = {}
+        self.scheduler = Scheduler()
+        flights = list(self.flights.values())
+        for i, flight in enumerate(flights):
+            flight.autothrottle.period = period
+            # spread over the period, the round-trips of the flights don't all start together
+            self.scheduler.add(flight.name, self._dispatch(flight, ticking), rate=1 / period,
+                               offset=i * period / len(flights))
+        if not self._stop.is_set():
+            self.scheduler.run()
+        wait(ticking.values())
+        for name, future in ticking.items():
+            self._collect(self.flights[name], future)
+        debug_logger.info(f"Pool schedule:\n{self.scheduler.table()}")
+        return self.errors
+
+    def stop(self) -> None:
+        """Makes ``run`` return once the ticks in progress are done."""
+        self._stop.set()
+        if self.scheduler is not None:
+            self.scheduler.stop()
+
+    def close(self) -> None:
+        self.stop()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        for flight in self.flights.values():
+            flight.client.close()
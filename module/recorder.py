@@ -0,0 +1,440 @@
+"""Flight data recorder: aircraft, autopilot and autothrottle values sampled at a fixed rate.
+
+A recording is a header followed by chunks of up to ``chunk_size`` samples,
+little endian, every part padded to 8 bytes so that the columns can be read
+back as aligned numpy arrays::
+
+    header:  b"IFFR", version (H), channel count (H), wall clock time of the start in ns (q), rate in Hz (d)
+             per channel: name length (B), name, dtype length (B), numpy dtype string (e.g. "<f4")
+    chunk:   sample count (I), padding (4x), time of the first and last sample in µs since the start (q, q)
+             µs since the previous sample (uint32 per sample, 0 for the first one)
+             one column per channel, in header order
+
+Only the chunk being filled is in memory, a full chunk is written and
+flushed at once: a crash loses at most ``chunk_size`` samples. At 10 Hz the
+default channels take ~70 bytes per sample, ~2.5 MB per hour.
+
+    with FlightRecorder("logs/flight.iffr", client, default_channels(autothrottle)):
+        while vnav(): continue
+
+``FlightRecording`` memory-maps a recording for analysis, the summary per
+flight phase is printed by::
+
+    python -m module.recorder logs/flight.iffr
+"""
+from numpy import (ndarray, dtype as np_dtype, empty, asarray, frombuffer, concatenate, cumsum, searchsorted,
+                   arange, unique, minimum, maximum, where, diff, flatnonzero, count_nonzero, isnan, nanmean,
+                   nanmax, float64, int64)
+from itertools import pairwise
+from dataclasses import dataclass
+from threading import Thread, Event, Lock
+from pathlib import Path
+from struct import Struct
+from mmap import mmap, ACCESS_READ
+from math import inf
+from time import monotonic, monotonic_ns, time_ns
+from typing import Callable, Iterable, BinaryIO, TYPE_CHECKING
+import atexit
+
+from .client import IFClient
+from .convertion import FT, NM, KNOT, FPM, MPM
+from .logger import debug_logger
+
+if TYPE_CHECKING:
+    from .aircraft import Autothrottle
+
+__all__ = ["Channel", "FlightRecorder", "FlightRecording", "default_channels", "downsample", "phase_summary",
+           "speed_error"]
+
+
+MAGIC = b"IFFR"
+VERSION = 1
+file_header = Struct("<4sHHqd")
+chunk_header = Struct("<I4xqq")
+delta_dtype = np_dtype("<u4")
+# longest gap a delta can hold, a longer one starts a new chunk
+MAX_DELTA = 2**32 - 1
+
+
+def padding(size: int) -> bytes:
+    return bytes(-size % 8)
+
+
+@dataclass(slots=True)
+class Channel:
+    """Recorded value: a manifest path read from the device or a local ``get``.
+
+    The device value is stored as ``value * scale + offset`` (to SI).
+    """
+    name: str
+    dtype: str
+    path: tuple[str, ...] | None = None
+    scale: float = 1.0
+    offset: float = 0.0
+    get: Callable[[], float] | None = None
+
+
+def default_channels(autothrottle: 'Autothrottle | None' = None) -> list[Channel]:
+    """State of the aircraft and the autopilot in SI units, with the flight phase and
+    target speed of ``autothrottle`` if given."""
+    channels = [
+        Channel("msl", "<f4", ("altitude_msl",), FT),
+        Channel("agl", "<f4", ("altitude_agl",), FT),
+        Channel("ias", "<f4", ("indicated_airspeed",)),
+        Channel("tas", "<f4", ("true_airspeed",)),
+        Channel("gs", "<f4", ("groundspeed",)),
+        Channel("mach", "<f4", ("mach_speed",)),
+        Channel("vs", "<f4", ("vertical_speed",), MPM),
+        Channel("pitch", "<f4", ("pitch",)),
+        Channel("accel", "<f4", ("acceleration", "z")),
+        Channel("next_index", "<i2", ("flightplan", "next_waypoint_index")),
+        Channel("dist_to_next", "<f4", ("flightplan", "next_waypoint_dist"), NM),
+        Channel("is_on_ground", "?", ("is_on_ground",)),
+        Channel("alt_target", "<f4", ("autopilot", "alt", "target")),
+        Channel("vs_target", "<f4", ("autopilot", "vs", "target"), MPM),
+        # m/s or mach number, see spd_mode
+        Channel("spd_target", "<f4", ("autopilot", "spd", "target")),
+        Channel("spd_mode", "u1", ("autopilot", "spd", "mode")),
+        # position from 0 (idle) to 1 (full)
+        Channel("throttle", "<f4", ("simulator", "throttle"), -1 / 2000, 0.5),
+    ]
+    if autothrottle is not None:
+        at = autothrottle
+        channels += [
+            Channel("phase", "u1", get=lambda: at.flight_phase.value),
+            Channel("at_target", "<f4", get=lambda: float("nan") if at.target_SI is None else at.target_SI),
+            Channel("at_target_mach", "?", get=lambda: at.target_mach),
+        ]
+    return channels
+
+
+class FlightRecorder:
+    """Samples ``channels`` every 1/``rate`` s and appends them to a recording.
+
+    The device channels are read with one ``IFClient.read_array`` per sample,
+    channels whose path isn't in the manifest are left out. Samples go in
+    preallocated columns written out one chunk at a time.
+
+    Args:
+        path (str | Path): recording, overwritten
+        client (IFClient): connected client
+        channels (list[Channel] | None): ``default_channels()`` if not given
+        rate (float): samples per second of ``start_sampling``
+        chunk_size (int): samples per chunk
+    """
+    def __init__(self, path: str | Path, client: IFClient, channels: list[Channel] | None = None,
+                 rate: float = 10.0, chunk_size: int = 600) -> None:
+        self.path = Path(path)
+        self.client = client
+        self.rate = rate
+        self.chunk_size = chunk_size
+        self.channels: list[Channel] = []
+        for channel in default_channels() if channels is None else channels:
+            if channel.path is not None:
+                try:
+                    client.resolve(*channel.path)
+                except ValueError:
+                    debug_logger.warning(f"Recorder channel {channel.name} not in the manifest: {channel.path}")
+                    continue
+            self.channels.append(channel)
+        # device channels first: the values of read_array go in the first columns
+        self.channels.sort(key=lambda channel: channel.path is None)
+        device = [channel for channel in self.channels if channel.path is not None]
+        self._paths = [channel.path for channel in device]
+        self._scales = asarray([channel.scale for channel in device], dtype=float64)
+        self._offsets = asarray([channel.offset for channel in device], dtype=float64)
+        self._getters = [channel.get for channel in self.channels[len(device):]]
+
+        self.columns: list[ndarray] = [empty(chunk_size, dtype=channel.dtype) for channel in self.channels]
+        self.deltas: ndarray = empty(chunk_size, dtype=delta_dtype)
+        # samples in the chunk being filled and in the chunks written
+        self.count = 0
+        self.written = 0
+        self._first = self._last = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file: BinaryIO = open(self.path, "wb")
+        self.start = monotonic_ns()
+        header = bytearray(file_header.pack(MAGIC, VERSION, len(self.channels), time_ns(), rate))
+        for channel in self.channels:
+            name, dtype = channel.name.encode("utf-8"), np_dtype(channel.dtype).str.encode("ascii")
+            header += bytes((len(name),)) + name + bytes((len(dtype),)) + dtype
+        self.file.write(header + padding(len(header)))
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread: Thread | None = None
+        atexit.register(self.close)
+
+    def __len__(self) -> int:
+        return self.written + self.count
+
+    def __enter__(self) -> 'FlightRecorder':
+        self.start_sampling()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def sample(self) -> None:
+        """Reads every channel once and appends the sample."""
+        values = (self.client.read_array(self._paths) * self._scales + self._offsets).tolist() if self._paths else []
+        values += [get() for get in self._getters]
+        now = (monotonic_ns() - self.start) // 1000
+        with self._lock:
+            if self.file.closed:
+                return
+            if self.count and now - self._last > MAX_DELTA:
+                self._write_chunk()
+            i = self.count
+            if i == 0:
+                self._first = self._last = now
+            self.deltas[i] = now - self._last
+            self._last = now
+            for column, value in zip(self.columns, values):
+                column[i] = value
+            self.count += 1
+            if self.count == self.chunk_size:
+                self._write_chunk()
+
+    def _write_chunk(self) -> None:
+        count = self.count
+        parts = [chunk_header.pack(count, self._first, self._last)]
+        for column in (self.deltas, *self.columns):
+            data = column[:count].tobytes()
+            parts += [data, padding(len(data))]
+        self.file.write(b"".join(parts))
+        self.file.flush()
+        self.written += count
+        self.count = 0
+
+    def start_sampling(self) -> None:
+        """Samples every 1/``rate`` s in a background thread until ``close``."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="FlightRecorder", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        period = 1 / self.rate
+        next_due = monotonic()
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception:
+                debug_logger.error("Flight recorder sample failed", exc_info=True)
+            # keep the phase of the samples, but don't try to catch up on missed ones
+            next_due = max(next_due + period, monotonic())
+            self._stop.wait(next_due - monotonic())
+
+    def close(self) -> None:
+        """Stops the sampling and writes the last, partial chunk."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            if self.file.closed:
+                return
+            if self.count:
+                self._write_chunk()
+            self.file.close()
+
+
+class FlightRecording:
+    """Memory-mapped recording, the columns of a chunk are numpy views of the file.
+
+    The chunk headers are read once into an index (sample counts and first /
+    last times), a time range only touches the chunks it overlaps. A chunk
+    truncated by a crash is left out.
+
+    Args:
+        path (str | Path): recording written by ``FlightRecorder``
+    """
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap(f.fileno(), 0, access=ACCESS_READ)
+        data = self._mmap
+        magic, version, n_channels, self.start, self.rate = file_header.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a flight recording")
+        if version != VERSION:
+            raise ValueError(f"Unsupported recording version {version}")
+        offset = file_header.size
+        # name -> dtype, in column order
+        self.channels: dict[str, np_dtype] = {}
+        for _ in range(n_channels):
+            lenght = data[offset]
+            name = str(data[offset + 1:offset + 1 + lenght], "utf-8")
+            offset += 1 + lenght
+            lenght = data[offset]
+            self.channels[name] = np_dtype(str(data[offset + 1:offset + 1 + lenght], "ascii"))
+            offset += 1 + lenght
+        offset += -offset % 8
+
+        offsets, counts, firsts, lasts = [], [], [], []
+        while offset + chunk_header.size <= len(data):
+            count, first, last = chunk_header.unpack_from(data, offset)
+            end = offset + chunk_header.size + self._chunk_size(count)
+            if end > len(data):
+                break
+            offsets.append(offset + chunk_header.size)
+            counts.append(count)
+            firsts.append(first)
+            lasts.append(last)
+            offset = end
+        # start of the data of every chunk, samples, first and last time in µs
+        self.offsets = asarray(offsets, dtype=int64)
+        self.counts = asarray(counts, dtype=int64)
+        self.first = asarray(firsts, dtype=int64)
+        self.last = asarray(lasts, dtype=int64)
+
+    def _column_size(self, dtype: np_dtype, count: int) -> int:
+        size = dtype.itemsize * count
+        return size + -size % 8
+
+    def _chunk_size(self, count: int) -> int:
+        return sum(self._column_size(dtype, count) for dtype in (delta_dtype, *self.channels.values()))
+
+    def __len__(self) -> int:
+        return int(self.counts.sum())
+
+    def __enter__(self) -> 'FlightRecording':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        try:
+            self._mmap.close()
+        except BufferError:
+            # views of the columns are still alive, the mapping goes with them
+            pass
+
+    @property
+    def duration(self) -> float:
+        """seconds between the first and the last sample"""
+        return (self.last[-1] - self.first[0]) / 1e6 if len(self.counts) else 0.0
+
+    def chunk(self, i: int, names: Iterable[str] | None = None) -> tuple[ndarray, dict[str, ndarray]]:
+        """Times (µs since the start) and views of the columns ``names`` (all by default) of chunk ``i``."""
+        count, offset = int(self.counts[i]), int(self.offsets[i])
+        deltas = frombuffer(self._mmap, dtype=delta_dtype, count=count, offset=offset)
+        times = self.first[i] + cumsum(deltas, dtype=int64)
+        wanted = set(self.channels if names is None else names)
+        columns = {}
+        offset += self._column_size(delta_dtype, count)
+        for name, dtype in self.channels.items():
+            if name in wanted:
+                columns[name] = frombuffer(self._mmap, dtype=dtype, count=count, offset=offset)
+            offset += self._column_size(dtype, count)
+        if missing := wanted - columns.keys():
+            raise KeyError(f"Not recorded: {', '.join(sorted(missing))}")
+        return times, columns
+
+    def read(self, *names: str, start: float | None = None, end: float | None = None) -> tuple[ndarray, dict[str, ndarray]]:
+        """Times (s since the start) and values of ``names`` (all by default) between ``start`` and ``end`` s.
+
+        Only the chunks overlapping the range are read, a range inside one
+        chunk gives views of the file, a longer one copies.
+        """
+        start_us = -inf if start is None else start * 1e6
+        end_us = inf if end is None else end * 1e6
+        first = searchsorted(self.last, start_us, side="left")
+        stop = searchsorted(self.first, end_us, side="right")
+        parts = [self.chunk(i, names or None) for i in range(first, max(first, stop))]
+        if not parts:
+            return empty(0, dtype=float64), {name: empty(0, dtype=self.channels[name]) for name in names or self.channels}
+        if len(parts) == 1:
+            times, columns = parts[0]
+        else:
+            times = concatenate([times for times, _ in parts])
+            columns = {name: concatenate([columns[name] for _, columns in parts]) for name in parts[0][1]}
+        i, j = searchsorted(times, start_us, side="left"), searchsorted(times, end_us, side="right")
+        return times[i:j] / 1e6, {name: values[i:j] for name, values in columns.items()}
+
+
+def downsample(times: ndarray, values: ndarray, points: int) -> tuple[ndarray, ndarray]:
+    """At most ``points`` samples that keep the spikes: the min and the max of each
+    of ``points // 2`` buckets, in time order."""
+    buckets = points // 2
+    if len(values) <= points or buckets < 1:
+        return times, values
+    size = -(-len(values) // buckets)
+    # the last bucket is padded with the last value
+    grid = concatenate([values, values[-1:].repeat(buckets * size - len(values))]).reshape(buckets, size)
+    edges = arange(buckets) * size
+    index = minimum(unique(concatenate([grid.argmin(axis=1) + edges, grid.argmax(axis=1) + edges])), len(values) - 1)
+    return times[index], values[index]
+
+
+def speed_error(columns: dict[str, ndarray]) -> ndarray | None:
+    """Speed minus target in m/s (TAS for a mach target), the autothrottle target if recorded, else the autopilot one."""
+    if "at_target" in columns:
+        target, mach = columns["at_target"], columns["at_target_mach"]
+    elif "spd_target" in columns:
+        target, mach = columns["spd_target"], columns["spd_mode"].astype(bool)
+    else:
+        return None
+    # a mach error is converted with the current speed of sound, tas / mach
+    sound_speed = columns["tas"] / maximum(columns["mach"], 1e-3)
+    return where(mach, (columns["mach"] - target) * sound_speed, columns["ias"] - target)
+
+
+def phase_summary(recording: FlightRecording, start: float | None = None, end: float | None = None) -> list[dict]:
+    """Climb rate, speed error and throttle activity of every flight phase (of the
+    ``phase`` channel, the whole range is one phase without it)."""
+    from .FlightPlan import FlightPhase
+
+    times, columns = recording.read(start=start, end=end)
+    if not len(times):
+        return []
+    phase = columns.get("phase")
+    bounds = [0, len(times)] if phase is None else [0, *(flatnonzero(diff(phase)) + 1), len(times)]
+    error = speed_error(columns)
+    rows = []
+    for i, j in pairwise(bounds):
+        row = {
+            "phase": "-" if phase is None else FlightPhase(int(phase[i])).name,
+            "start (s)": times[i],
+            "duration (s)": times[j - 1] - times[i],
+        }
+        if "msl" in columns:
+            row["altitude (ft)"] = f"{columns['msl'][i] / FT:.0f} -> {columns['msl'][j - 1] / FT:.0f}"
+        if "vs" in columns:
+            vs = columns["vs"][i:j] / FPM
+            row["mean vs (fpm)"] = vs.mean()
+            row["max |vs| (fpm)"] = abs(vs).max()
+        if error is not None and not isnan(error[i:j]).all():
+            row["mean |speed error| (kt)"] = nanmean(abs(error[i:j])) / KNOT
+            row["max |speed error| (kt)"] = nanmax(abs(error[i:j])) / KNOT
+        if "throttle" in columns:
+            moves = diff(columns["throttle"][i:j])
+            row["throttle moves"] = count_nonzero(moves)
+            row["throttle travel (%)"] = abs(moves).sum() * 100
+        rows.append(row)
+    return rows
+
+
+def main() -> None:
+    from argparse import ArgumentParser
+    from datetime import datetime
+    from tabulate import tabulate
+
+    parser = ArgumentParser(description="Per flight phase summary of a flight recording")
+    parser.add_argument("path")
+    parser.add_argument("--start", type=float, help="s since the start of the recording")
+    parser.add_argument("--end", type=float, help="s since the start of the recording")
+    args = parser.parse_args()
+
+    with FlightRecording(args.path) as recording:
+        print(f"Recorded {datetime.fromtimestamp(recording.start / 1e9):%Y-%m-%d %H:%M:%S}, "
+              f"{recording.duration:.0f} s, {len(recording)} samples at {recording.rate:g} Hz "
+              f"in {len(recording.counts)} chunks, {len(recording.channels)} channels")
+        print(tabulate(phase_summary(recording, args.start, args.end), headers="keys", floatfmt=".1f"))
+
+
+if __name__ == "__main__":
+    main()
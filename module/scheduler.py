@@ -0,0 +1,130 @@
+"""Fixed-rate scheduling of the control callbacks against monotonic deadlines.
+
+Every task has a deadline per period: the next one is the previous deadline
+plus the period, not the end of the run plus the period, so the time spent
+in the callback (network round-trips included) doesn't make the rate drift.
+A run that ends after its next deadline is an overrun, the periods it missed
+are skipped instead of run back to back.
+
+    scheduler = Scheduler()
+    scheduler.add("autothrottle", autothrottle, rate=5)
+    scheduler.add("vnav", vnav, rate=1)
+    scheduler.run()
+    print(scheduler.table())
+"""
+from dataclasses import dataclass, field
+from threading import Event
+from time import monotonic, sleep
+from math import floor
+from typing import Callable
+
+from .metrics import LatencyHistogram
+
+__all__ = ["Scheduler", "Task", "wait_until"]
+
+
+@dataclass(slots=True)
+class Task:
+    """Callback run every ``period`` s, it is done once it returns False."""
+    name: str
+    callback: Callable[[], bool | None]
+    period: float
+    # s from the start of ``Scheduler.run`` to the first run
+    offset: float = 0
+    next_due: float = 0
+    done: bool = False
+    runs: int = 0
+    # runs that ended after the next deadline and the periods they made skip
+    overruns: int = 0
+    skipped: int = 0
+    # ns between the deadline and the start of the run, ns of the run
+    jitter: LatencyHistogram = field(default_factory=LatencyHistogram)
+    duration: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def summary(self) -> dict[str, str | int | float]:
+        return {
+            "task": self.name,
+            "rate (Hz)": 1 / self.period,
+            "runs": self.runs,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "jitter p50 (ms)": self.jitter.percentile(50) / 1e6,
+            "jitter p99 (ms)": self.jitter.percentile(99) / 1e6,
+            "jitter max (ms)": self.jitter.max / 1e6,
+            "run mean (ms)": self.duration.mean / 1e6,
+            "run max (ms)": self.duration.max / 1e6,
+        }
+
+
+class Scheduler:
+    """Runs tasks of mixed rates in the calling thread, earliest deadline first.
+
+    The tasks share the thread: a long run delays the others, it shows in
+    their jitter.
+    """
+    def __init__(self) -> None:
+        self.tasks: list[Task] = []
+        self._stop = Event()
+
+    def add(self, name: str, callback: Callable[[], bool | None], rate: float, offset: float = 0.0) -> Task:
+        """Runs ``callback`` ``rate`` times per second, the first time ``offset`` s after ``run`` starts."""
+        task = Task(name, callback, 1 / rate, offset)
+        self.tasks.append(task)
+        return task
+
+    def stop(self) -> None:
+        """Makes ``run`` return after the run in progress, callable from a task or another thread."""
+        self._stop.set()
+
+    def run(self, duration: float | None = None) -> None:
+        """Runs the tasks until all of them are done, ``stop`` is called or ``duration`` s have passed.
+
+        Every call starts over: the tasks are due ``offset`` s after it, done ones run again.
+        """
+        self._stop.clear()
+        start = monotonic()
+        end = None if duration is None else start + duration
+        for task in self.tasks:
+            task.next_due = start + task.offset
+            task.done = False
+        while not self._stop.is_set():
+            pending = [task for task in self.tasks if not task.done]
+            if not pending:
+                break
+            task = min(pending, key=lambda task: task.next_due)
+            if end is not None and task.next_due > end:
+                break
+            if (wait := task.next_due - monotonic()) > 0 and self._stop.wait(wait):
+                break
+            self._run(task)
+
+    def _run(self, task: Task) -> None:
+        started = monotonic()
+        task.jitter.record(max(0, int((started - task.next_due) * 1e9)))
+        try:
+            task.done = task.callback() is False
+        finally:
+            ended = monotonic()
+            task.duration.record(int((ended - started) * 1e9))
+            task.runs += 1
+            task.next_due += task.period
+            if ended > task.next_due:
+                missed = floor((ended - task.next_due) / task.period) + 1
+                task.overruns += 1
+                task.skipped += missed
+                task.next_due += missed * task.period
+
+    def summary(self) -> list[dict[str, str | int | float]]:
+        return [task.summary() for task in self.tasks]
+
+    def table(self) -> str:
+        from tabulate import tabulate
+        return tabulate(self.summary(), headers="keys", floatfmt=".2f")
+
+
+def wait_until(condition: Callable[[], bool], period: float = 1.0) -> None:
+    """Checks ``condition`` every ``period`` s against monotonic deadlines until it is true."""
+    next_due = monotonic()
+    while not condition():
+        next_due = max(next_due + period, monotonic())
+        sleep(max(0, next_due - monotonic()))
@@ -0,0 +1,358 @@
+"""Wire-level capture and replay of Connect sessions.
+
+A session file is a header followed by the frames in the order they happened,
+little endian::
+
+    header: b"IFSR", version (H), wall clock time of the start in ns (q)
+    frame:  kind (B), ns since the start (q), payload length (i), payload
+
+``kind`` is ``SENT``/``RECEIVED`` for the bytes of one ``sendall``/``recv_into``
+call, ``CONNECT`` (no payload) every time the client opens a connection and
+``CLOCK`` (readings since the previous frame, I) when the clock of the client
+caches moves without any other frame (see ``SessionWriter.clock``).
+
+Record with ``IFClient(ip, port, record="logs/session.ifsr")`` and replay with::
+
+    replay = SessionReplay("logs/session.ifsr")
+    IFClient(ip, port, transport=replay.connect, clock=replay.clock)
+
+The client must send the same requests, start both runs with the same manifest
+cache state (e.g. an empty ``ManifestCache`` path). The clock of the caches is
+the time of the last frame, which the replay takes from the frame times: the
+caches hit and miss like in the recording whatever the replay speed.
+"""
+from struct import Struct
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from time import perf_counter_ns, time_ns, sleep
+from typing import Iterator, BinaryIO
+import atexit
+
+from .metrics import LatencyHistogram
+
+MAGIC = b"IFSR"
+VERSION = 3
+# the caches of versions 1 and 2 read ``monotonic``, they only replay approximately with ``clock``
+SUPPORTED_VERSIONS = (1, 2, 3)
+file_header = Struct("<4sHq")
+frame_header = Struct("<Bqi")
+clock_reads = Struct("<I")
+
+SENT = 0
+RECEIVED = 1
+CONNECT = 2
+# every clock reading of version 2 (a double), skipped
+CLOCK_V2 = 3
+CLOCK = 4
+
+
+class ReplayError(RuntimeError):
+    """The client diverged from the recorded session."""
+
+
+@dataclass(slots=True)
+class Frame:
+    kind: int
+    time: int
+    data: bytes
+
+
+class SessionWriter:
+    """Appends frames to a session file, shared by every connection of a client.
+
+    Args:
+        path (str | Path): session file, overwritten
+    """
+    # ns the clock of the caches may lag behind while no frame is written
+    resolution = 50_000_000
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file: BinaryIO = open(self.path, "wb", buffering=1 << 16)
+        self.start = perf_counter_ns()
+        self.file.write(file_header.pack(MAGIC, VERSION, time_ns()))
+        self._lock = Lock()
+        # time of the last frame and clock readings since
+        self._last = 0
+        self._reads = 0
+        atexit.register(self.close)
+
+    def _write(self, kind: int, data: bytes) -> None:
+        self._last = perf_counter_ns() - self.start
+        self._reads = 0
+        self.file.write(frame_header.pack(kind, self._last, len(data)))
+        self.file.write(data)
+
+    def write(self, kind: int, data: bytes = b"") -> None:
+        with self._lock:
+            if not self.file.closed:
+                self._write(kind, data)
+
+    def clock(self) -> float:
+        """Time (s) of the last frame, the clock of the client caches while recording.
+
+        Read more than ``resolution`` after the last frame, the clock moves to the
+        current time with a ``CLOCK`` frame, which holds the number of readings
+        since the last frame for the replay to tell which reading moved it.
+        """
+        with self._lock:
+            if self.file.closed:
+                return (perf_counter_ns() - self.start) / 1e9
+            if perf_counter_ns() - self.start - self._last > self.resolution:
+                self._write(CLOCK, clock_reads.pack(self._reads))
+            else:
+                self._reads += 1
+            return self._last / 1e9
+
+    def close(self) -> None:
+        with self._lock:
+            if not self.file.closed:
+                self.file.close()
+
+    def __enter__(self) -> 'SessionWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class RecordingSocket:
+    """Socket proxy that writes every chunk sent and received to a ``SessionWriter``."""
+    def __init__(self, sock, writer: SessionWriter) -> None:
+        self.sock = sock
+        self.writer = writer
+        writer.write(CONNECT)
+
+    def sendall(self, data: bytes | bytearray | memoryview) -> None:
+        self.writer.write(SENT, bytes(data))
+        self.sock.sendall(data)
+
+    def recv_into(self, buffer: bytearray | memoryview, nbytes: int = 0) -> int:
+        n = self.sock.recv_into(buffer, nbytes)
+        if n:
+            self.writer.write(RECEIVED, bytes(buffer[:n]))
+        return n
+
+    def recv(self, bufsize: int) -> bytes:
+        data = self.sock.recv(bufsize)
+        if data:
+            self.writer.write(RECEIVED, data)
+        return data
+
+    def __getattr__(self, name: str):
+        return getattr(self.sock, name)
+
+
+def read_session(path: str | Path) -> tuple[int, list[Frame]]:
+    """Returns the wall clock start (ns) and the frames of a session file."""
+    data = Path(path).read_bytes()
+    magic, version, start = file_header.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a session file")
+    if version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Unsupported session version {version}")
+    frames = []
+    offset = file_header.size
+    # a truncated last frame (crash while recording) is dropped
+    while offset + frame_header.size <= len(data):
+        kind, t, lenght = frame_header.unpack_from(data, offset)
+        offset += frame_header.size
+        if offset + lenght > len(data):
+            break
+        frames.append(Frame(kind, t, data[offset:offset + lenght]))
+        offset += lenght
+    return start, frames
+
+
+class ReplaySocket:
+    """Plays one recorded connection back to the client.
+
+    What the client sends is checked against the recorded requests (``strict``),
+    ``recv_into`` hands out the recorded responses. With ``realtime`` every
+    response is held back by the latency it had in the recording, measured from
+    the request that preceded it. ``clock`` replays the clock of the caches.
+    """
+    def __init__(self, frames: list[Frame], realtime: bool = False, strict: bool = True) -> None:
+        self.frames = frames
+        self.realtime = realtime
+        self.strict = strict
+        self.pos = 0
+        self._partial = 0
+        self._pending = bytearray()
+        self._last_sent: tuple[int, int] | None = None
+        self.timeout: float | None = None
+        # time of the last frame replayed and clock readings since, see SessionWriter.clock
+        self.time = 0
+        self._reads = 0
+        if frames and frames[0].kind == CONNECT:
+            self._next_frame()
+
+    def _next_frame(self) -> Frame:
+        frame = self.frames[self.pos]
+        self.pos += 1
+        self.time = frame.time
+        self._reads = 0
+        return frame
+
+    def _skip_clock(self) -> None:
+        # replayed without ``clock``
+        while not self._partial and self.pos < len(self.frames) and self.frames[self.pos].kind == CLOCK:
+            self._next_frame()
+
+    def clock(self) -> int:
+        """Recorded time (ns) of the clock of the caches at this reading."""
+        if not self._partial and self.pos < len(self.frames):
+            frame = self.frames[self.pos]
+            if frame.kind == CLOCK and clock_reads.unpack(frame.data)[0] == self._reads:
+                return self._next_frame().time
+        self._reads += 1
+        return self.time
+
+    def _queue_received(self) -> None:
+        frame = self.frames[self.pos]
+        if self.realtime and self._last_sent is not None:
+            sent_at, recorded_at = self._last_sent
+            wait = (frame.time - recorded_at) - (perf_counter_ns() - sent_at)
+            if wait > 0:
+                sleep(wait / 1e9)
+        self._pending += self._next_frame().data
+
+    def sendall(self, data: bytes | bytearray | memoryview) -> None:
+        view = memoryview(data).cast("B")
+        while view:
+            self._skip_clock()
+            if self.pos >= len(self.frames):
+                raise ReplayError("The client sent more than the recording has")
+            frame = self.frames[self.pos]
+            if frame.kind == RECEIVED and not self._partial:
+                # the response was already on the wire when the client sent again
+                self._queue_received()
+                continue
+            if frame.kind != SENT:
+                raise ReplayError(f"The client sent data where the recording has frame {self.pos} of kind {frame.kind}")
+            n = min(len(view), len(frame.data) - self._partial)
+            if self.strict and view[:n] != frame.data[self._partial:self._partial + n]:
+                raise ReplayError(f"Request differs from the recording at frame {self.pos} ({frame.time / 1e6:.1f} ms)")
+            view = view[n:]
+            self._partial += n
+            if self._partial == len(frame.data):
+                self._last_sent = (perf_counter_ns(), frame.time)
+                self._next_frame()
+                self._partial = 0
+
+    def recv_into(self, buffer: bytearray | memoryview, nbytes: int = 0) -> int:
+        if not self._pending:
+            self._skip_clock()
+            if self._partial or self.pos >= len(self.frames) or self.frames[self.pos].kind != RECEIVED:
+                raise ReplayError(f"The client waits for a response the recording doesn't have (frame {self.pos})")
+            self._queue_received()
+        n = min(nbytes or len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        del self._pending[:n]
+        return n
+
+    def recv(self, bufsize: int) -> bytes:
+        buffer = bytearray(bufsize)
+        return bytes(buffer[:self.recv_into(buffer, bufsize)])
+
+    def settimeout(self, timeout: float | None) -> None:
+        self.timeout = timeout
+
+    def gettimeout(self) -> float | None:
+        return self.timeout
+
+    def setsockopt(self, *args) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class SessionReplay:
+    """Recorded session split in its connections, ``connect`` is a transport for ``IFClient``
+    and ``clock`` the clock of its caches.
+
+    Args:
+        path (str | Path): session file
+        realtime (bool): reproduce the recorded response latencies
+        strict (bool): check the requests against the recording
+    """
+    def __init__(self, path: str | Path, realtime: bool = False, strict: bool = True) -> None:
+        self.start, frames = read_session(path)
+        self.realtime = realtime
+        self.strict = strict
+        # each connection starts with its CONNECT frame, if the recording has one
+        self.connections: list[list[Frame]] = []
+        for frame in frames:
+            if frame.kind == CLOCK_V2:
+                continue
+            if frame.kind == CONNECT or not self.connections:
+                self.connections.append([])
+            self.connections[-1].append(frame)
+        self._next = 0
+        self._socket: ReplaySocket | None = None
+
+    def connect(self) -> ReplaySocket:
+        if self._next >= len(self.connections):
+            raise ReplayError("No more connections in the recording")
+        self._next += 1
+        self._socket = ReplaySocket(self.connections[self._next - 1], self.realtime, self.strict)
+        return self._socket
+
+    def clock(self) -> float:
+        """Recorded time (s) of the clock of the caches, see ``SessionWriter.clock``."""
+        return 0.0 if self._socket is None else self._socket.clock() / 1e9
+
+    def __iter__(self) -> Iterator[ReplaySocket]:
+        while self._next < len(self.connections):
+            yield self.connect()
+
+
+def latencies(frames: list[Frame]) -> list[tuple[int, int]]:
+    """(time of the request, ns until the first byte of the response) of every request followed by a response."""
+    result = []
+    sent = None
+    for frame in frames:
+        if frame.kind == SENT and sent is None:
+            sent = frame.time
+        elif frame.kind == RECEIVED and sent is not None:
+            result.append((sent, frame.time - sent))
+            sent = None
+        elif frame.kind == CONNECT:
+            sent = None
+    return result
+
+
+def main() -> None:
+    from argparse import ArgumentParser
+    from datetime import datetime
+    from tabulate import tabulate
+
+    parser = ArgumentParser(description="Summary of a recorded Connect session")
+    parser.add_argument("path")
+    parser.add_argument("--spikes", type=int, default=5, help="slowest responses to list")
+    args = parser.parse_args()
+
+    start, frames = read_session(args.path)
+    sent = [frame for frame in frames if frame.kind == SENT]
+    received = [frame for frame in frames if frame.kind == RECEIVED]
+    pairs = latencies(frames)
+    histogram = LatencyHistogram()
+    for _, ns in pairs:
+        histogram.record(ns)
+    print(f"Recorded {datetime.fromtimestamp(start / 1e9):%Y-%m-%d %H:%M:%S}, "
+          f"{frames[-1].time / 1e9 if frames else 0:.1f} s, "
+          f"{sum(frame.kind == CONNECT for frame in frames)} connections")
+    print(tabulate([
+        ("sent", len(sent), sum(len(frame.data) for frame in sent)),
+        ("received", len(received), sum(len(frame.data) for frame in received)),
+    ], headers=("", "frames", "bytes")))
+    if histogram.count:
+        print(f"\nresponse latency (µs): mean {histogram.mean / 1e3:.1f}, p50 {histogram.percentile(50) / 1e3:.1f}, "
+              f"p99 {histogram.percentile(99) / 1e3:.1f}, max {histogram.max / 1e3:.1f}")
+        spikes = sorted(pairs, key=lambda pair: pair[1], reverse=True)[:args.spikes]
+        print(tabulate([(f"{t / 1e9:.3f}", f"{ns / 1e3:.1f}") for t, ns in spikes], headers=("at (s)", "latency (µs)")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,550 @@
+"""Stand-in for the Infinite Flight Connect API (v2) backed by a point-mass aircraft.
+
+Serves the manifest, typed reads and writes and the ``full_info`` flight plan
+over the same binary protocol ``IFClient`` speaks, so the whole program can run
+without a device. The clock can run faster than real time::
+
+    python -m module.simulator --port 10112 --time-scale 20
+"""
+from math import sin, cos, asin, atan2, sqrt, radians, degrees, pi, copysign
+from socketserver import ThreadingTCPServer, BaseRequestHandler
+from socket import socket, AF_INET, SOCK_DGRAM, SOL_SOCKET, SO_BROADCAST, IPPROTO_TCP, TCP_NODELAY
+from dataclasses import dataclass
+from threading import RLock, Thread, Event
+from typing import Callable
+from time import monotonic
+from json import dumps
+
+from .codec import header, request, string_length, value_structs, return_type
+from .convertion import G, EARTH_RADIUS, FT, NM, KNOT, FPM
+from .atmosphere import tas2cas, tas2mach, mach2cas
+from .logger import debug_logger, logger
+
+# the autothrottle reads ``acceleration/z * -1e3`` and aims at 9 for ~1.1 knot/s
+ACCEL_SCALE = 9e-3 / (1.1 * KNOT)
+
+type route_type = list[tuple[str, float, float, float]]
+
+
+def default_route() -> route_type:
+    """LIRF -> LIMC as (name, lat, lon, altitude in ft), airports at altitude 0."""
+    origin, destination = ("LIRF", 41.8003, 12.2389), ("LIMC", 45.6306, 8.7231)
+    altitudes = (3_000, 8_000, 15_000, 24_000, 33_000, 35_000, 35_000, 35_000, 35_000, 24_000, 12_000, 5_000)
+    route = [(*origin, 0)]
+    n = len(altitudes) + 1
+    for i, alt in enumerate(altitudes, 1):
+        route.append((
+            f"SIM{i:02d}",
+            origin[1] + (destination[1] - origin[1]) * i / n,
+            origin[2] + (destination[2] - origin[2]) * i / n,
+            alt,
+        ))
+    route.append((*destination, 0))
+    return route
+
+
+def _distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """great circle distance in m, coordinates in rad"""
+    a = sin((lat2 - lat1) / 2)**2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2)**2
+    return 2 * EARTH_RADIUS * asin(min(1, sqrt(a)))
+
+
+def _bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    delta_lon = lon2 - lon1
+    return atan2(cos(lat2) * sin(delta_lon), cos(lat1) * sin(lat2) - sin(lat1) * cos(lat2) * cos(delta_lon))
+
+
+@dataclass(slots=True)
+class PointMass:
+    """Point-mass aircraft, SI units and radians.
+
+    Thrust follows the throttle with a first-order lag, drag goes with the
+    dynamic pressure and the climb costs ``g * sin(γ)``. The autopilot holds
+    speed with the throttle when ``spd_on`` and flies the VS target towards the
+    altitude target when ``alt_on``; laterally it follows the route.
+    """
+    route: route_type
+    lat: float = 0
+    lon: float = 0
+    alt: float = 0
+    elevation: float = 0
+    hdg: float = 0
+    tas: float = 0
+    vs: float = 0
+    accel: float = 0
+    n1: float = 0.2
+    # axis value, 1000 is idle and -1000 full thrust
+    throttle: int = 1000
+    on_ground: bool = True
+    gear_down: bool = True
+    landing_lights: int = 1
+    seatbelt: bool = True
+    flaps: int = 2
+    elevator: int = 0
+    trim: int = 0
+    next_index: int = 1
+    # autopilot, targets in the units the client writes them
+    ap_on: bool = True
+    alt_on: bool = True
+    alt_target: float = 10_000 * FT
+    vs_on: bool = True
+    vs_target: float = 1500 * FPM * 60
+    spd_on: bool = False
+    spd_target: float = 0
+    spd_mode: int = 0
+    hdg_on: bool = False
+    hdg_target: float = 0
+    bank_on: bool = False
+    bank_target: float = 0
+    nav_on: bool = True
+    vnav_on: bool = False
+    time: float = 0
+
+    # performance, roughly a twin in the 777 class
+    max_thrust = 3.0        # m/s² at full N1, none at idle
+    drag = 1.1e-4           # m/s² per (m/s)² of IAS
+    rolling = 0.02          # rolling friction coefficient
+    idle_n1 = 0.2
+    spool = 2.0             # s
+    vr = 150 * KNOT
+    vs_lag = 3.0            # s
+    turn_rate = radians(3)  # rad/s
+    mach_altitude = 28_000 * FT
+
+    def __post_init__(self) -> None:
+        if not (self.lat or self.lon):
+            _, self.lat, self.lon, _ = self.route[0]
+        self.elevation = self.alt
+        if len(self.route) > 1:
+            _, lat, lon, _ = self.route[1]
+            self.hdg = _bearing(radians(self.lat), radians(self.lon), radians(lat), radians(lon))
+
+    @property
+    def ias(self) -> float:
+        # no instrument or position error: the indicated airspeed is the calibrated one
+        return float(tas2cas(self.tas, self.alt))
+
+    @property
+    def mach(self) -> float:
+        return float(tas2mach(self.tas, self.alt))
+
+    @property
+    def agl(self) -> float:
+        return self.alt - self.elevation
+
+    @property
+    def thrust_lever(self) -> float:
+        return (1000 - self.throttle) / 2000
+
+    @property
+    def dist_to_next(self) -> float:
+        if self.next_index >= len(self.route):
+            return 0
+        _, lat, lon, _ = self.route[self.next_index]
+        return _distance(radians(self.lat), radians(self.lon), radians(lat), radians(lon))
+
+    def _drag(self, ias: float) -> float:
+        return self.drag * ias**2 * (1 + 0.1 * self.gear_down + 0.05 * self.flaps)
+
+    def _climb(self) -> float:
+        return G * self.vs / self.tas if self.tas > 1 else 0
+
+    def _hold_speed(self, ias: float) -> None:
+        """autothrottle of the simulator: picks the N1 that gives the acceleration to the target"""
+        if self.spd_mode:
+            target = float(mach2cas(self.spd_target, self.alt))
+        else:
+            target = self.spd_target
+        accel = max(-1, min(1, 0.2 * (target - ias)))
+        lever = (accel + self._drag(ias) + self._climb()) / self.max_thrust
+        self.throttle = int(1000 - 2000 * max(0, min(1, lever)))
+
+    def _switch_speed_mode(self) -> None:
+        mode = int(self.alt >= self.mach_altitude)
+        if mode == self.spd_mode:
+            return
+        # like the real autopilot the target is converted when the mode changes
+        if mode:
+            self.spd_target = round(self.mach, 2)
+        else:
+            self.spd_target = self.ias
+        self.spd_mode = mode
+
+    def _vertical(self, dt: float) -> None:
+        if not self.ap_on or not self.alt_on:
+            target = 0
+        else:
+            delta = self.alt_target - self.alt
+            rate = abs(self.vs_target) / 60 if self.vs_on else 1500 * FPM
+            # capture: the last part of the climb is flown at 1/10 of the distance per second
+            target = copysign(min(rate, abs(delta) / 10), delta)
+        self.vs += (target - self.vs) * min(1, dt / self.vs_lag)
+
+    def _lateral(self, dt: float) -> None:
+        if self.ap_on and self.hdg_on:
+            target = self.hdg_target
+        elif self.ap_on and self.nav_on and self.next_index < len(self.route):
+            _, lat, lon, _ = self.route[self.next_index]
+            target = _bearing(radians(self.lat), radians(self.lon), radians(lat), radians(lon))
+        else:
+            return
+        error = (target - self.hdg + pi) % (2 * pi) - pi
+        step = self.turn_rate * dt
+        self.hdg = (self.hdg + max(-step, min(step, error))) % (2 * pi)
+
+    def _move(self, dt: float) -> None:
+        distance = self.tas * cos(asin(max(-1, min(1, self.vs / self.tas)))) * dt if self.tas > 1 else self.tas * dt
+        if not distance:
+            return
+        lat, lon, angle = radians(self.lat), radians(self.lon), distance / EARTH_RADIUS
+        lat2 = asin(sin(lat) * cos(angle) + cos(lat) * sin(angle) * cos(self.hdg))
+        lon2 = lon + atan2(sin(self.hdg) * sin(angle) * cos(lat), cos(angle) - sin(lat) * sin(lat2))
+        self.lat, self.lon = degrees(lat2), degrees(lon2)
+        # sequence the waypoint once inside the turn radius
+        if self.next_index < len(self.route) and self.dist_to_next < max(NM, self.tas / self.turn_rate):
+            self.next_index += 1
+
+    def step(self, dt: float) -> None:
+        ias = self.ias
+        if self.ap_on and self.spd_on and not self.on_ground:
+            self._hold_speed(ias)
+        self.n1 += (self.idle_n1 + (1 - self.idle_n1) * self.thrust_lever - self.n1) * min(1, dt / self.spool)
+
+        accel = self.max_thrust * (self.n1 - self.idle_n1) / (1 - self.idle_n1) - self._drag(ias)
+        if self.on_ground:
+            accel -= self.rolling * G
+            if self.tas <= 0 and accel < 0:
+                accel = 0
+        else:
+            accel -= self._climb()
+        self.accel = accel
+        self.tas = max(0, self.tas + accel * dt)
+
+        if self.on_ground:
+            if ias >= self.vr:
+                self.on_ground = False
+        else:
+            self._vertical(dt)
+            self.alt = max(self.elevation, self.alt + self.vs * dt)
+            self._switch_speed_mode()
+            self._lateral(dt)
+        self._move(dt)
+        self.time += dt
+
+
+@dataclass(slots=True)
+class Entry:
+    path: str
+    Type: int
+    get: Callable[[], return_type] | None = None
+    set: Callable[[return_type], None] | None = None
+
+
+class Simulator:
+    """Manifest and values of a simulated Infinite Flight session.
+
+    Args:
+        aircraft (str): name served at ``aircraft/0/name``
+        route (route_type | None): flight plan as (name, lat, lon, altitude in ft),
+            ``default_route()`` if not given
+        time_scale (float | None): simulated seconds per wall clock second,
+            None to only move with ``advance(seconds)``
+        pilot_delay (float | None): simulated seconds after which the "pilot" brings the
+            thrust levers past 50% N1 for the take off, None to leave them at idle
+    """
+    dt = 0.1
+    app_version = "simulator"
+
+    def __init__(self, aircraft: str = "Boeing 777-300ER", route: route_type | None = None,
+                 time_scale: float | None = 1.0, pilot_delay: float | None = 5.0) -> None:
+        self.aircraft = aircraft
+        self.route = default_route() if route is None else route
+        self.model = PointMass(self.route, alt=self.route[0][3] * FT)
+        self.time_scale = time_scale
+        self.pilot_delay = pilot_delay
+        self.lock = RLock()
+        self.requests = 0
+        self._wall = monotonic()
+        self.flap_names = ("Up ", "1 ", "5 ", "15 ", "20 ", "25 ", "30 ")
+        self.entries = self._entries()
+        self.types: dict[int, int] = {command: entry.Type for command, entry in enumerate(self.entries)}
+        self.manifest = "\n".join(f"{command},{entry.Type},{entry.path}" for command, entry in enumerate(self.entries))
+
+    def _entries(self) -> list[Entry]:
+        m = self.model
+
+        def attr(name: str, convert_get=None, convert_set=None):
+            get = (lambda: getattr(m, name)) if convert_get is None else (lambda: convert_get(getattr(m, name)))
+            set = (lambda v: setattr(m, name, v)) if convert_set is None else (lambda v: setattr(m, name, convert_set(v)))
+            return get, set
+
+        entries = [
+            Entry("aircraft/0/name", 4, lambda: self.aircraft),
+            Entry("aircraft/0/livery", 4, lambda: "Simulator"),
+            Entry("aircraft/0/altitude_msl", 2, lambda: m.alt / FT),
+            Entry("aircraft/0/altitude_agl", 2, lambda: m.agl / FT),
+            Entry("aircraft/0/true_airspeed", 2, lambda: m.tas),
+            Entry("aircraft/0/indicated_airspeed", 2, lambda: m.ias),
+            Entry("aircraft/0/groundspeed", 2, lambda: m.tas),
+            Entry("aircraft/0/mach_speed", 2, lambda: m.mach),
+            Entry("aircraft/0/heading_magnetic", 2, lambda: m.hdg),
+            Entry("aircraft/0/course", 2, lambda: m.hdg),
+            Entry("aircraft/0/vertical_speed", 2, lambda: m.vs * 60),
+            Entry("aircraft/0/pitch", 2, lambda: asin(max(-1, min(1, m.vs / m.tas))) if m.tas > 1 else 0),
+            Entry("aircraft/0/acceleration/z", 2, lambda: -m.accel * ACCEL_SCALE),
+            Entry("aircraft/0/airspeed_change_rate", 2, lambda: m.accel / KNOT),
+            Entry("aircraft/0/crosswind_component", 2, lambda: 0.0),
+            Entry("aircraft/0/oat", 2, lambda: max(-56.5, 15 - 6.5e-3 * m.alt)),
+            Entry("aircraft/0/latitude", 2, lambda: m.lat),
+            Entry("aircraft/0/longitude", 2, lambda: m.lon),
+            Entry("aircraft/0/is_on_ground", 0, lambda: m.on_ground),
+            Entry("aircraft/0/is_on_runway", 0, lambda: m.on_ground),
+            Entry("aircraft/0/flightplan/next_waypoint_index", 1, lambda: m.next_index),
+            Entry("aircraft/0/flightplan/next_waypoint_dist", 2, lambda: m.dist_to_next / NM),
+            Entry("aircraft/0/flightplan/full_info", 4, self.full_info),
+            Entry("aircraft/0/systems/engines/0/n1", 2, lambda: m.n1),
+            Entry("aircraft/0/systems/engines/0/n1_target", 2, lambda: m.idle_n1 + (1 - m.idle_n1) * m.thrust_lever),
+            Entry("aircraft/0/systems/engines/0/thrust_percentage", 2, lambda: m.n1),
+            Entry("aircraft/0/systems/engines/0/target_thrust_percentage", 2, lambda: m.thrust_lever),
+            Entry("aircraft/0/systems/axes/pitch", 1, *attr("elevator")),
+            Entry("aircraft/0/systems/axes/0/value", 1, *attr("elevator")),
+            Entry("aircraft/0/systems/axes/elevator_trim", 1, *attr("trim")),
+            Entry("aircraft/0/systems/landing_gear/lever_state", 1, *attr("gear_down", int, bool)),
+            Entry("aircraft/0/systems/landing_lights_controller/state", 1, *attr("landing_lights")),
+            Entry("aircraft/0/systems/seatbelt", 0, *attr("seatbelt")),
+            Entry("aircraft/0/systems/flaps/state", 1, *attr("flaps")),
+            Entry("aircraft/0/configuration/flaps/stops", 1, lambda: len(self.flap_names)),
+            *(Entry(f"aircraft/0/configuration/flaps/stops/{i}/name", 4, lambda name=name: name)
+              for i, name in enumerate(self.flap_names)),
+            Entry("aircraft/0/systems/autopilot/on", 0, *attr("ap_on")),
+            Entry("aircraft/0/systems/autopilot/alt/on", 0, *attr("alt_on")),
+            Entry("aircraft/0/systems/autopilot/alt/target", 2, *attr("alt_target")),
+            Entry("aircraft/0/systems/autopilot/vs/on", 0, *attr("vs_on")),
+            Entry("aircraft/0/systems/autopilot/vs/target", 2, *attr("vs_target")),
+            Entry("aircraft/0/systems/autopilot/spd/on", 0, *attr("spd_on")),
+            Entry("aircraft/0/systems/autopilot/spd/target", 2, *attr("spd_target")),
+            Entry("aircraft/0/systems/autopilot/spd/mode", 1, lambda: m.spd_mode),
+            Entry("aircraft/0/systems/autopilot/hdg/on", 0, *attr("hdg_on")),
+            Entry("aircraft/0/systems/autopilot/hdg/target", 2, *attr("hdg_target")),
+            Entry("aircraft/0/systems/autopilot/bank/on", 0, *attr("bank_on")),
+            Entry("aircraft/0/systems/autopilot/bank/target", 2, *attr("bank_target")),
+            Entry("aircraft/0/systems/autopilot/nav/on", 0, *attr("nav_on")),
+            Entry("aircraft/0/systems/autopilot/vnav/on", 0, *attr("vnav_on")),
+            Entry("simulator/throttle", 1, *attr("throttle")),
+            Entry("commands/LandingGear", -1, set=lambda _: setattr(m, "gear_down", not m.gear_down)),
+            Entry("commands/LandingLights", -1, set=lambda _: setattr(m, "landing_lights", int(not m.landing_lights))),
+            Entry("infiniteflight/app_version", 4, lambda: self.app_version),
+        ]
+        return entries
+
+    def full_info(self) -> str:
+        """flight plan JSON in the shape of ``flightplan/full_info``"""
+        items = [
+            {
+                "identifier": name,
+                "name": name,
+                "altitude": alt,
+                "location": {"Latitude": lat, "Longitude": lon, "AltitudeLight": alt},
+                "children": None,
+            }
+            for name, lat, lon, alt in self.route
+        ]
+        return dumps({"detailedInfo": {"flightPlanItems": items}})
+
+    @property
+    def time(self) -> float:
+        return self.model.time
+
+    def advance(self, seconds: float | None = None) -> None:
+        """Moves the model ``seconds`` forward, or up to the scaled wall clock time if not given."""
+        with self.lock:
+            if seconds is None:
+                if self.time_scale is None:
+                    return
+                seconds = (monotonic() - self._wall) * self.time_scale - self.model.time
+            m = self.model
+            for _ in range(int(seconds / self.dt)):
+                if (self.pilot_delay is not None and m.on_ground and m.time >= self.pilot_delay
+                        and m.thrust_lever < 0.5):
+                    m.throttle = 0
+                m.step(self.dt)
+
+    def connect(self) -> 'LoopbackSocket':
+        return LoopbackSocket(self)
+
+    def read(self, command: int) -> return_type:
+        with self.lock:
+            self.requests += 1
+            return self.entries[command].get()
+
+    def write(self, command: int, value: return_type) -> None:
+        with self.lock:
+            self.requests += 1
+            entry = self.entries[command]
+            if entry.set is None:
+                debug_logger.warning(f"Simulator: {entry.path} is read only")
+                return
+            entry.set(value)
+
+
+class ConnectProtocol:
+    """Sans-IO side of the server: bytes of requests in, bytes of responses out.
+
+    Requests may be split or coalesced arbitrarily, incomplete ones are kept
+    until the rest arrives.
+    """
+    def __init__(self, simulator: Simulator) -> None:
+        self.simulator = simulator
+        self.buffer = bytearray()
+
+    @staticmethod
+    def _response(command: int, Type: int, value: return_type) -> bytes:
+        if Type == 4:
+            data = value.encode("utf-8")
+            return header.pack(command, len(data) + 4) + string_length.pack(len(data)) + data
+        st = value_structs[Type]
+        return header.pack(command, st.size) + st.pack(value)
+
+    def feed(self, data: bytes) -> bytes:
+        simulator = self.simulator
+        simulator.advance()
+        buffer = self.buffer
+        buffer += data
+        out = bytearray()
+        offset = 0
+        while len(buffer) - offset >= request.size:
+            command, write = request.unpack_from(buffer, offset)
+            end = offset + request.size
+            if command == -1:
+                out += self._response(-1, 4, simulator.manifest)
+                offset = end
+                continue
+            Type = simulator.types.get(command)
+            if Type is None:
+                debug_logger.warning(f"Simulator: unknown command {command}")
+            elif Type == -1:
+                simulator.write(command, None)
+            elif write:
+                if Type == 4:
+                    if len(buffer) - end < string_length.size:
+                        break
+                    lenght = string_length.unpack_from(buffer, end)[0]
+                    if len(buffer) - end - string_length.size < lenght:
+                        break
+                    end += string_length.size
+                    value = str(buffer[end:end + lenght], "utf-8")
+                    end += lenght
+                else:
+                    st = value_structs[Type]
+                    if len(buffer) - end < st.size:
+                        break
+                    value = st.unpack_from(buffer, end)[0]
+                    end += st.size
+                simulator.write(command, value)
+            else:
+                out += self._response(command, Type, simulator.read(command))
+            offset = end
+        del buffer[:offset]
+        return bytes(out)
+
+
+class LoopbackSocket:
+    """In-process transport to a ``Simulator``: ``IFClient(..., transport=simulator.connect)``."""
+    def __init__(self, simulator: Simulator) -> None:
+        self.protocol = ConnectProtocol(simulator)
+        self._pending = bytearray()
+        self.timeout: float | None = None
+
+    def sendall(self, data: bytes | bytearray | memoryview) -> None:
+        self._pending += self.protocol.feed(data)
+
+    def recv_into(self, buffer: bytearray | memoryview, nbytes: int = 0) -> int:
+        # nothing pending: the request has no response, like a closed connection
+        n = min(nbytes or len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        del self._pending[:n]
+        return n
+
+    def recv(self, bufsize: int) -> bytes:
+        data = bytes(self._pending[:bufsize])
+        del self._pending[:bufsize]
+        return data
+
+    def settimeout(self, timeout: float | None) -> None:
+        self.timeout = timeout
+
+    def gettimeout(self) -> float | None:
+        return self.timeout
+
+    def setsockopt(self, *args) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class _Handler(BaseRequestHandler):
+    def handle(self) -> None:
+        self.request.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
+        protocol = ConnectProtocol(self.server.simulator)
+        debug_logger.debug(f"Simulator: {self.client_address} connected")
+        while data := self.request.recv(65536):
+            if out := protocol.feed(data):
+                self.request.sendall(out)
+        debug_logger.debug(f"Simulator: {self.client_address} disconnected")
+
+
+class SimulatorServer(ThreadingTCPServer):
+    """TCP server of a ``Simulator``, one thread per connection."""
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], simulator: Simulator) -> None:
+        super().__init__(address, _Handler)
+        self.simulator = simulator
+
+
+def broadcast(addresses: list[str], port: int, stop: Event, interval: float = 1.0,
+              target: tuple[str, int] = ("255.255.255.255", 15000)) -> None:
+    """Announces the server like the app does, a JSON datagram every ``interval`` seconds until ``stop`` is set."""
+    data = dumps({"addresses": addresses, "port": port, "deviceName": "Simulator"}).encode("utf-8")
+    with socket(AF_INET, SOCK_DGRAM) as sock:
+        sock.setsockopt(SOL_SOCKET, SO_BROADCAST, 1)
+        while not stop.is_set():
+            sock.sendto(data, target)
+            stop.wait(interval)
+
+
+def main() -> None:
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Local stand-in of the Infinite Flight Connect API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=10112)
+    parser.add_argument("--time-scale", type=float, default=1.0, help="simulated seconds per second")
+    parser.add_argument("--aircraft", default="Boeing 777-300ER")
+    parser.add_argument("--pilot-delay", type=float, default=5.0,
+                        help="seconds before the thrust levers are advanced for the take off, negative to never")
+    parser.add_argument("--broadcast", metavar="ADDRESS", action="append", default=[],
+                        help="announce ADDRESS on UDP 15000 for discovery")
+    args = parser.parse_args()
+
+    simulator = Simulator(args.aircraft, time_scale=args.time_scale,
+                          pilot_delay=None if args.pilot_delay < 0 else args.pilot_delay)
+    stop = Event()
+    with SimulatorServer((args.host, args.port), simulator) as server:
+        if args.broadcast:
+            Thread(target=broadcast, args=(args.broadcast, args.port, stop), name="Broadcast", daemon=True).start()
+        logger.info(f"Simulator listening on {args.host}:{args.port} at x{args.time_scale}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop.set()
+            simulator.advance()
+            m = simulator.model
+            logger.info(f"Simulator stopped after {simulator.time:.0f} s, {simulator.requests} requests, "
+                        f"alt {m.alt / FT:.0f} ft, ias {m.ias / KNOT:.0f} kt, next waypoint {m.next_index}")
+
+
+if __name__ == "__main__":
+    main()
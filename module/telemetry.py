@@ -0,0 +1,206 @@
+from numpy import ndarray, dtype as np_dtype, generic, empty, zeros, float64, int64, bool_, searchsorted
+from threading import Thread, Event, Lock
+from dataclasses import dataclass
+from time import monotonic
+from math import inf
+
+from .client import IFClient, return_type
+from .codec import value_dtypes
+from .logger import debug_logger
+
+__all__ = ["RingBuffer", "Telemetry", "TelemetryField", "buffer_dtype", "default_fields"]
+
+
+# manifest type -> ring buffer dtype
+buffer_dtype: dict[int, np_dtype] = {
+    0: bool_,
+    1: int64,
+    2: float64,
+    3: float64,
+    4: object,
+    5: int64,
+}
+
+# name -> (manifest path, rate in Hz), a rate of None is read once
+default_fields: dict[str, tuple[tuple[str, ...], float | None]] = {
+    "accel": (("acceleration", "z"), 10),
+    "ias": (("indicated_airspeed",), 5),
+    "mach": (("mach_speed",), 5),
+    "tas": (("true_airspeed",), 2),
+    "gs": (("groundspeed",), 2),
+    "vs": (("vertical_speed",), 2),
+    "msl": (("altitude_msl",), 2),
+    "agl": (("altitude_agl",), 2),
+    "next_index": (("flightplan", "next_waypoint_index"), 1),
+    "dist_to_next": (("flightplan", "next_waypoint_dist"), 1),
+    "is_on_ground": (("is_on_ground",), 1),
+    "flap_stops": (("configuration", "flaps", "stops"), None),
+}
+
+
+class RingBuffer:
+    """Fixed-size buffer of timestamped samples backed by numpy arrays."""
+    def __init__(self, size: int, dtype: np_dtype = float64) -> None:
+        self.size = size
+        self.times: ndarray = zeros(size, dtype=float64)
+        self.values: ndarray = empty(size, dtype=dtype)
+        self.count = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return min(self.count, self.size)
+
+    def append(self, timestamp: float, value: return_type) -> None:
+        with self._lock:
+            i = self.count % self.size
+            self.times[i] = timestamp
+            self.values[i] = value
+            self.count += 1
+
+    def latest(self) -> tuple[float, return_type] | None:
+        with self._lock:
+            if not self.count:
+                return None
+            i = (self.count - 1) % self.size
+            value = self.values[i]
+            return float(self.times[i]), value.item() if isinstance(value, generic) else value
+
+    def window(self, seconds: float | None = None, now: float | None = None) -> tuple[ndarray, ndarray]:
+        """Returns copies of ``(times, values)`` in chronological order.
+
+        Args:
+            seconds (float | None): only keep the samples of the last ``seconds``
+            now (float | None): end of the window, monotonic time by default
+        """
+        with self._lock:
+            n = len(self)
+            start = self.count % self.size if self.count > self.size else 0
+            times = self.times[:n].copy() if start == 0 else self._roll(self.times, start)
+            values = self.values[:n].copy() if start == 0 else self._roll(self.values, start)
+        if seconds is not None:
+            now = monotonic() if now is None else now
+            first = searchsorted(times, now - seconds, side="left")
+            times, values = times[first:], values[first:]
+        return times, values
+
+    @staticmethod
+    def _roll(array: ndarray, start: int) -> ndarray:
+        out = empty(array.shape, dtype=array.dtype)
+        tail = array.shape[0] - start
+        out[:tail] = array[start:]
+        out[tail:] = array[:start]
+        return out
+
+
+@dataclass(slots=True)
+class TelemetryField:
+    name: str
+    path: tuple[str, ...]
+    rate: float | None
+    buffer: RingBuffer
+    # manifest type
+    Type: int
+    next_due: float = 0
+
+    @property
+    def max_age(self) -> float:
+        """how long a sample is considered fresh: two polling periods"""
+        return inf if not self.rate else 2 / self.rate
+
+
+class Telemetry:
+    """Background poller that samples manifest values at per-field rates.
+
+    Every poll gathers the fields that are due and reads them with one
+    ``IFClient.read_array``, the samples go in a ring buffer per field.
+
+    Args:
+        client (IFClient): connected client
+        fields (dict | None): name -> (manifest path, rate in Hz or None to read once),
+            ``default_fields`` if not given
+        size (int): samples kept per field
+    """
+    def __init__(self, client: IFClient, fields: dict[str, tuple[tuple[str, ...], float | None]] | None = None, size: int = 1024) -> None:
+        self.client = client
+        self.fields: dict[str, TelemetryField] = {}
+        for name, (path, rate) in (default_fields if fields is None else fields).items():
+            try:
+                _, Type, _ = client.resolve(*path)
+            except ValueError:
+                debug_logger.warning(f"Telemetry field {name} not in the manifest: {path}")
+                continue
+            self.fields[name] = TelemetryField(name, path, rate, RingBuffer(size, buffer_dtype.get(Type, object)), Type)
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.fields
+
+    def __enter__(self) -> 'Telemetry':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="Telemetry", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def poll(self) -> float:
+        """Reads every due field once, returns the monotonic time of the next due field."""
+        now = monotonic()
+        due = [field for field in self.fields.values() if field.next_due <= now]
+        if due:
+            # the numbers are decoded straight into an array, the strings (if any) take a second round-trip
+            numbers = [field for field in due if field.Type in value_dtypes]
+            others = [field for field in due if field.Type not in value_dtypes]
+            if numbers:
+                values = self.client.read_array(field.path for field in numbers)
+                timestamp = monotonic()
+                for field, value in zip(numbers, values):
+                    field.buffer.append(timestamp, value)
+            if others:
+                values = self.client.send_batch(field.path for field in others)
+                timestamp = monotonic()
+                for field, value in zip(others, values):
+                    field.buffer.append(timestamp, value)
+            for field in due:
+                # keep the phase of the field, but don't try to catch up on missed samples
+                field.next_due = inf if not field.rate else max(field.next_due + 1 / field.rate, now)
+        return min((field.next_due for field in self.fields.values()), default=inf)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                next_due = self.poll()
+            except Exception:
+                debug_logger.error("Telemetry poll failed", exc_info=True)
+                next_due = monotonic() + 1
+            if next_due == inf:
+                break
+            self._stop.wait(max(0, next_due - monotonic()))
+
+    def latest(self, name: str, max_age: float | None = None) -> return_type:
+        """Last sample of ``name``, None if there is none or it is older than ``max_age``
+        (two polling periods of the field by default)."""
+        field = self.fields.get(name)
+        if field is None or (sample := field.buffer.latest()) is None:
+            return None
+        timestamp, value = sample
+        if monotonic() - timestamp > (field.max_age if max_age is None else max_age):
+            return None
+        return value
+
+    def window(self, name: str, seconds: float | None = None) -> tuple[ndarray, ndarray]:
+        """``(times, values)`` of ``name`` over the last ``seconds``, the whole buffer by default."""
+        return self.fields[name].buffer.window(seconds)
@@ -3,6 +3,9 @@ from time import perf_counter_ns
 from functools import wraps
 from .client import IFClient, Node
 
+__all__ = ["IFProperty", "format_time", "id_2_icao", "time_method"]
+
+
 def time_method(method):
     @wraps(method)
     def wrapper(self, *args, **kwargs):
@@ -0,0 +1,18 @@
+import pytest
+
+from module import IFClient
+from module.simulator import Simulator
+from .helpers import loopback_client
+
+
+@pytest.fixture
+def simulator() -> Simulator:
+    """Simulator on the ground at the start of the default route, frozen (see ``Simulator.advance``)."""
+    return Simulator(time_scale=None, pilot_delay=None)
+
+
+@pytest.fixture
+def client(simulator: Simulator) -> IFClient:
+    client = loopback_client(simulator)
+    yield client
+    client.close()
@@ -0,0 +1,67 @@
+"""Routes, speed inputs and clients on an in-process simulator, shared by the tests and the benchmarks."""
+from tempfile import mkdtemp
+from pathlib import Path
+
+from module import IFClient, unit
+from module.aircraft import Spd
+from module.cache import ManifestCache
+from module.client import open_clients
+from module.convertion import mach2tas_SI
+from module.simulator import Simulator, route_type, FT
+
+
+def long_route(n: int = 1000) -> route_type:
+    """``n`` fixes from LIRF to KJFK: 5% climb, cruise at FL350, 5% descent."""
+    origin, destination = ("LIRF", 41.8003, 12.2389), ("KJFK", 40.6398, -73.7789)
+    route = [(*origin, 0)]
+    edge = max(1, n // 20)
+    for i in range(1, n - 1):
+        if i < edge:
+            alt = 35_000 * i // edge
+        elif i > n - 1 - edge:
+            alt = 35_000 * (n - 1 - i) // edge
+        else:
+            alt = 35_000
+        route.append((
+            f"WP{i:04d}",
+            origin[1] + (destination[1] - origin[1]) * i / (n - 1),
+            origin[2] + (destination[2] - origin[2]) * i / (n - 1),
+            alt,
+        ))
+    route.append((*destination, 0))
+    return route
+
+
+inputs = {
+    Spd.Vr: 150*unit.knot,
+    Spd.clb_V1: 250*unit.knot,
+    Spd.clb_V2: 310*unit.knot,
+    Spd.clb_V3: 0.84*unit.mach,
+    Spd.crz_V: 0.84*unit.mach,
+}
+
+
+def loopback_client(simulator: Simulator, manifest_cache: ManifestCache | None = None, **kwargs) -> IFClient:
+    """Client on ``simulator`` without sockets, with an empty manifest cache by default and no stats dump at exit."""
+    if manifest_cache is None:
+        manifest_cache = ManifestCache(Path(mkdtemp()) / "manifest.pickle")
+    client = IFClient("loopback", 0, manifest_cache=manifest_cache, transport=simulator.connect, **kwargs)
+    open_clients.discard(client)
+    return client
+
+
+def airborne(route: route_type, alt: float = 35_000, mach: float = 0.82, next_index: int = 60) -> Simulator:
+    """Simulator frozen in cruise (time only moves with ``advance``), altitude in ft."""
+    simulator = Simulator(route=route, time_scale=None, pilot_delay=None)
+    m = simulator.model
+    m.on_ground = False
+    m.gear_down = False
+    m.flaps = 0
+    m.alt = alt * FT
+    m.tas = mach2tas_SI(mach, m.alt)
+    m.spd_mode = int(m.alt >= m.mach_altitude)
+    m.next_index = next_index
+    m.alt_target = alt * FT
+    m.vs = 0
+    m.throttle = 0
+    return simulator
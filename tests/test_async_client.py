@@ -0,0 +1,50 @@
+"""Reconnection of the asyncio client to a simulator server dropping its connections."""
+import asyncio as aio
+from socket import SHUT_RDWR
+from threading import Thread
+
+from module.client import AsyncIFClient
+from module.simulator import Simulator, SimulatorServer, _Handler
+
+
+class DroppingHandler(_Handler):
+    def handle(self) -> None:
+        self.server.connections.append(self.request)
+        super().handle()
+
+
+class DroppingServer(SimulatorServer):
+    """Server that can close every connection from its side."""
+    def __init__(self, simulator: Simulator) -> None:
+        super().__init__(("127.0.0.1", 0), simulator)
+        self.RequestHandlerClass = DroppingHandler
+        self.connections = []
+
+    def drop(self) -> None:
+        for connection in self.connections:
+            connection.shutdown(SHUT_RDWR)
+        self.connections.clear()
+
+
+def test_reconnect_replays_commanded():
+    simulator = Simulator(time_scale=None, pilot_delay=None)
+    server = DroppingServer(simulator)
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    async def main() -> None:
+        async with await AsyncIFClient.connect(*server.server_address) as client:
+            assert await client.write_if_changed("simulator", "throttle", data=-600)
+            assert await client.send_command("aircraft", "0", "name") == simulator.aircraft
+
+            server.drop()
+            simulator.model.throttle = 0
+            # the read fails on the dropped connection and is retried on a new one
+            assert await client.send_command("aircraft", "0", "name") == simulator.aircraft
+            assert client.generation == 2
+            assert simulator.model.throttle == -600
+
+    try:
+        aio.run(main())
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,78 @@
+"""ISA and airspeed conversions against the reference tables."""
+import numpy as np
+from numpy.testing import assert_allclose
+
+from module import atmosphere
+from module.atmosphere import AtmosphereTable, isa
+
+KNOT = 1852 / 3600
+FT = 0.3048
+
+
+def test_isa_reference_values():
+    # ICAO standard atmosphere: altitude (m), temperature (K), pressure (Pa), density (kg/m³)
+    reference = np.asarray([
+        [-610, 292.115, 108_870.8, 1.29836],
+        [0, 288.15, 101_325.0, 1.22500],
+        [11_000, 216.65, 22_632.1, 0.36392],
+        [20_000, 216.65, 5_474.9, 0.08803],
+        [32_000, 228.65, 868.02, 0.013225],
+    ])
+    T, p, rho = isa(reference[:, 0])
+    assert_allclose(T, reference[:, 1], rtol=1e-6)
+    assert_allclose(p, reference[:, 2], rtol=1e-5)
+    assert_allclose(rho, reference[:, 3], rtol=1e-4)
+    assert_allclose(atmosphere.speed_of_sound(0), 340.294, rtol=1e-6)
+
+
+def test_isa_clipped_and_continuous():
+    # below -610 m and above the top the values are the ones at the bounds
+    assert_allclose(isa(-2000), isa(-610))
+    assert_allclose(isa(100_000), isa(atmosphere.TOP))
+    # continuous at the layer bases and across sea level
+    for base in [*atmosphere.LAYERS, 0]:
+        assert_allclose(isa(base - 1e-6), isa(base + 1e-6), rtol=1e-9)
+    T, p, _ = isa(np.asarray([-100.0, -1.0]))
+    assert (T > atmosphere.T0).all() and (p > atmosphere.P0).all()
+
+
+def test_scalars_and_broadcasting():
+    assert np.ndim(atmosphere.temperature(5000)) == 0
+    tas = atmosphere.cas2tas(np.asarray([250, 310]) * KNOT, np.asarray([[0], [10_000 * FT]]))
+    assert tas.shape == (2, 2)
+
+
+def test_speed_conversions():
+    # same speed at sea level
+    assert_allclose(atmosphere.cas2tas(250 * KNOT, 0), 250 * KNOT)
+    assert_allclose(atmosphere.eas2tas(250 * KNOT, 0), 250 * KNOT)
+    # 250 kt CAS at 10000 ft is about 289 kt TAS
+    assert abs(atmosphere.cas2tas(250 * KNOT, 10_000 * FT) / KNOT - 288.7) < 0.5
+
+    alt = np.linspace(-610, 15_000, 50)
+    cas = np.linspace(80, 180, 50)
+    mach = atmosphere.cas2mach(cas, alt)
+    assert_allclose(atmosphere.mach2cas(mach, alt), cas, rtol=1e-9)
+    tas = atmosphere.cas2tas(cas, alt)
+    assert_allclose(atmosphere.tas2cas(tas, alt), cas, rtol=1e-9)
+    assert_allclose(atmosphere.tas2mach(tas, alt), mach, rtol=1e-9)
+    assert_allclose(atmosphere.tas2eas(atmosphere.eas2tas(cas, alt), alt), cas, rtol=1e-9)
+
+
+def test_crossover_altitude():
+    # 310 kt / M0.84 cross about FL315, 250 kt / M0.80 in the tropopause
+    alt = atmosphere.crossover_altitude(np.asarray([310, 250]) * KNOT, np.asarray([0.84, 0.80]))
+    assert abs(alt[0] / FT - 31_560) < 100
+    assert alt[1] > 11_000
+    assert_allclose(atmosphere.cas2mach(np.asarray([310, 250]) * KNOT, alt), [0.84, 0.80], rtol=1e-9)
+
+
+def test_table_close_to_the_formulas():
+    table = AtmosphereTable(step=50)
+    assert 0 in table.altitudes and table.altitudes[0] >= atmosphere.BOTTOM
+    alt = np.linspace(-600, 19_000, 777)
+    cas = np.full_like(alt, 150.0)
+    assert_allclose(table.temperature(alt), atmosphere.temperature(alt), rtol=1e-6)
+    assert_allclose(table.pressure(alt), atmosphere.pressure(alt), rtol=1e-4)
+    assert_allclose(table.cas2tas(cas, alt), atmosphere.cas2tas(cas, alt), rtol=1e-4)
+    assert_allclose(table.mach2cas(table.cas2mach(cas, alt), alt), cas, rtol=1e-9)
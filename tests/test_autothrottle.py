@@ -0,0 +1,41 @@
+"""Speed targets of the autothrottle against the in-process simulator."""
+from module import Aircraft, Autopilot, Autothrottle, IFFPL
+from module.aircraft import Spd
+from module.atmosphere import cas2mach, mach2cas
+from module.FlightPlan import FlightPhase
+from module.simulator import FT, KNOT
+from .helpers import airborne, inputs, loopback_client, long_route
+
+
+def cruise_autothrottle(alt: float, ias: float) -> tuple[Autothrottle, Autopilot]:
+    """Autothrottle in cruise at ``alt`` ft and ``ias`` knots, throttle at half and no acceleration."""
+    simulator = airborne(long_route(), alt=alt)
+    m = simulator.model
+    m.tas *= ias * KNOT / m.ias
+    m.accel = 0
+    client = loopback_client(simulator)
+    aircraft, autopilot = Aircraft(client), Autopilot(client)
+    autothrottle = Autothrottle(aircraft, autopilot, IFFPL.from_str(client.send_command("full_info")), inputs=inputs)
+    autothrottle.flight_phase = FlightPhase.CRUISE
+    return autothrottle, autopilot
+
+
+def test_mach_target_in_ias_mode():
+    autothrottle, autopilot = cruise_autothrottle(3_000, 224)
+    assert inputs[Spd.crz_V].m == 0.84
+    assert autopilot.SpdMode == 0
+
+    autothrottle()
+
+    # M0.84 is faster than 224 knots at 3000 ft: more thrust, and the IAS target is the same speed
+    assert autothrottle.throttle_SI > 0.5
+    assert abs(autopilot.Spd_SI - float(mach2cas(0.84, 3_000 * FT))) < 0.01
+
+
+def test_ias_target_in_mach_mode():
+    autothrottle, autopilot = cruise_autothrottle(35_000, 250)
+    assert autopilot.SpdMode == 1
+
+    autothrottle.set_target_SI(250 * KNOT, False)
+
+    assert abs(autopilot.Spd_SI - float(cas2mach(250 * KNOT, 35_000 * FT))) < 1e-3
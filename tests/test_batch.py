@@ -0,0 +1,46 @@
+"""Batched reads decoded into numpy arrays."""
+import numpy as np
+import pytest
+
+from module import IFClient
+from module.codec import batch_decoder, header, value_structs
+
+requests = [
+    "altitude_msl",             # float
+    ("spd", "mode"),            # int
+    "is_on_ground",             # bool
+    ("flaps", "state"),         # int
+    "oat",                      # float
+    ("autopilot", "on"),        # bool
+]
+
+
+def test_read_array_equals_send_batch(client: IFClient):
+    # both read from the device
+    client.read_cache.policy = {}
+    values = client.read_array(requests)
+    assert values.dtype == np.float64
+    np.testing.assert_allclose(values, np.asarray(client.send_batch(requests), dtype=float), rtol=1e-6)
+    assert client.read_array([]).shape == (0,)
+
+
+def test_strings_refused(client: IFClient):
+    with pytest.raises(ValueError, match="no fixed size"):
+        client.read_array(["altitude_msl", ("aircraft", "0", "name")])
+
+
+def test_decoder_restores_the_request_order():
+    types = (2, 1, 3, 0, 1, 5, 2)
+    values = [1.5, -7, 1 / 3, True, 42, 2 ** 40, -0.25]
+    decoder = batch_decoder(types)
+    assert batch_decoder(types) is decoder
+    # responses in the order the requests were sent
+    buffer = b"".join(header.pack(i, value_structs[types[i]].size) + value_structs[types[i]].pack(values[i])
+                      for i in decoder.order)
+    assert len(buffer) == decoder.size
+    np.testing.assert_array_equal(decoder(buffer), np.asarray(values, dtype=np.float64))
+
+    corrupted = bytearray(buffer)
+    header.pack_into(corrupted, 0, decoder.order[0], 3)
+    with pytest.raises(ValueError, match="payload length"):
+        decoder(corrupted)
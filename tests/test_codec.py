@@ -0,0 +1,64 @@
+"""Requests and responses of the Connect protocol through the precompiled structs."""
+from struct import pack
+
+import pytest
+
+from module.codec import SendBuffer, decode, encode, header, request, value_structs
+
+values = {0: True, 1: -123_456, 2: 0.5, 3: 1 / 3, 5: 2 ** 40}
+
+
+def response(command: int, Type: int, value) -> bytes:
+    """Response of the device, as ``ConnectProtocol`` builds it."""
+    if Type == 4:
+        data = value.encode("utf-8")
+        payload = pack("<i", len(data)) + data
+    else:
+        payload = value_structs[Type].pack(value)
+    return header.pack(command, len(payload)) + payload
+
+
+@pytest.mark.parametrize("Type", sorted(values))
+def test_value_round_trip(Type: int):
+    value = values[Type]
+    buffer = encode(42, Type, write=True, data=value)
+    assert request.unpack_from(buffer) == (42, True)
+    # the request carries the value as the response does
+    assert decode(Type, buffer, len(buffer) - request.size, request.size) == value
+
+    buffer = response(42, Type, value)
+    command, lenght = header.unpack_from(buffer)
+    assert (command, lenght) == (42, value_structs[Type].size)
+    assert decode(Type, buffer, lenght, header.size) == value
+
+
+@pytest.mark.parametrize("value", ["", "Boeing 777-300ER", "Zürich ✈"])
+def test_string_round_trip(value: str):
+    data = value.encode("utf-8")
+    buffer = encode(7, 4, write=True, data=value)
+    assert buffer == pack(f"<i?i{len(data)}s", 7, True, len(data), data)
+
+    buffer = b"padding" + response(7, 4, value)
+    command, lenght = header.unpack_from(buffer, 7)
+    assert command == 7
+    assert decode(4, buffer, lenght, 7 + header.size) == value
+
+
+def test_reads_and_commands_have_no_value():
+    assert encode(3, 2) == pack("<i?", 3, False)
+    assert encode(3, 2, data=1.0) == pack("<i?", 3, False)
+    # commands (type -1) are sent with the write flag off
+    assert encode(9, -1, write=True) == pack("<i?", 9, False)
+
+
+def test_send_buffer_grows_and_is_reused():
+    send = SendBuffer(size=8)
+    send.add_reads([1, 2])
+    send.add_reads(range(3, 10))
+    assert len(send.buffer) >= 9 * request.size
+    assert bytes(send.view()) == b"".join(pack("<i?", command, False) for command in range(1, 10))
+    size = len(send.buffer)
+    send.clear()
+    send.add_reads([5])
+    assert bytes(send.view()) == pack("<i?", 5, False)
+    assert len(send.buffer) == size
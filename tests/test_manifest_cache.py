@@ -0,0 +1,81 @@
+"""On-disk manifest cache: reused while the device fingerprint matches, downloaded again otherwise."""
+from pathlib import Path
+import pickle
+
+from module.cache import ManifestCache
+from module.simulator import Simulator
+from .helpers import loopback_client
+
+
+def open_client(simulator: Simulator, path: Path):
+    """Client with a fresh ``ManifestCache`` on ``path``, as a new process would open it."""
+    client = loopback_client(simulator, ManifestCache(path))
+    client.close()
+    return client
+
+
+def test_manifest_reused_while_the_fingerprint_matches(tmp_path: Path):
+    path = tmp_path / "manifest.pickle"
+    simulator = Simulator(time_scale=None, pilot_delay=None)
+    first = open_client(simulator, path)
+    assert path.exists()
+    assert first.aircraft_fingerprint == ("Boeing 777-300ER", "Simulator", "simulator")
+
+    second = open_client(simulator, path)
+    # the pickled tree, not one built from a new download
+    assert second.manifest is not first.manifest
+    assert second.manifest.index is not None
+    assert str(second.manifest) == str(first.manifest)
+    assert ManifestCache(path).last["fingerprint"] == first.aircraft_fingerprint
+
+    cache = ManifestCache(path)
+    client = loopback_client(simulator, cache)
+    assert client.manifest is cache.last["manifest"]
+    client.close()
+
+
+def test_app_update_invalidates(tmp_path: Path):
+    path = tmp_path / "manifest.pickle"
+    simulator = Simulator(time_scale=None, pilot_delay=None)
+    open_client(simulator, path)
+
+    simulator.app_version = "update"
+    cache = ManifestCache(path)
+    cached = cache.last["manifest"]
+    client = loopback_client(simulator, cache)
+    client.close()
+    # downloaded again and stored over the old entry
+    assert client.aircraft_fingerprint[-1] == "update"
+    assert client.manifest is not cached
+    assert client.manifest is cache.last["manifest"]
+    assert ManifestCache(path).last["fingerprint"][-1] == "update"
+
+
+def test_one_entry_per_aircraft(tmp_path: Path):
+    path = tmp_path / "manifest.pickle"
+    boeing = Simulator(time_scale=None, pilot_delay=None)
+    airbus = Simulator(aircraft="Airbus A320", time_scale=None, pilot_delay=None)
+    open_client(boeing, path)
+    open_client(airbus, path)
+    cache = ManifestCache(path)
+    assert cache.last["name"] == "Airbus A320"
+    assert cache.get("Boeing 777-300ER") is not None
+
+    # the last aircraft doesn't match, the entry of the loaded one is used
+    client = loopback_client(boeing, cache)
+    client.close()
+    assert client.manifest is cache.get("Boeing 777-300ER")["manifest"]
+    assert ManifestCache(path).last["name"] == "Boeing 777-300ER"
+
+
+def test_unusable_files_ignored(tmp_path: Path):
+    path = tmp_path / "manifest.pickle"
+    path.write_bytes(b"not a pickle")
+    assert ManifestCache(path).last is None
+
+    with open(path, "wb") as f:
+        pickle.dump({"version": ManifestCache.version - 1, "last": "x", "aircraft": {"x": {}}}, f)
+    assert ManifestCache(path).last is None
+
+    client = open_client(Simulator(time_scale=None, pilot_delay=None), path)
+    assert ManifestCache(path).last["fingerprint"] == client.aircraft_fingerprint
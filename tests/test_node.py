@@ -0,0 +1,73 @@
+"""Manifest paths resolved through the index of ``build_tree`` and through the DFS."""
+from module.client import Node, build_tree
+from module.simulator import Simulator
+
+manifest = """
+0,4,aircraft/0/name
+1,1,aircraft/0/systems/autopilot/spd/mode
+2,2,aircraft/0/systems/autopilot/alt/target
+3,2,aircraft/0/systems/autopilot/spd/target
+4,2,aircraft/0/systems/engines/0/throttle
+5,2,aircraft/0/systems/engines/1/throttle
+6,2,simulator/throttle
+"""
+
+
+def test_full_paths_and_unique_suffixes():
+    root = build_tree(manifest)
+    assert root.search("aircraft", "0", "name").value == (0, 4)
+    assert root.search("spd", "mode").value == (1, 1)
+    assert root.search("autopilot", "alt", "target").value == (2, 2)
+    # full paths win over suffixes
+    assert root.search("simulator", "throttle").value == (6, 2)
+    # suffixes below the node searched from
+    autopilot = root.search("systems", "autopilot")
+    assert autopilot.search("alt", "target").value == (2, 2)
+    assert autopilot.search("name") is None
+    assert autopilot.search("spd", "target").value == (3, 2)
+    assert root.search("missing") is None
+
+
+def test_ambiguous_suffixes_left_to_the_dfs():
+    root = build_tree(manifest)
+    assert ("throttle",) in root.ambiguous
+    assert root.index[("0", "throttle")].value == (4, 2)
+    assert ("target",) in root.ambiguous
+    assert ("throttle",) not in root.index
+    # first match of the DFS, as before the index
+    assert root.search("throttle") is root._dfs("throttle")
+    assert root.search("target") is root._dfs("target")
+    # gapped paths aren't suffixes
+    assert root.search("aircraft", "autopilot", "spd", "mode") is root._dfs("aircraft", "autopilot", "spd", "mode")
+
+
+def test_index_agrees_with_the_dfs():
+    root = build_tree(Simulator().manifest)
+    nodes, stack = [], list(root.children.values())
+    while stack:
+        nodes.append(node := stack.pop())
+        stack.extend(node.children.values())
+    for node in nodes:
+        assert root.search(*node.path) is node
+        for i in range(1, len(node.path)):
+            suffix = node.path[i:]
+            found = root._dfs(*suffix)
+            # the DFS gives up on the first subtree that starts the path, the index doesn't
+            if found is not None or suffix in root.ambiguous:
+                assert root.search(*suffix) is found
+
+
+def test_insert_drops_the_index():
+    root = build_tree(manifest)
+    root.insert("aircraft/0/systems/flaps/state".split("/"), ["7", "1"])
+    assert root.index is None
+    assert root.search("flaps", "state").value == (7, 1)
+    root.build_index()
+    assert root.index[("flaps", "state")] is root.search("aircraft", "0", "systems", "flaps", "state")
+
+
+def test_node_path():
+    root = Node("root")
+    root.insert("a b c")
+    assert root.search("a", "b", "c").path == ("a", "b", "c")
+    assert root.search("a", "b", "c").root is root
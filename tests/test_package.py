@@ -0,0 +1,31 @@
+"""Names of the package, looked up from the ``__all__`` of the submodules."""
+import subprocess
+import sys
+from importlib import import_module
+
+import module
+
+
+def test_every_name_resolves():
+    owners = {}
+    for submodule in (*module._eager_submodules, *module._lazy_submodules):
+        for name in import_module(f"module.{submodule}").__all__:
+            assert name not in owners, f"{name} is listed by {owners[name]} and {submodule}"
+            owners[name] = submodule
+    assert sorted(module.__all__) == sorted(owners)
+    for name, submodule in owners.items():
+        assert getattr(module, name) is getattr(import_module(f"module.{submodule}"), name), name
+
+
+def test_database_is_the_mapping():
+    from module import database
+    assert database["B772"].icao == "B772"
+    assert database is import_module("module.database").database
+
+
+def test_light_import():
+    code = ("import sys, module; from module import IFClient, Scheduler; "
+            "print(*sorted(name for name in ('numpy', 'pint', 'requests', 'module.aircraft') if name in sys.modules))")
+    loaded = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+    # the client needs numpy, nothing needs pint or the control stack yet
+    assert loaded == ["numpy"]
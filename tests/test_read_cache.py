@@ -0,0 +1,86 @@
+"""Time to live of the cached reads, by manifest path."""
+from math import inf
+
+from module import IFClient
+from module.cache import ReadCache
+from module.client import build_tree
+
+manifest = build_tree("""
+0,4,aircraft/0/name
+1,1,aircraft/0/systems/autopilot/spd/mode
+2,2,aircraft/0/oat
+3,2,aircraft/0/altitude_msl
+""")
+name, spd_mode, oat, altitude = (manifest.search(*path) for path in (("name",), ("spd", "mode"), ("oat",), ("altitude_msl",)))
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_by_path():
+    cache = ReadCache(default_ttl=0.5)
+    assert cache.ttl(0, name) == inf
+    assert cache.ttl(1, spd_mode) == 1.0
+    assert cache.ttl(3, altitude) == 0.5
+    # raw commands aren't cached nor memoized, they can be resolved later
+    assert cache.ttl(2, None) == 0
+    assert cache.ttl(2, oat) == 10.0
+
+
+def test_expiry_and_stats():
+    clock = Clock()
+    cache = ReadCache(clock=clock)
+    assert cache.get(1) is None
+    cache.set(0, "Boeing 777-300ER", cache.ttl(0, name))
+    cache.set(1, 0, cache.ttl(1, spd_mode))
+    clock.now = 0.9
+    assert cache.get(1) == 0
+    clock.now = 1.0
+    assert cache.get(1) is None
+    clock.now = 1e9
+    assert cache.get(0) == "Boeing 777-300ER"
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert cache.hit_rate == 0.5
+
+
+def test_invalidate():
+    cache = ReadCache(clock=Clock())
+    for command, node, value in ((0, name, "A320"), (1, spd_mode, 1), (2, oat, -50.0)):
+        cache.set(command, value, cache.ttl(command, node))
+    cache.invalidate(2)
+    assert cache.get(2) is None and len(cache) == 2
+    # static values stay
+    cache.invalidate_volatile()
+    assert cache.get(0) == "A320" and cache.get(1) is None
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_client_reads_through_the_cache(client: IFClient):
+    client.read_cache.clock = clock = Clock()
+    command, Type, _ = client.resolve("oat")
+    assert client.send_command("oat") == client.send_command("oat")
+    assert (client.read_cache.hits, client.read_cache.misses) == (1, 1)
+    # same command without manifest node: read from the device
+    assert client.send_command(command, Type) == client.send_command("oat")
+    assert client.read_cache.hits == 2
+
+    # writes and commands drop what they may change
+    client.send_command("flaps", "state")
+    client.send_command("flaps", "state", write=True, data=2)
+    assert client.send_command("flaps", "state") == 2
+    gear = client.send_command("landing_gear", "lever_state")
+    client.send_command("commands", "LandingGear", write=True)
+    assert client.send_command("landing_gear", "lever_state") == 1 - gear
+
+    clock.now = 11
+    misses = client.read_cache.misses
+    client.send_batch(["oat", "altitude_msl"])
+    client.send_command("oat")
+    # oat expired, the altitude isn't cached
+    assert client.read_cache.misses == misses + 1
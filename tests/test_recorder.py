@@ -0,0 +1,86 @@
+"""Samples written by ``FlightRecorder`` and read back memory-mapped."""
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from module import IFClient
+from module.convertion import FT
+from module.recorder import Channel, FlightRecorder, FlightRecording, default_channels
+from module.simulator import Simulator
+from .helpers import airborne, long_route, loopback_client
+
+
+@pytest.fixture
+def simulator() -> Simulator:
+    return airborne(long_route(100), next_index=10)
+
+
+def record(path: Path, client: IFClient, simulator: Simulator, samples: int, **kwargs) -> list[dict]:
+    """Samples every 10 simulated s, returns the values the device had at every sample."""
+    expected = []
+    recorder = FlightRecorder(path, client, **kwargs)
+    for i in range(samples):
+        simulator.advance(10)
+        expected.append({
+            "msl": client.send_command("altitude_msl") * FT,
+            "tas": client.send_command("true_airspeed"),
+            "next_index": client.send_command("flightplan", "next_waypoint_index"),
+            "is_on_ground": client.send_command("is_on_ground"),
+            "throttle": (1000 - client.send_command("simulator", "throttle")) / 2000,
+        })
+        recorder.sample()
+    recorder.close()
+    assert len(recorder) == samples
+    return expected
+
+
+def test_round_trip(tmp_path: Path, client: IFClient, simulator: Simulator):
+    path = tmp_path / "flight.iffr"
+    client.send_command("simulator", "throttle", write=True, data=-600)
+    expected = record(path, client, simulator, 25, chunk_size=10)
+
+    with FlightRecording(path) as recording:
+        assert len(recording) == 25
+        assert recording.counts.tolist() == [10, 10, 5]
+        assert recording.rate == 10.0
+        assert list(recording.channels) == [channel.name for channel in default_channels()]
+        assert recording.channels["next_index"] == np.dtype("<i2")
+        times, columns = recording.read()
+        assert (np.diff(times) >= 0).all() and recording.duration == pytest.approx(times[-1] - times[0])
+        for name in expected[0]:
+            values = np.asarray([sample[name] for sample in expected], dtype=columns[name].dtype)
+            np.testing.assert_allclose(columns[name], values, rtol=1e-6)
+        assert columns["throttle"][0] == pytest.approx(0.8)
+        # the aircraft accelerates with the throttle set
+        assert columns["tas"][-1] > columns["tas"][0]
+
+
+def test_local_channels_and_missing_paths(tmp_path: Path, client: IFClient, simulator: Simulator):
+    path = tmp_path / "flight.iffr"
+    counter = iter(range(100))
+    channels = [
+        Channel("step", "<i4", get=lambda: next(counter)),
+        Channel("alt", "<f8", ("altitude_msl",), FT),
+        Channel("missing", "<f4", ("not", "in", "the", "manifest")),
+    ]
+    record(path, client, simulator, 3, channels=channels, rate=5)
+
+    with FlightRecording(path) as recording:
+        # device channels first, the unknown path left out
+        assert list(recording.channels) == ["alt", "step"]
+        assert recording.rate == 5
+        _, columns = recording.read("step")
+        assert columns["step"].tolist() == [0, 1, 2]
+
+
+def test_crash_loses_the_last_chunk_only(tmp_path: Path, client: IFClient, simulator: Simulator):
+    path = tmp_path / "flight.iffr"
+    record(path, client, simulator, 12, chunk_size=5)
+    path.write_bytes(path.read_bytes()[:-7])
+    with FlightRecording(path) as recording:
+        assert recording.counts.tolist() == [5, 5]
+
+    path.write_bytes(b"IFSR" + bytes(40))
+    with pytest.raises(ValueError, match="not a flight recording"):
+        FlightRecording(path)
@@ -0,0 +1,97 @@
+"""Time range queries, downsampling and phase summary of a recording."""
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from module import recorder
+from module.convertion import FPM, KNOT
+from module.FlightPlan import FlightPhase
+from module.recorder import Channel, FlightRecorder, FlightRecording, downsample, phase_summary
+
+phases = [FlightPhase.CLIMB] * 10 + [FlightPhase.CRUISE] * 10 + [FlightPhase.DESCENT] * 10
+vs = {FlightPhase.CLIMB: 2000, FlightPhase.CRUISE: 0, FlightPhase.DESCENT: -1500}
+
+
+@pytest.fixture
+def recording(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> FlightRecording:
+    """30 samples 1 s apart in chunks of 8: climb, cruise and descent of 10 s each."""
+    now = [0]
+    monkeypatch.setattr(recorder, "monotonic_ns", lambda: now[0])
+    state = {}
+    channels = [
+        Channel("phase", "u1", get=lambda: state["phase"].value),
+        Channel("msl", "<f4", get=lambda: state["msl"]),
+        Channel("vs", "<f4", get=lambda: vs[state["phase"]] * FPM),
+        Channel("ias", "<f4", get=lambda: state["ias"]),
+        Channel("tas", "<f4", get=lambda: state["ias"]),
+        Channel("mach", "<f4", get=lambda: 0.5),
+        Channel("spd_target", "<f4", get=lambda: 150.0),
+        Channel("spd_mode", "u1", get=lambda: 0),
+        Channel("throttle", "<f4", get=lambda: state["throttle"]),
+    ]
+    rec = FlightRecorder(tmp_path / "flight.iffr", None, channels, rate=1, chunk_size=8)
+    msl = 0.0
+    for i, phase in enumerate(phases):
+        now[0] = i * 1_000_000_000
+        msl += vs[phase] * FPM
+        # 2 kt too fast, 1 kt too slow in the cruise
+        state.update(phase=phase, msl=msl, ias=150 + (2 if i % 2 else -1) * KNOT * (phase == FlightPhase.CRUISE),
+                     throttle=0.9 if phase == FlightPhase.CLIMB else 0.5 + 0.1 * (i % 2))
+        rec.sample()
+    rec.close()
+    with FlightRecording(tmp_path / "flight.iffr") as recording:
+        yield recording
+
+
+def test_time_ranges(recording: FlightRecording):
+    assert recording.counts.tolist() == [8, 8, 8, 6]
+    assert recording.duration == 29
+
+    times, columns = recording.read("msl")
+    assert times.tolist() == list(range(30))
+    assert list(columns) == ["msl"]
+
+    # inside one chunk: views of the file
+    times, columns = recording.read("msl", "vs", start=1.5, end=5)
+    assert times.tolist() == [2, 3, 4, 5]
+    assert not columns["msl"].flags.owndata and not columns["msl"].flags.writeable
+    # across chunks
+    times, columns = recording.read("phase", start=7, end=17)
+    assert times.tolist() == list(range(7, 18))
+    assert columns["phase"].tolist() == [phase.value for phase in phases[7:18]]
+
+    times, columns = recording.read("msl", start=40)
+    assert len(times) == 0 and columns["msl"].dtype == np.float32
+    with pytest.raises(KeyError, match="Not recorded: oat"):
+        recording.read("msl", "oat")
+
+
+def test_downsample_keeps_the_spikes():
+    times = np.arange(1000.0)
+    values = np.sin(times / 50)
+    values[333], values[777] = 10, -10
+    t, v = downsample(times, values, 100)
+    assert len(v) <= 100
+    assert (np.diff(t) > 0).all()
+    assert 10 in v and -10 in v
+    # short enough already
+    short = values[:50]
+    assert downsample(times[:50], short, 100)[1] is short
+
+
+def test_phase_summary(recording: FlightRecording):
+    rows = phase_summary(recording)
+    assert [row["phase"] for row in rows] == ["CLIMB", "CRUISE", "DESCENT"]
+    assert [row["duration (s)"] for row in rows] == [9, 9, 9]
+    assert [row["mean vs (fpm)"] for row in rows] == pytest.approx([2000, 0, -1500], abs=1e-3)
+    assert rows[0]["mean |speed error| (kt)"] == pytest.approx(0, abs=1e-3)
+    assert rows[1]["max |speed error| (kt)"] == pytest.approx(2, abs=1e-3)
+    assert rows[1]["mean |speed error| (kt)"] == pytest.approx(1.5, abs=1e-3)
+    assert rows[0]["throttle moves"] == 0
+    assert rows[2]["throttle moves"] == 9
+    assert rows[2]["throttle travel (%)"] == pytest.approx(90, abs=1e-3)
+
+    rows = phase_summary(recording, start=12, end=15)
+    assert [(row["phase"], row["start (s)"], row["duration (s)"]) for row in rows] == [("CRUISE", 12, 3)]
+    assert phase_summary(recording, start=100) == []
@@ -0,0 +1,27 @@
+"""Deadlines of the fixed-rate scheduler."""
+from time import monotonic
+
+from module.scheduler import Scheduler
+
+
+def test_run_twice():
+    scheduler = Scheduler()
+    fast, once = [], []
+
+    def run_once() -> bool:
+        once.append(monotonic())
+        return False
+
+    scheduler.add("fast", lambda: fast.append(monotonic()), rate=50, offset=0.01)
+    scheduler.add("once", run_once, rate=50)
+
+    for _ in range(2):
+        fast.clear()
+        once.clear()
+        start = monotonic()
+        scheduler.run(duration=0.1)
+
+        # due from the start of every run, the task done in the first run runs again
+        assert len(once) == 1
+        assert 3 <= len(fast) <= 5
+        assert fast[0] - start < 0.05
@@ -0,0 +1,81 @@
+"""Sessions recorded on the loopback simulator and replayed without it."""
+from pathlib import Path
+from time import sleep
+
+import pytest
+
+from module import IFClient
+from module.cache import ManifestCache
+from module.client import open_clients
+from module.session import CLOCK, CONNECT, SENT, ReplayError, SessionReplay, read_session
+from module.simulator import Simulator
+from .helpers import loopback_client
+
+spd_mode = ("aircraft", "0", "systems", "autopilot", "spd", "mode")
+
+
+def fly(client, pause: float) -> list:
+    """Reads and writes of a short control loop, ``pause`` s between the reads of a cached value."""
+    # expires within the test
+    client.read_cache.policy = {spd_mode: 0.1}
+    values = [client.send_command("spd", "mode"), client.send_command("spd", "mode")]
+    sleep(pause)
+    values.append(client.send_command("spd", "mode"))
+    values.append(client.write_if_changed("simulator", "throttle", data=-500))
+    values.append(client.write_if_changed("simulator", "throttle", data=-500))
+    values.append(client.send_command("altitude_msl"))
+    values.append(client.send_batch(["altitude_msl", ("spd", "mode"), "oat"]))
+    return values
+
+
+def record(tmp_path: Path, pause: float = 0.15):
+    path = tmp_path / "session.ifsr"
+    client = loopback_client(Simulator(time_scale=None, pilot_delay=None), ManifestCache(tmp_path / "recorded.pickle"),
+                             record=path)
+    values = fly(client, pause)
+    client.close()
+    client.recorder.close()
+    return path, client, values
+
+
+def replay_client(replay: SessionReplay, tmp_path: Path) -> IFClient:
+    client = IFClient("loopback", 0, manifest_cache=ManifestCache(tmp_path / "replayed.pickle"),
+                      transport=replay.connect, clock=replay.clock)
+    open_clients.discard(client)
+    return client
+
+
+def test_replay_matches_the_recording(tmp_path: Path):
+    path, recorded, values = record(tmp_path)
+    _, frames = read_session(path)
+    assert frames[0].kind == CONNECT
+    # the clock moved at least while sleeping
+    assert sum(frame.kind == CLOCK for frame in frames) >= 1
+
+    replay = SessionReplay(path)
+    client = replay_client(replay, tmp_path)
+    # replayed faster than recorded, the cache expires at the same reading
+    assert fly(client, 0) == values
+    assert (client.read_cache.hits, client.read_cache.misses) == (recorded.read_cache.hits, recorded.read_cache.misses)
+    # the second read and the batch, the read after the pause expired
+    assert client.read_cache.hits == 2
+    with pytest.raises(ReplayError):
+        client.send_command("altitude_msl")
+
+
+def test_diverging_requests_raise(tmp_path: Path):
+    path, *_ = record(tmp_path, pause=0)
+    replay = SessionReplay(path)
+    client = replay_client(replay, tmp_path)
+    with pytest.raises(ReplayError, match="differs"):
+        client.send_command("altitude_msl")
+
+
+def test_truncated_frame_dropped(tmp_path: Path):
+    path, *_ = record(tmp_path, pause=0)
+    _, frames = read_session(path)
+    data = path.read_bytes()
+    path.write_bytes(data[:-3])
+    _, truncated = read_session(path)
+    assert truncated == frames[:-1]
+    assert sum(frame.kind == SENT for frame in truncated) > 0